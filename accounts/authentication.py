@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from core.routers import set_read_user
+from organizations.context import MEMBERSHIP_VERSION_CLAIM, ORGANIZATIONS_CLAIM, get_membership_version
+
+
+class LazyTokenUser(SimpleLazyObject):
+    """
+    Stand-in for the authenticated user that only hits the database on use.
+
+    `pk`/`id` and the authentication flags are answered from the token, which
+    is all the permission layer needs.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, func, user_id) -> None:
+        super().__init__(func)
+        self.__dict__["_token_user_id"] = user_id
+
+    def __bool__(self) -> bool:
+        return True
+
+    @property
+    def pk(self):
+        return self.__dict__["_token_user_id"]
+
+    @property
+    def id(self):
+        return self.__dict__["_token_user_id"]
+
+
+class ReadRoutingJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that reports the user to the read-replica router, so
+    views reading from replicas can keep a recently-writing user pinned to
+    the primary (see core.routers.pin_to_primary).
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            set_read_user(result[0].pk)
+        return result
+
+
+class TenancyJWTAuthentication(ReadRoutingJWTAuthentication):
+    """
+    JWT authentication for tokens carrying tenancy claims.
+
+    Used when settings.TENANCY_JWT_CLAIMS is enabled: organization
+    permissions are answered from the token, so the user row is loaded
+    lazily instead of on every request. That is only done while the
+    token's membership version is current; deactivating or deleting a user
+    bumps it (see organizations.signals), so their tokens fall back to the
+    regular lookup, which rejects inactive and missing users.
+    """
+
+    def get_user(self, validated_token):
+        if ORGANIZATIONS_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id = get_user_model()._meta.pk.to_python(
+            validated_token[api_settings.USER_ID_CLAIM]
+        )
+        if validated_token.get(MEMBERSHIP_VERSION_CLAIM) != get_membership_version(user_id):
+            return super().get_user(validated_token)
+        parent = super()
+        return LazyTokenUser(lambda: parent.get_user(validated_token), user_id)
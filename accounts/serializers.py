@@ -1,13 +1,29 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+
+from core.fieldsets import SparseFieldsetSerializerMixin
+
+from .tokens import TenancyRefreshToken
 
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "email", "full_name", "first_name", "last_name"]
         read_only_fields = ["id", "username", "email"]
 
+
+
+class TenancyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = TenancyRefreshToken
+
+
+class TenancyTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = TenancyRefreshToken
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from organizations.context import build_membership_claims
+
+
+class TenancyRefreshToken(RefreshToken):
+    """
+    Refresh token whose access tokens carry the user's memberships.
+
+    Claims are rebuilt from the database every time an access token is
+    minted (on login and on refresh), so refreshing always picks up the
+    current roles.
+    """
+
+    @property
+    def access_token(self) -> AccessToken:
+        access = super().access_token
+        for claim, value in build_membership_claims(
+            self[api_settings.USER_ID_CLAIM]
+        ).items():
+            access[claim] = value
+        return access
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import response
+
+from core.routers import reset_read_state, use_primary
+
+
+# Endpoints served through `cached_analytics`; listed so the stats view can
+# report every counter, including ones still at zero.
+ENDPOINTS = (
+    "summary",
+    "revenue-per-month",
+    "active-projects",
+    "task-completion-rate",
+    "user-productivity",
+    "cycle-time",
+    "lead-time",
+    "throughput",
+    "cumulative-flow",
+)
+
+
+def _data_version_key(organization_id) -> str:
+    return f"analytics:version:{organization_id}"
+
+
+def _response_cache_key(organization_id, version: int, endpoint: str, params) -> str:
+    # Some responses depend on today's date (overdue projects, the default
+    # end of the cumulative flow), so entries also expire at midnight.
+    today = timezone.localdate().isoformat()
+    query = "&".join(
+        f"{name}={value}"
+        for name in sorted(params)
+        for value in sorted(params.getlist(name))
+    )
+    digest = hashlib.sha1(query.encode()).hexdigest()
+    return f"analytics:response:{organization_id}:{version}:{today}:{endpoint}:{digest}"
+
+
+def _counter_key(endpoint: str, outcome: str) -> str:
+    return f"analytics:cache:{endpoint}:{outcome}"
+
+
+# Data version
+
+
+def get_data_version(organization_id) -> int:
+    key = _data_version_key(organization_id)
+    # Seed with a timestamp so a version lost to cache eviction never
+    # restarts at a value that still has responses cached under it.
+    cache.add(key, int(time.time() * 1000), timeout=None)
+    return cache.get(key)
+
+
+def bump_data_version(organization_id) -> None:
+    """
+    Make every cached analytics response of an organization stale. Called
+    from the Task/Project/Invoice signals; bulk code paths that bypass them
+    must call it themselves.
+    """
+
+    key = _data_version_key(organization_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+# Hit/miss counters
+
+
+def _count(endpoint: str, outcome: str) -> None:
+    key = _counter_key(endpoint, outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    keys = {
+        (endpoint, outcome): _counter_key(endpoint, outcome)
+        for endpoint in ENDPOINTS
+        for outcome in ("hits", "misses")
+    }
+    values = cache.get_many(list(keys.values()))
+    return {
+        endpoint: {
+            outcome: values.get(keys[(endpoint, outcome)], 0)
+            for outcome in ("hits", "misses")
+        }
+        for endpoint in ENDPOINTS
+    }
+
+
+# View decorator
+
+
+def cached_analytics(endpoint: str):
+    """
+    Cache the data returned by an analytics `get` under (organization,
+    endpoint, query params, data version, local date).
+
+    The wrapped method runs after authentication and permission checks, so
+    only members ever reach the cache. Misses are computed on the primary
+    database: a replica lagging behind the write that bumped the version
+    must not get its stale numbers cached under the new version.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            organization_id = getattr(getattr(request, "organization", None), "pk", None)
+            if organization_id is None:
+                return method(view, request, *args, **kwargs)
+
+            version = get_data_version(organization_id)
+            key = _response_cache_key(organization_id, version, endpoint, request.query_params)
+            data = cache.get(key)
+            if data is not None:
+                _count(endpoint, "hits")
+                return response.Response(data)
+
+            _count(endpoint, "misses")
+            token = use_primary()
+            try:
+                result = method(view, request, *args, **kwargs)
+            finally:
+                reset_read_state(token)
+            if result.status_code == 200:
+                timeout = getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 86400)
+                cache.set(key, result.data, timeout=timeout)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.db.models import FloatField, Func
+from django.utils import timezone
+
+from tasks.models import Task, TaskStatusTransition
+
+
+# Small integer codes for statuses; -1 stands for "no status" (the empty
+# from_status of a task's creation row).
+STATUSES = [status for status, _label in Task.STATUS_CHOICES]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+STATUS_CODES[""] = -1
+
+DONE = STATUS_CODES[Task.STATUS_DONE]
+IN_PROGRESS = STATUS_CODES[Task.STATUS_IN_PROGRESS]
+
+SECONDS_PER_DAY = 86400.0
+
+
+@dataclass
+class Transitions:
+    """
+    Column arrays of TaskStatusTransition rows, sorted by (task, time).
+    Timestamps are seconds since the epoch in the current timezone's wall
+    clock, so flooring by days/weeks yields local calendar buckets.
+    """
+
+    task: np.ndarray
+    from_status: np.ndarray
+    to_status: np.ndarray
+    at: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.task)
+
+
+class Epoch(Func):
+    """
+    Seconds since the Unix epoch of a datetime column, as a float. Fetching
+    plain numbers avoids building a datetime object per row.
+    """
+
+    output_field = FloatField()
+    template = "EXTRACT(EPOCH FROM %(expressions)s)"
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="((julianday(%(expressions)s) - 2440587.5) * 86400.0)",
+            **extra_context,
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="UNIX_TIMESTAMP(%(expressions)s)", **extra_context)
+
+
+def _utc_offset(seconds: float) -> float:
+    return timezone.localtime(datetime.fromtimestamp(seconds, dt_timezone.utc)).utcoffset().total_seconds()
+
+
+def _wall_clock(at: np.ndarray) -> np.ndarray:
+    # Shift UTC epoch seconds by the offset in force at each instant, as
+    # timezone.localtime does. Offsets are looked up at the first and last
+    # second of each distinct UTC day; only rows of days where they differ
+    # (DST changes) are converted one by one.
+    days, inverse = np.unique(np.floor(at / SECONDS_PER_DAY), return_inverse=True)
+    first = np.array([_utc_offset(day * SECONDS_PER_DAY) for day in days])
+    last = np.array([_utc_offset((day + 1) * SECONDS_PER_DAY - 1) for day in days])
+    offsets = first[inverse]
+    for row in np.flatnonzero((first != last)[inverse]):
+        offsets[row] = _utc_offset(at[row])
+    return at + offsets
+
+
+def load_transitions(org, project_id=None) -> Transitions:
+    qs = TaskStatusTransition.objects.filter(organization=org)
+    if project_id is not None:
+        qs = qs.filter(task__project_id=project_id)
+    rows = list(
+        qs.order_by("task_id", "created_at", "id").values_list(
+            "task_id", "from_status", "to_status", Epoch("created_at")
+        )
+    )
+    if not rows:
+        return Transitions(
+            task=np.empty(0, dtype=np.int64),
+            from_status=np.empty(0, dtype=np.int8),
+            to_status=np.empty(0, dtype=np.int8),
+            at=np.empty(0, dtype=np.float64),
+        )
+
+    task, from_status, to_status, at = zip(*rows)
+    codes = STATUS_CODES
+    return Transitions(
+        task=np.asarray(task, dtype=np.int64),
+        from_status=np.fromiter(map(codes.__getitem__, from_status), dtype=np.int8, count=len(rows)),
+        to_status=np.fromiter(map(codes.__getitem__, to_status), dtype=np.int8, count=len(rows)),
+        at=_wall_clock(np.asarray(at, dtype=np.float64)),
+    )
+
+
+# Per-task milestones
+
+
+@dataclass
+class Milestones:
+    created: np.ndarray  # first row of each task
+    started: np.ndarray  # first entry into in_progress, NaN if never started
+    completed: np.ndarray  # last entry into done, NaN unless currently done
+
+
+def task_milestones(transitions: Transitions) -> Milestones:
+    if not len(transitions):
+        empty = np.empty(0)
+        return Milestones(empty, empty, empty)
+
+    task, before, after, at = (
+        transitions.task,
+        transitions.from_status,
+        transitions.to_status,
+        transitions.at,
+    )
+    index = np.arange(len(task))
+    first = np.flatnonzero(np.r_[True, task[1:] != task[:-1]])
+    last = np.r_[first[1:] - 1, len(task) - 1]
+
+    # Rows where the task entered a status (assignee-only changes excluded).
+    started_rows = np.minimum.reduceat(
+        np.where((after == IN_PROGRESS) & (before != IN_PROGRESS), index, len(task)), first
+    )
+    completed_rows = np.maximum.reduceat(
+        np.where((after == DONE) & (before != DONE), index, -1), first
+    )
+
+    at_or_nan = np.r_[at, np.nan]
+    started = at_or_nan[started_rows]
+    completed = np.where(
+        (after[last] == DONE) & (completed_rows >= 0), at_or_nan[completed_rows], np.nan
+    )
+    return Milestones(created=at[first], started=started, completed=completed)
+
+
+# Metrics
+
+
+def _window(values: np.ndarray, since: Optional[date], until: Optional[date]) -> np.ndarray:
+    mask = ~np.isnan(values)
+    if since is not None:
+        mask &= values >= _day_seconds(since)
+    if until is not None:
+        mask &= values < _day_seconds(until) + SECONDS_PER_DAY
+    return mask
+
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _epoch_day(day: date) -> int:
+    return (day - _EPOCH).days
+
+
+def _from_epoch_day(days: int) -> date:
+    return _EPOCH + timedelta(days=int(days))
+
+
+def _day_seconds(day: date) -> float:
+    return _epoch_day(day) * SECONDS_PER_DAY
+
+
+def duration_stats(durations: np.ndarray) -> Dict[str, object]:
+    """
+    Count, mean and percentiles of durations given in seconds, in days.
+    """
+
+    if not len(durations):
+        return {"count": 0, "mean": None, "p50": None, "p85": None, "p95": None}
+    days = durations / SECONDS_PER_DAY
+    p50, p85, p95 = np.percentile(days, [50, 85, 95])
+    return {
+        "count": int(len(days)),
+        "mean": round(float(days.mean()), 2),
+        "p50": round(float(p50), 2),
+        "p85": round(float(p85), 2),
+        "p95": round(float(p95), 2),
+    }
+
+
+def lead_time(transitions: Transitions, since=None, until=None) -> Dict[str, object]:
+    """
+    Creation to completion, for tasks completed within [since, until].
+    """
+
+    milestones = task_milestones(transitions)
+    mask = _window(milestones.completed, since, until)
+    return duration_stats(milestones.completed[mask] - milestones.created[mask])
+
+
+def cycle_time(transitions: Transitions, since=None, until=None) -> Dict[str, object]:
+    """
+    First start of work to completion, for tasks completed within
+    [since, until] that ever were in progress.
+    """
+
+    milestones = task_milestones(transitions)
+    mask = _window(milestones.completed, since, until) & ~np.isnan(milestones.started)
+    return duration_stats(milestones.completed[mask] - milestones.started[mask])
+
+
+def throughput_per_week(transitions: Transitions, since=None, until=None) -> List[Dict[str, object]]:
+    """
+    Completed tasks per ISO week (Monday start), including empty weeks.
+    """
+
+    milestones = task_milestones(transitions)
+    completed = milestones.completed[_window(milestones.completed, since, until)]
+    if not len(completed):
+        return []
+    days = np.floor(completed / SECONDS_PER_DAY).astype(np.int64)
+    # 1970-01-01 was a Thursday: shift so weeks start on Monday.
+    weeks = (days + 3) // 7
+    first_week = int(weeks.min())
+    counts = np.bincount(weeks - first_week)
+    return [
+        {
+            "week_start": _from_epoch_day((first_week + offset) * 7 - 3),
+            "completed": int(count),
+        }
+        for offset, count in enumerate(counts)
+    ]
+
+
+def cumulative_flow(transitions: Transitions, since=None, until=None) -> List[Dict[str, object]]:
+    """
+    Number of tasks in each status at the end of every day.
+    """
+
+    if not len(transitions):
+        return []
+    days = np.floor(transitions.at / SECONDS_PER_DAY).astype(np.int64)
+    first_day = int(days.min()) if since is None else _epoch_day(since)
+    last_day = max(_epoch_day(until or timezone.localdate()), first_day)
+    span = last_day - first_day + 1
+
+    # Each transition adds one to its target status and removes one from its
+    # source status on its day; a running sum gives the daily levels. Rows
+    # before the window collapse onto its first day.
+    bucket = np.clip(days - first_day, 0, None)
+    keep = bucket < span
+    levels = np.zeros((len(STATUSES), span), dtype=np.int64)
+    moved = keep & (transitions.from_status != transitions.to_status)
+    np.add.at(levels, (transitions.to_status[moved], bucket[moved]), 1)
+    left = moved & (transitions.from_status >= 0)
+    np.add.at(levels, (transitions.from_status[left], bucket[left]), -1)
+    levels = np.cumsum(levels, axis=1)
+
+    data = []
+    for offset in range(span):
+        row = {"date": _from_epoch_day(first_day + offset)}
+        for code, status in enumerate(STATUSES):
+            row[status] = int(levels[code, offset])
+        data.append(row)
+    return data
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.rollups import diff_rollups, rebuild_rollups
+from organizations.models import Organization
+from organizations.sharding import get_tenant_placement
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare analytics rollups with live aggregates and report (or "
+        "repair) organizations whose rollups drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            dest="slugs",
+            help="Organization slug (repeatable). Defaults to all organizations.",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rebuild the rollups of organizations that drifted.",
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.order_by("pk")
+        if options["slugs"]:
+            organizations = organizations.filter(slug__in=options["slugs"])
+
+        drifted = []
+        for organization in organizations.iterator():
+            database, _ = get_tenant_placement(organization.pk)
+            problems = diff_rollups(organization.pk, using=database)
+            if not problems:
+                continue
+            drifted.append(organization.slug)
+            for problem in problems:
+                self.stdout.write(f"{organization.slug}: {problem}")
+            if options["repair"]:
+                rebuild_rollups(organization.pk, using=database)
+                self.stdout.write(self.style.SUCCESS(f"Repaired {organization.slug}"))
+
+        if drifted and not options["repair"]:
+            raise CommandError("Rollups drifted for: " + ", ".join(drifted))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Rollups are consistent."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import rebuild_rollups
+from organizations.models import Organization
+from organizations.sharding import get_tenant_placement
+
+
+class Command(BaseCommand):
+    help = "Recompute analytics rollups from the live invoice and task tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            dest="slugs",
+            help="Organization slug (repeatable). Defaults to all organizations.",
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.order_by("pk")
+        if options["slugs"]:
+            organizations = organizations.filter(slug__in=options["slugs"])
+
+        for organization in organizations.iterator():
+            database, _ = get_tenant_placement(organization.pk)
+            rebuild_rollups(organization.pk, using=database)
+            self.stdout.write(f"Rebuilt rollups for {organization.slug}")
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+# Frozen copies of analytics.rollups.REVENUE_STATUSES and Task.STATUS_DONE.
+REVENUE_STATUSES = ("pending", "paid", "overdue")
+TASK_DONE = "done"
+CENT = Decimal("0.01")
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Compute the rollups of every organization on this database from the
+    live invoice and task tables, as analytics.rollups.rebuild_rollups
+    does, so existing tenants do not start from empty totals (which the
+    incremental updates would then only adjust).
+    """
+
+    alias = schema_editor.connection.alias
+    Invoice = apps.get_model("billing", "Invoice")
+    Task = apps.get_model("tasks", "Task")
+    DailyRollup = apps.get_model("analytics", "DailyRollup")
+    MonthlyRollup = apps.get_model("analytics", "MonthlyRollup")
+    UserMonthlyRollup = apps.get_model("analytics", "UserMonthlyRollup")
+
+    daily = defaultdict(lambda: defaultdict(int))
+    monthly = defaultdict(lambda: defaultdict(int))
+    user_monthly = defaultdict(int)
+
+    def add(organization_id, day, metrics):
+        for metric, amount in metrics.items():
+            daily[(organization_id, day)][metric] += amount
+            monthly[(organization_id, day.year, day.month)][metric] += amount
+
+    invoices = (
+        Invoice.objects.using(alias)
+        .filter(status__in=REVENUE_STATUSES)
+        .values("organization_id", "issue_date")
+        .annotate(invoice_count=Count("id"), revenue=Sum("total_amount"))
+    )
+    for row in invoices.iterator():
+        revenue = Decimal(row["revenue"] or 0).quantize(CENT)
+        add(row["organization_id"], row["issue_date"], {"invoice_count": row["invoice_count"], "revenue": revenue})
+
+    tasks = (
+        Task.objects.using(alias)
+        .values("organization_id", day=TruncDate("created_at"))
+        .annotate(tasks_total=Count("id"), tasks_done=Count("id", filter=Q(status=TASK_DONE)))
+    )
+    for row in tasks.iterator():
+        add(row["organization_id"], row["day"], {"tasks_total": row["tasks_total"], "tasks_done": row["tasks_done"]})
+
+    completed = (
+        Task.objects.using(alias)
+        .filter(status=TASK_DONE, assignee__isnull=False)
+        .values("organization_id", "assignee_id", day=TruncDate("created_at"))
+        .annotate(tasks_done=Count("id"))
+    )
+    for row in completed.iterator():
+        day = row["day"]
+        user_monthly[(row["organization_id"], row["assignee_id"], day.year, day.month)] += row["tasks_done"]
+
+    # Rows the incremental updates may already have written are replaced.
+    for model in (DailyRollup, MonthlyRollup, UserMonthlyRollup):
+        model.objects.using(alias).all().delete()
+    DailyRollup.objects.using(alias).bulk_create(
+        [
+            DailyRollup(organization_id=organization_id, day=day, **metrics)
+            for (organization_id, day), metrics in daily.items()
+        ],
+        batch_size=1000,
+    )
+    MonthlyRollup.objects.using(alias).bulk_create(
+        [
+            MonthlyRollup(organization_id=organization_id, year=year, month=month, **metrics)
+            for (organization_id, year, month), metrics in monthly.items()
+        ],
+        batch_size=1000,
+    )
+    UserMonthlyRollup.objects.using(alias).bulk_create(
+        [
+            UserMonthlyRollup(organization_id=organization_id, user_id=user_id, year=year, month=month, tasks_done=done)
+            for (organization_id, user_id, year, month), done in user_monthly.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0001_initial"),
+        ("billing", "0001_initial"),
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
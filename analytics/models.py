@@ -0,0 +1,70 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models
+
+from core.models import OrganizationScopedModel
+
+
+class DailyRollup(OrganizationScopedModel):
+    """
+    Per-organization daily totals, maintained incrementally by
+    analytics.rollups from invoice and task changes.
+
+    Revenue is bucketed by invoice issue date (pending/paid/overdue
+    invoices only); task counts by task creation date.
+    """
+
+    day = models.DateField()
+    invoice_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    tasks_total = models.IntegerField(default=0)
+    tasks_done = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["organization", "day"], name="dailyrollup_org_day_uniq"),
+        ]
+
+
+class MonthlyRollup(OrganizationScopedModel):
+    """
+    Same totals as DailyRollup, per calendar month.
+    """
+
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    invoice_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    tasks_total = models.IntegerField(default=0)
+    tasks_done = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "year", "month"], name="monthlyrollup_org_month_uniq"
+            ),
+        ]
+
+
+class UserMonthlyRollup(OrganizationScopedModel):
+    """
+    Completed tasks per assignee and month of task creation.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="monthly_rollups",
+    )
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    tasks_done = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["organization", "user", "year", "month"],
+                name="usermonthlyrollup_uniq",
+            ),
+        ]
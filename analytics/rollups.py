@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Now, TruncDate
+from django.utils import timezone
+
+from billing.models import Invoice
+from tasks.models import Task
+
+from .models import DailyRollup, MonthlyRollup, UserMonthlyRollup
+
+
+REVENUE_STATUSES = (Invoice.STATUS_PENDING, Invoice.STATUS_PAID, Invoice.STATUS_OVERDUE)
+
+# Fields each source model contributes from; a save touching none of them
+# leaves the rollups alone.
+TRACKED_FIELDS = {
+    Invoice: ("organization_id", "status", "issue_date", "total_amount"),
+    Task: ("organization_id", "status", "created_at", "assignee_id"),
+}
+
+KEY_FIELDS = {
+    DailyRollup: ("organization_id", "day"),
+    MonthlyRollup: ("organization_id", "year", "month"),
+    UserMonthlyRollup: ("organization_id", "user_id", "year", "month"),
+}
+
+METRIC_FIELDS = {
+    DailyRollup: ("invoice_count", "revenue", "tasks_total", "tasks_done"),
+    MonthlyRollup: ("invoice_count", "revenue", "tasks_total", "tasks_done"),
+    UserMonthlyRollup: ("tasks_done",),
+}
+
+Contributions = Dict[Tuple[type, tuple], Dict[str, object]]
+
+
+# Contributions of a single row
+
+
+def _invoice_contributions(values: Dict[str, object]) -> Contributions:
+    if values["status"] not in REVENUE_STATUSES:
+        return {}
+    organization_id, day = values["organization_id"], values["issue_date"]
+    metrics = {"invoice_count": 1, "revenue": values["total_amount"]}
+    return {
+        (DailyRollup, (organization_id, day)): metrics,
+        (MonthlyRollup, (organization_id, day.year, day.month)): metrics,
+    }
+
+
+def _task_contributions(values: Dict[str, object]) -> Contributions:
+    organization_id = values["organization_id"]
+    day = timezone.localtime(values["created_at"]).date()
+    done = values["status"] == Task.STATUS_DONE
+    metrics = {"tasks_total": 1, "tasks_done": int(done)}
+    contributions: Contributions = {
+        (DailyRollup, (organization_id, day)): metrics,
+        (MonthlyRollup, (organization_id, day.year, day.month)): metrics,
+    }
+    if done and values["assignee_id"] is not None:
+        key = (organization_id, values["assignee_id"], day.year, day.month)
+        contributions[(UserMonthlyRollup, key)] = {"tasks_done": 1}
+    return contributions
+
+
+CONTRIBUTIONS = {
+    Invoice: _invoice_contributions,
+    Task: _task_contributions,
+}
+
+
+def snapshot(instance) -> Dict[str, object]:
+    return {attname: getattr(instance, attname) for attname in TRACKED_FIELDS[type(instance)]}
+
+
+# Applying changes
+
+
+def record_change(
+    model,
+    before: Optional[Dict[str, object]],
+    after: Optional[Dict[str, object]],
+    using: str = DEFAULT_DB_ALIAS,
+) -> None:
+    """
+    Apply the rollup delta of one source row going from `before` to `after`
+    (either may be None for creates/deletes). Used by the model signals and
+    by bulk code paths that bypass them.
+    """
+
+    contribute = CONTRIBUTIONS[model]
+    deltas: Contributions = defaultdict(dict)
+    for values, sign in ((before, -1), (after, 1)):
+        if values is None:
+            continue
+        for key, metrics in contribute(values).items():
+            for metric, amount in metrics.items():
+                deltas[key][metric] = deltas[key].get(metric, 0) + sign * amount
+
+    for (rollup_model, key), metrics in deltas.items():
+        metrics = {metric: amount for metric, amount in metrics.items() if amount}
+        if metrics:
+            _increment(rollup_model, key, metrics, using)
+
+
+def _increment(rollup_model, key: tuple, metrics: Dict[str, object], using: str) -> None:
+    lookup = dict(zip(KEY_FIELDS[rollup_model], key))
+    manager = rollup_model._base_manager.using(using)
+    changes = {metric: F(metric) + amount for metric, amount in metrics.items()}
+    if manager.filter(**lookup).update(**changes, updated_at=Now()):
+        return
+    if not any(amount > 0 for amount in metrics.values()):
+        # Only removals for a row that no longer exists, e.g. while the
+        # organization itself is being deleted.
+        return
+    try:
+        with transaction.atomic(using=using):
+            manager.create(**lookup, **metrics)
+    except IntegrityError:
+        # Another writer created the row first.
+        manager.filter(**lookup).update(**changes, updated_at=Now())
+
+
+# Rebuilding and checking
+
+
+def compute_rollups(organization_id, using: str = DEFAULT_DB_ALIAS) -> Dict[type, Dict[tuple, Dict[str, object]]]:
+    """
+    Rollup rows for one organization computed from the live tables.
+    """
+
+    rows: Dict[type, Dict[tuple, Dict[str, object]]] = {model: {} for model in KEY_FIELDS}
+
+    def add(model, key, metrics):
+        row = rows[model].setdefault(key, {metric: 0 for metric in METRIC_FIELDS[model]})
+        for metric, amount in metrics.items():
+            row[metric] += amount
+
+    invoices = (
+        Invoice.objects.using(using)
+        .filter(organization_id=organization_id, status__in=REVENUE_STATUSES)
+        .values("issue_date")
+        .annotate(invoice_count=Count("id"), revenue=Sum("total_amount"))
+    )
+    for row in invoices:
+        day = row["issue_date"]
+        metrics = {"invoice_count": row["invoice_count"], "revenue": row["revenue"] or Decimal("0")}
+        add(DailyRollup, (organization_id, day), metrics)
+        add(MonthlyRollup, (organization_id, day.year, day.month), metrics)
+
+    tasks = (
+        Task.objects.using(using)
+        .filter(organization_id=organization_id)
+        .values(day=TruncDate("created_at"))
+        .annotate(
+            tasks_total=Count("id"),
+            tasks_done=Count("id", filter=Q(status=Task.STATUS_DONE)),
+        )
+    )
+    for row in tasks:
+        day = row["day"]
+        metrics = {"tasks_total": row["tasks_total"], "tasks_done": row["tasks_done"]}
+        add(DailyRollup, (organization_id, day), metrics)
+        add(MonthlyRollup, (organization_id, day.year, day.month), metrics)
+
+    completed = (
+        Task.objects.using(using)
+        .filter(organization_id=organization_id, status=Task.STATUS_DONE, assignee__isnull=False)
+        .values("assignee_id", day=TruncDate("created_at"))
+        .annotate(tasks_done=Count("id"))
+    )
+    for row in completed:
+        day = row["day"]
+        key = (organization_id, row["assignee_id"], day.year, day.month)
+        add(UserMonthlyRollup, key, {"tasks_done": row["tasks_done"]})
+
+    return rows
+
+
+def stored_rollups(organization_id, using: str = DEFAULT_DB_ALIAS) -> Dict[type, Dict[tuple, Dict[str, object]]]:
+    rows: Dict[type, Dict[tuple, Dict[str, object]]] = {}
+    for model, key_fields in KEY_FIELDS.items():
+        metric_fields = METRIC_FIELDS[model]
+        rows[model] = {
+            tuple(row[field] for field in key_fields): {field: row[field] for field in metric_fields}
+            for row in model._base_manager.using(using)
+            .filter(organization_id=organization_id)
+            .values(*key_fields, *metric_fields)
+        }
+    return rows
+
+
+def diff_rollups(organization_id, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+    """
+    Human-readable differences between stored rollups and live aggregates.
+    """
+
+    expected = compute_rollups(organization_id, using)
+    stored = stored_rollups(organization_id, using)
+    problems = []
+    for model, rows in expected.items():
+        zero = {metric: 0 for metric in METRIC_FIELDS[model]}
+        for key in set(rows) | set(stored[model]):
+            want = rows.get(key, zero)
+            have = stored[model].get(key, zero)
+            if want != have:
+                problems.append(f"{model.__name__} {key}: stored {have}, live {want}")
+    return problems
+
+
+def rebuild_rollups(organization_id, using: str = DEFAULT_DB_ALIAS) -> None:
+    with transaction.atomic(using=using):
+        rows = compute_rollups(organization_id, using)
+        for model, key_fields in KEY_FIELDS.items():
+            model._base_manager.using(using).filter(organization_id=organization_id).delete()
+            model._base_manager.using(using).bulk_create(
+                [model(**dict(zip(key_fields, key)), **metrics) for key, metrics in rows[model].items()],
+                batch_size=1000,
+            )
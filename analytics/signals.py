@@ -0,0 +1,83 @@
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from billing.models import Invoice
+from projects.models import Project
+from tasks.models import Task
+
+from .cache import bump_data_version
+from .rollups import TRACKED_FIELDS, record_change, snapshot
+
+
+def _persisted_values(sender, instance, using):
+    tracked = TRACKED_FIELDS[sender]
+    rows = sender._base_manager.using(using).filter(pk=instance.pk)
+    if connections[using].in_atomic_block:
+        # Lock the row until the save commits: a concurrent save of the same
+        # row waits and then sees this one's values, so neither delta is
+        # computed from a state the other already changed.
+        return rows.select_for_update().values(*tracked).first()
+    # Outside a transaction no lock would outlive this read; use the values
+    # loaded with the instance (kept current by refresh_from_db and saves).
+    # Drift from racing autocommit saves is repaired by reconcile_rollups.
+    loaded = getattr(instance, "_loaded_values", None) or {}
+    if all(attname in loaded for attname in tracked):
+        return {attname: loaded[attname] for attname in tracked}
+    return rows.values(*tracked).first()
+
+
+@receiver(pre_save, sender=Invoice)
+@receiver(pre_save, sender=Task)
+def remember_rollup_state(sender, instance, raw=False, using=None, update_fields=None, **kwargs) -> None:
+    instance._rollup_before = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None:
+        tracked = TRACKED_FIELDS[sender]
+        names = {sender._meta.get_field(name).attname for name in update_fields}
+        if not names.intersection(tracked):
+            instance._rollup_skip = True
+            return
+    instance._rollup_skip = False
+    instance._rollup_before = _persisted_values(sender, instance, using)
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Task)
+def update_rollups_on_save(sender, instance, created, raw=False, using=None, **kwargs) -> None:
+    if raw or (not created and getattr(instance, "_rollup_skip", False)):
+        return
+    after = snapshot(instance)
+    record_change(sender, instance._rollup_before, after, using=using)
+    instance._loaded_values = {**getattr(instance, "_loaded_values", {}), **after}
+
+
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Task)
+def update_rollups_on_delete(sender, instance, using=None, **kwargs) -> None:
+    record_change(sender, snapshot(instance), None, using=using)
+
+
+def _invalidate_analytics_cache(organization_id) -> None:
+    bump_data_version(organization_id)
+    # Bump again once committed so a response computed from the pre-commit
+    # state in the meantime is never served.
+    transaction.on_commit(lambda: bump_data_version(organization_id))
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+def invalidate_analytics_cache_on_save(sender, instance, created, **kwargs) -> None:
+    if not created and getattr(instance, "_rollup_skip", False):
+        # Save limited to fields no analytics read, e.g. Invoice.pdf_file.
+        return
+    _invalidate_analytics_cache(instance.organization_id)
+
+
+@receiver(post_delete, sender=Invoice)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+def invalidate_analytics_cache_on_delete(sender, instance, **kwargs) -> None:
+    _invalidate_analytics_cache(instance.organization_id)
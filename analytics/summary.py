@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Iterable, List
+
+from django.db.models import Count, Q, Sum
+
+from projects.models import Project
+
+from .models import MonthlyRollup, UserMonthlyRollup
+
+
+# Dashboard sections, in response order. `revenue` and `tasks` share a single
+# query over the monthly rollups.
+SECTIONS = ("projects", "tasks", "revenue", "productivity")
+
+
+def project_stats(org) -> Dict[str, int]:
+    open_statuses = [Project.STATUS_ACTIVE, Project.STATUS_PLANNED]
+    totals = Project.objects.filter(organization=org, status__in=open_statuses).aggregate(
+        active_projects=Count("id"),
+        overdue_projects=Count("id", filter=Q(end_date__lt=date.today())),
+    )
+    return {
+        "active_projects": totals["active_projects"],
+        "overdue_projects": totals["overdue_projects"],
+    }
+
+
+def _monthly_rows(org) -> List[Dict[str, object]]:
+    return list(
+        MonthlyRollup.objects.filter(organization=org)
+        .values("year", "month", "invoice_count", "revenue", "tasks_total", "tasks_done")
+        .order_by("year", "month")
+    )
+
+
+def task_stats(org, monthly_rows=None) -> Dict[str, object]:
+    rows = _monthly_rows(org) if monthly_rows is None else monthly_rows
+    total = sum(row["tasks_total"] for row in rows)
+    done = sum(row["tasks_done"] for row in rows)
+    return {
+        "total_tasks": total,
+        "completed_tasks": done,
+        "completion_rate": (done / total) * 100 if total > 0 else 0.0,
+    }
+
+
+def revenue_per_month(org, monthly_rows=None) -> List[Dict[str, object]]:
+    rows = _monthly_rows(org) if monthly_rows is None else monthly_rows
+    return [
+        {"year": row["year"], "month": row["month"], "total": row["revenue"] or 0}
+        for row in rows
+        if row["invoice_count"] > 0
+    ]
+
+
+def user_productivity(org) -> List[Dict[str, object]]:
+    qs = (
+        UserMonthlyRollup.objects.filter(organization=org)
+        .values("user")
+        .annotate(completed_tasks=Sum("tasks_done"))
+        .filter(completed_tasks__gt=0)
+        .order_by("-completed_tasks")
+    )
+    return [
+        {"user_id": row["user"], "completed_tasks": row["completed_tasks"]}
+        for row in qs
+    ]
+
+
+def dashboard_summary(org, include: Iterable[str] = SECTIONS) -> Dict[str, object]:
+    """
+    The requested dashboard sections in at most three queries: one
+    conditional aggregate over projects, one read of the monthly rollups
+    shared by `tasks` and `revenue`, and one grouped read for
+    `productivity`.
+    """
+
+    include = set(include)
+    monthly_rows = _monthly_rows(org) if include & {"tasks", "revenue"} else None
+
+    data: Dict[str, object] = {}
+    if "projects" in include:
+        data["projects"] = project_stats(org)
+    if "tasks" in include:
+        data["tasks"] = task_stats(org, monthly_rows)
+    if "revenue" in include:
+        data["revenue"] = revenue_per_month(org, monthly_rows)
+    if "productivity" in include:
+        data["productivity"] = user_productivity(org)
+    return data
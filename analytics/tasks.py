@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import logging
+from typing import List
+
+from celery import shared_task
+
+from organizations.models import Organization
+from organizations.sharding import get_tenant_placement
+
+from .rollups import diff_rollups, rebuild_rollups
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_rollups() -> List[str]:
+    """
+    Rebuild the rollups of every organization whose totals drifted from the
+    live tables, e.g. through racing saves made outside a transaction or
+    queryset updates that bypass the signals (see check_rollups). Returns
+    the slugs of the organizations repaired.
+    """
+
+    repaired = []
+    for organization in Organization.objects.order_by("pk").iterator():
+        database, _ = get_tenant_placement(organization.pk)
+        problems = diff_rollups(organization.pk, using=database)
+        if problems:
+            logger.warning("Rollups of %s drifted in %d rows; rebuilding them", organization.slug, len(problems))
+            rebuild_rollups(organization.pk, using=database)
+            repaired.append(organization.slug)
+    return repaired
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from analytics.rollups import diff_rollups
+from analytics.tasks import reconcile_rollups
+from organizations.models import Membership, Organization
+from projects.models import Project
+from tasks.models import Task
+
+
+@override_settings(CUMULATIVE_FLOW_MAX_DAYS=30)
+class CumulativeFlowWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        organization = Organization.objects.create(name="Acme", slug="acme")
+        Membership.objects.create(user=user, organization=organization, role="owner")
+        self.project = Project.objects.create(organization=organization, name="Launch")
+        Task.objects.create(organization=organization, project=self.project, title="Write docs")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + str(RefreshToken.for_user(user).access_token),
+            HTTP_X_ORGANIZATION_SLUG=organization.slug,
+        )
+        self.today = timezone.localdate()
+
+    def get(self, **params):
+        return self.client.get("/api/v1/analytics/cumulative-flow/", {"project": self.project.pk, **params})
+
+    def test_window_up_to_the_limit(self):
+        response = self.get(since=(self.today - timedelta(days=29)).isoformat())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 30)
+
+    def test_window_over_the_limit_is_rejected(self):
+        response = self.get(since=(self.today - timedelta(days=30)).isoformat())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("since", response.data)
+
+        response = self.get(since="0001-01-01", until="0001-12-31")
+        self.assertEqual(response.status_code, 400)
+
+    def test_future_until_is_rejected(self):
+        response = self.get(until=(self.today + timedelta(days=1)).isoformat())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("until", response.data)
+
+    def test_default_window_starts_at_the_first_transition(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[-1]["date"], self.today)
+
+
+# Real transactions: saves outside one take the autocommit path.
+class RollupConsistencyTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+        self.project = Project.objects.create(organization=self.organization, name="Launch")
+        self.task = Task.objects.create(organization=self.organization, project=self.project, title="Write docs")
+
+    def assertConsistent(self):
+        self.assertEqual(diff_rollups(self.organization.pk), [])
+
+    def test_save_after_refresh_from_db(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        other = Task.objects.get(pk=self.task.pk)
+        other.status = Task.STATUS_DONE
+        other.save()
+
+        stale.refresh_from_db()
+        stale.status = Task.STATUS_IN_PROGRESS
+        stale.save()
+        self.assertConsistent()
+
+    def test_concurrent_saves_in_transactions(self):
+        first = Task.objects.get(pk=self.task.pk)
+        second = Task.objects.get(pk=self.task.pk)
+        for task in (first, second):
+            # Both loaded the task as "todo"; the second must not count the
+            # completion again.
+            with transaction.atomic():
+                task.status = Task.STATUS_DONE
+                task.save()
+        self.assertConsistent()
+
+    def test_reconcile_repairs_drift(self):
+        Task.objects.filter(pk=self.task.pk).update(status=Task.STATUS_DONE)
+        self.assertNotEqual(diff_rollups(self.organization.pk), [])
+
+        with self.assertLogs("analytics.tasks", "WARNING"):
+            self.assertEqual(reconcile_rollups(), ["acme"])
+        self.assertConsistent()
+        self.assertEqual(reconcile_rollups(), [])
@@ -2,13 +2,20 @@ from django.urls import path
 
 from .views import (
     ActiveProjectsView,
+    AnalyticsCacheStatsView,
+    CumulativeFlowView,
+    CycleTimeView,
+    DashboardSummaryView,
+    LeadTimeView,
     RevenuePerMonthView,
     TaskCompletionRateView,
+    ThroughputView,
     UserProductivityView,
 )
 
 
 urlpatterns = [
+    path("summary/", DashboardSummaryView.as_view(), name="summary"),
     path("revenue-per-month/", RevenuePerMonthView.as_view(), name="revenue-per-month"),
     path("active-projects/", ActiveProjectsView.as_view(), name="active-projects"),
     path(
@@ -21,4 +28,9 @@ urlpatterns = [
         UserProductivityView.as_view(),
         name="user-productivity",
     ),
+    path("cycle-time/", CycleTimeView.as_view(), name="cycle-time"),
+    path("lead-time/", LeadTimeView.as_view(), name="lead-time"),
+    path("throughput/", ThroughputView.as_view(), name="throughput"),
+    path("cumulative-flow/", CumulativeFlowView.as_view(), name="cumulative-flow"),
+    path("cache-stats/", AnalyticsCacheStatsView.as_view(), name="cache-stats"),
 ]
@@ -1,98 +1,185 @@
 from datetime import date
 
-from django.db.models import Count, F, Q, Sum
-from rest_framework import permissions, response, views
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions, permissions, response, views
 
 from organizations.permissions import IsOrganizationMember
-from billing.models import Invoice
-from projects.models import Project
-from tasks.models import Task
+
+from . import flow
+from .cache import cache_stats, cached_analytics
+from .summary import (
+    SECTIONS,
+    dashboard_summary,
+    project_stats,
+    revenue_per_month,
+    task_stats,
+    user_productivity,
+)
 
 
 class RevenuePerMonthView(views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    read_replica_actions = ("get",)
 
+    @cached_analytics("revenue-per-month")
     def get(self, request, *args, **kwargs):
         org = getattr(request, "organization", None)
-
-        qs = (
-            Invoice.objects.filter(organization=org, status__in=[Invoice.STATUS_PENDING, Invoice.STATUS_PAID, Invoice.STATUS_OVERDUE])
-            .values(year=F("issue_date__year"), month=F("issue_date__month"))
-            .annotate(total=Sum("total_amount"))
-            .order_by("year", "month")
-        )
-
-        data = [
-            {"year": row["year"], "month": row["month"], "total": row["total"] or 0}
-            for row in qs
-        ]
-        return response.Response(data)
+        # Served from the incrementally maintained rollups (see analytics.rollups).
+        return response.Response(revenue_per_month(org))
 
 
 class ActiveProjectsView(views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    read_replica_actions = ("get",)
 
+    @cached_analytics("active-projects")
     def get(self, request, *args, **kwargs):
         org = getattr(request, "organization", None)
-        today = date.today()
-
-        count_active = Project.objects.filter(
-            organization=org,
-            status__in=[Project.STATUS_ACTIVE, Project.STATUS_PLANNED],
-        ).count()
-        count_overdue = Project.objects.filter(
-            organization=org,
-            end_date__lt=today,
-            status__in=[Project.STATUS_PLANNED, Project.STATUS_ACTIVE],
-        ).count()
-
-        return response.Response(
-            {
-                "active_projects": count_active,
-                "overdue_projects": count_overdue,
-            }
-        )
+        return response.Response(project_stats(org))
 
 
 class TaskCompletionRateView(views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    read_replica_actions = ("get",)
 
+    @cached_analytics("task-completion-rate")
     def get(self, request, *args, **kwargs):
         org = getattr(request, "organization", None)
+        return response.Response(task_stats(org))
 
-        total = Task.objects.filter(organization=org).count()
-        done = Task.objects.filter(organization=org, status=Task.STATUS_DONE).count()
 
-        rate = (done / total) * 100 if total > 0 else 0.0
+class UserProductivityView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    read_replica_actions = ("get",)
 
-        return response.Response(
-            {
-                "total_tasks": total,
-                "completed_tasks": done,
-                "completion_rate": rate,
-            }
-        )
+    @cached_analytics("user-productivity")
+    def get(self, request, *args, **kwargs):
+        org = getattr(request, "organization", None)
+        return response.Response(user_productivity(org))
 
 
-class UserProductivityView(views.APIView):
+class DashboardSummaryView(views.APIView):
+    """
+    All dashboard sections in one response. `?include=projects,tasks`
+    limits the response (and the queries run) to the listed sections.
+    """
+
     permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    read_replica_actions = ("get",)
 
+    @cached_analytics("summary")
     def get(self, request, *args, **kwargs):
         org = getattr(request, "organization", None)
 
-        qs = (
-            Task.objects.filter(organization=org, status=Task.STATUS_DONE, assignee__isnull=False)
-            .values(user_id=F("assignee"))
-            .annotate(completed_tasks=Count("id"))
-            .order_by("-completed_tasks")
-        )
-
-        data = [
-            {
-                "user_id": row["user_id"],
-                "completed_tasks": row["completed_tasks"],
-            }
-            for row in qs
-        ]
-        return response.Response(data)
+        include = request.query_params.get("include")
+        if include:
+            sections = [name.strip() for name in include.split(",") if name.strip()]
+            unknown = sorted(set(sections) - set(SECTIONS))
+            if unknown:
+                raise exceptions.ValidationError(
+                    {"include": f"Unknown sections: {', '.join(unknown)}. Choose from {', '.join(SECTIONS)}."}
+                )
+        else:
+            sections = SECTIONS
 
+        return response.Response(dashboard_summary(org, sections))
+
+
+class FlowMetricView(views.APIView):
+    """
+    Base for the task flow metrics computed from TaskStatusTransition.
+
+    Accepts `?project=<id>` and an inclusive `?since=`/`?until=` date window
+    (ISO dates).
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    read_replica_actions = ("get",)
+    project_required = False
+
+    def _date_param(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise exceptions.ValidationError({name: "Expected a date in YYYY-MM-DD format."})
+
+    def _project_param(self, request):
+        value = request.query_params.get("project")
+        if not value:
+            if self.project_required:
+                raise exceptions.ValidationError({"project": "This parameter is required."})
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise exceptions.ValidationError({"project": "Expected a project id."})
+
+    def check_window(self, since, until):
+        """
+        Hook for metrics whose cost grows with the requested window.
+        """
+
+    def respond(self, request, metric):
+        org = getattr(request, "organization", None)
+        project_id = self._project_param(request)
+        since = self._date_param(request, "since")
+        until = self._date_param(request, "until")
+        self.check_window(since, until)
+        transitions = flow.load_transitions(org, project_id)
+        return response.Response(metric(transitions, since=since, until=until))
+
+
+class CycleTimeView(FlowMetricView):
+    @cached_analytics("cycle-time")
+    def get(self, request, *args, **kwargs):
+        return self.respond(request, flow.cycle_time)
+
+
+class LeadTimeView(FlowMetricView):
+    @cached_analytics("lead-time")
+    def get(self, request, *args, **kwargs):
+        return self.respond(request, flow.lead_time)
+
+
+class ThroughputView(FlowMetricView):
+    @cached_analytics("throughput")
+    def get(self, request, *args, **kwargs):
+        return self.respond(request, flow.throughput_per_week)
+
+
+class CumulativeFlowView(FlowMetricView):
+    """
+    One row per day of the window, so the window is limited: `until` may
+    not lie in the future and at most settings.CUMULATIVE_FLOW_MAX_DAYS
+    days may be requested. Without `since` the window starts at the
+    project's first transition.
+    """
+
+    project_required = True
+
+    def check_window(self, since, until):
+        today = timezone.localdate()
+        if until is not None and until > today:
+            raise exceptions.ValidationError({"until": "Cannot be in the future."})
+        max_days = getattr(settings, "CUMULATIVE_FLOW_MAX_DAYS", 731)
+        if since is not None and ((until or today) - since).days + 1 > max_days:
+            raise exceptions.ValidationError({"since": f"The window may cover at most {max_days} days."})
+
+    @cached_analytics("cumulative-flow")
+    def get(self, request, *args, **kwargs):
+        return self.respond(request, flow.cumulative_flow)
+
+
+class AnalyticsCacheStatsView(views.APIView):
+    """
+    Hit/miss counters of the analytics response cache, for monitoring.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return response.Response(cache_stats())
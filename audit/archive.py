@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import datetime
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from .models import AuditLog, AuditRetentionPolicy
+from .partitions import (
+    add_months,
+    drop_month,
+    is_partitioned,
+    month_bounds,
+    month_start,
+    partition_months,
+)
+
+
+ARCHIVE_FIELDS = (
+    "id",
+    "created_at",
+    "organization_id",
+    "user_id",
+    "action",
+    "model_name",
+    "object_id",
+    "before",
+    "after",
+    "changes",
+)
+
+
+def archive_root() -> Path:
+    return Path(getattr(settings, "AUDIT_ARCHIVE_ROOT", Path(settings.BASE_DIR) / "audit_archive"))
+
+
+def archive_path(organization_id: Optional[int], month: datetime.date, part: int = 1) -> Path:
+    """
+    Archive file of one organization's entries of `month`. Runs archiving
+    more entries of a month already archived (e.g. late deliveries) add
+    parts: <YYYY-MM>.jsonl.gz, then <YYYY-MM>.2.jsonl.gz, and so on.
+    """
+
+    folder = f"org-{organization_id}" if organization_id is not None else "org-none"
+    suffix = "" if part == 1 else f".{part}"
+    return archive_root() / folder / f"{month:%Y-%m}{suffix}.jsonl.gz"
+
+
+def retention_days(organization_id: Optional[int]) -> Optional[int]:
+    """
+    Days an organization keeps its audit entries online; None keeps them
+    forever. Falls back to AUDIT_LOG_RETENTION_DAYS without a policy.
+    """
+
+    default = getattr(settings, "AUDIT_LOG_RETENTION_DAYS", None)
+    if organization_id is None:
+        return default
+    policy = AuditRetentionPolicy.objects.filter(organization_id=organization_id).first()
+    if policy is None:
+        return default
+    return policy.retention_days
+
+
+def export_entries(queryset, path: Path) -> int:
+    """
+    Write the entries of `queryset` to `path` as gzipped JSON lines, one
+    entry per line, oldest first. The file is written under a temporary
+    name and linked into place, so a crash never leaves a truncated archive
+    and an existing one is never overwritten (FileExistsError).
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(handle, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as stream:
+            for row in queryset.order_by("created_at", "id").values(*ARCHIVE_FIELDS).iterator(chunk_size=2000):
+                stream.write(json.dumps(row, cls=DjangoJSONEncoder))
+                stream.write("\n")
+                count += 1
+        os.link(temporary, path)
+    finally:
+        os.unlink(temporary)
+    return count
+
+
+def _organization_entries(entries, organization_id: Optional[int]):
+    if organization_id is None:
+        return entries.filter(organization__isnull=True)
+    return entries.filter(organization_id=organization_id)
+
+
+def _export_month(entries, organization_id: Optional[int], month: datetime.date) -> int:
+    part = 1
+    while True:
+        path = archive_path(organization_id, month, part)
+        if not path.exists():
+            try:
+                return export_entries(_organization_entries(entries, organization_id), path)
+            except FileExistsError:
+                # Another run took this part meanwhile.
+                pass
+        part += 1
+
+
+def archive_expired(using: str = DEFAULT_DB_ALIAS, now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+    """
+    Move audit entries past their organization's retention to cold storage.
+
+    Every closed month is checked once per organization with entries in it:
+    a month expires when it ended more than `retention_days` ago. Expired
+    entries are exported to `<AUDIT_ARCHIVE_ROOT>/org-<id>/<YYYY-MM>.jsonl.gz`
+    (or a further part of it, see archive_path) and only then removed;
+    when every organization of a month has expired the whole partition is
+    dropped instead of deleting rows.
+    """
+
+    now = now or timezone.now()
+    current = month_start(timezone.localtime(now).date())
+    summary = {"archived": 0, "files": 0, "partitions_dropped": 0}
+    retention: Dict[Optional[int], Optional[int]] = {}
+    partitioned = is_partitioned(using)
+
+    for month in partition_months(using):
+        if month >= current:
+            continue
+        start, end = month_bounds(month)
+        entries = AuditLog.objects.using(using).filter(created_at__gte=start, created_at__lt=end)
+        organizations = set(entries.order_by().values_list("organization_id", flat=True).distinct())
+
+        expired = []
+        for organization_id in organizations:
+            if organization_id not in retention:
+                retention[organization_id] = retention_days(organization_id)
+            days = retention[organization_id]
+            if days is not None and end <= now - datetime.timedelta(days=days):
+                expired.append(organization_id)
+
+        for organization_id in expired:
+            summary["archived"] += _export_month(entries, organization_id, month)
+            summary["files"] += 1
+
+        if len(expired) == len(organizations):
+            # Nothing left to keep. Empty partitions are only dropped once
+            # they are out of reach of late deliveries (e.g. CeleryAuditSink).
+            if organizations or (partitioned and month < add_months(current, -1)):
+                drop_month(month, using=using)
+                summary["partitions_dropped"] += 1
+        else:
+            for organization_id in expired:
+                _organization_entries(entries, organization_id).delete()
+
+    return summary
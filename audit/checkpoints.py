@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+
+from .history import Snapshot, replay, state_after
+from .models import AuditCheckpoint, AuditLog
+
+
+ENTRY_FIELDS = ("id", "created_at", "action", "model_name", "object_id", "before", "after", "changes")
+
+
+def checkpoint_interval() -> int:
+    """
+    Entries of an object between two checkpoints, the most a
+    reconstruction ever replays once checkpoints are up to date.
+    """
+
+    return getattr(settings, "AUDIT_CHECKPOINT_INTERVAL", 50)
+
+
+@dataclass
+class PointInTime:
+    """
+    State of an object at a moment, rebuilt from its audit trail.
+    """
+
+    # None when the object did not exist (deleted) at that moment.
+    state: Optional[Snapshot]
+    # Last entry at or before the moment.
+    entry_id: int
+    entry_at: datetime.datetime
+    # Entry id of the checkpoint the replay started from, if any.
+    checkpoint: Optional[int]
+    # Entries replayed on top of it.
+    replayed: int
+
+
+def _object_entries(organization_id: int, model_name: str, object_id: str, using: str):
+    return (
+        AuditLog.objects.using(using)
+        .filter(organization_id=organization_id, model_name=model_name, object_id=object_id)
+        .order_by("created_at", "id")
+        .only(*ENTRY_FIELDS)
+    )
+
+
+def _after(queryset, created_at: datetime.datetime, pk: int):
+    # Strictly after (created_at, pk) in the log's order.
+    return queryset.filter(Q(created_at__gt=created_at) | Q(id__gt=pk), created_at__gte=created_at)
+
+
+def state_at(
+    organization_id: int,
+    model_name: str,
+    object_id: str,
+    at: datetime.datetime,
+    using: str = DEFAULT_DB_ALIAS,
+) -> Optional[PointInTime]:
+    """
+    State of an object after every entry logged at or before `at`, or None
+    when its audit trail starts later.
+
+    Replays forward from the latest checkpoint at or before `at`. Without
+    one, replays the head of the history up to the next checkpoint, which
+    anchors entries older than any full snapshot. Either way at most one
+    checkpoint interval of entries is loaded, plus whatever was logged
+    since the last checkpoint run. Matches audit.history.full_states.
+    """
+
+    entries = _object_entries(organization_id, model_name, object_id, using)
+    checkpoints = AuditCheckpoint.objects.using(using).filter(
+        organization_id=organization_id, model_name=model_name, object_id=object_id
+    )
+
+    checkpoint = checkpoints.filter(created_at__lte=at).order_by("-created_at", "-entry_id").first()
+    if checkpoint is not None:
+        result = PointInTime(
+            state=checkpoint.state,
+            entry_id=checkpoint.entry_id,
+            entry_at=checkpoint.created_at,
+            checkpoint=checkpoint.entry_id,
+            replayed=0,
+        )
+        for entry in _after(entries, checkpoint.created_at, checkpoint.entry_id).filter(created_at__lte=at):
+            result.state = state_after(entry, result.state)
+            result.entry_id, result.entry_at = entry.pk, entry.created_at
+            result.replayed += 1
+        return result
+
+    following = checkpoints.filter(created_at__gt=at).order_by("created_at", "entry_id").first()
+    head = entries
+    if following is not None:
+        head = head.exclude(
+            Q(created_at__gt=following.created_at) | Q(created_at=following.created_at, id__gt=following.entry_id)
+        )
+    history = list(head)
+    applied = [entry for entry in history if entry.created_at <= at]
+    if not applied:
+        return None
+    states = replay(history, final=following.state if following is not None else None)
+    last = applied[-1]
+    return PointInTime(
+        state=states[last.pk][1],
+        entry_id=last.pk,
+        entry_at=last.created_at,
+        checkpoint=None,
+        replayed=len(history),
+    )
+
+
+def stale_objects(interval: int, using: str = DEFAULT_DB_ALIAS):
+    """
+    (organization_id, model_name, object_id) of objects with at least
+    `interval` entries after their latest checkpoint.
+    """
+
+    latest = AuditCheckpoint.objects.filter(
+        organization_id=OuterRef("organization_id"),
+        model_name=OuterRef("model_name"),
+        object_id=OuterRef("object_id"),
+    ).order_by("-created_at", "-entry_id")
+    return (
+        AuditLog.objects.using(using)
+        .filter(organization__isnull=False)
+        .annotate(
+            checkpoint_at=Subquery(latest.values("created_at")[:1]),
+            checkpoint_entry=Subquery(latest.values("entry_id")[:1]),
+        )
+        .filter(
+            Q(checkpoint_at__isnull=True)
+            | Q(created_at__gt=F("checkpoint_at"))
+            | Q(created_at=F("checkpoint_at"), id__gt=F("checkpoint_entry"))
+        )
+        .order_by()
+        .values_list("organization_id", "model_name", "object_id")
+        .annotate(pending=Count("id"))
+        .filter(pending__gte=interval)
+    )
+
+
+def checkpoint_object(
+    organization_id: int, model_name: str, object_id: str, interval: int, using: str = DEFAULT_DB_ALIAS
+) -> int:
+    """
+    Add the missing checkpoints of one object, one every `interval`
+    entries after its latest. Returns the number created.
+    """
+
+    entries = _object_entries(organization_id, model_name, object_id, using)
+    latest = (
+        AuditCheckpoint.objects.using(using)
+        .filter(organization_id=organization_id, model_name=model_name, object_id=object_id)
+        .order_by("-created_at", "-entry_id")
+        .first()
+    )
+
+    checkpoints: List[AuditCheckpoint] = []
+
+    def add(entry: AuditLog, state: Optional[Snapshot]) -> None:
+        checkpoints.append(
+            AuditCheckpoint(
+                organization_id=organization_id,
+                model_name=model_name,
+                object_id=object_id,
+                entry_id=entry.pk,
+                created_at=entry.created_at,
+                state=state,
+            )
+        )
+
+    if latest is None:
+        # First checkpoints: replay the whole history, which also resolves
+        # entries older than any full snapshot.
+        history = list(entries)
+        states = replay(history)
+        for index in range(interval - 1, len(history), interval):
+            add(history[index], states[history[index].pk][1])
+    else:
+        state = latest.state
+        for index, entry in enumerate(_after(entries, latest.created_at, latest.entry_id).iterator()):
+            state = state_after(entry, state)
+            if (index + 1) % interval == 0:
+                add(entry, state)
+
+    with transaction.atomic(using=using):
+        AuditCheckpoint.objects.using(using).bulk_create(checkpoints, ignore_conflicts=True)
+    return len(checkpoints)
+
+
+def build_checkpoints(using: str = DEFAULT_DB_ALIAS, interval: Optional[int] = None) -> int:
+    """
+    Bring the checkpoints of every object on a database up to date.
+    """
+
+    interval = interval or checkpoint_interval()
+    created = 0
+    for organization_id, model_name, object_id, _ in list(stale_objects(interval, using=using)):
+        created += checkpoint_object(organization_id, model_name, object_id, interval, using=using)
+    return created
+
+
+def verify_object(
+    organization_id: int, model_name: str, object_id: str, using: str = DEFAULT_DB_ALIAS
+) -> List[str]:
+    """
+    Differences between checkpoint-based reconstructions of an object and
+    the states replayed from its complete history, at every logged moment.
+    """
+
+    history = list(_object_entries(organization_id, model_name, object_id, using))
+    states = replay(history)
+    label = f"{model_name} {object_id}"
+    problems = []
+
+    for checkpoint in AuditCheckpoint.objects.using(using).filter(
+        organization_id=organization_id, model_name=model_name, object_id=object_id
+    ):
+        if checkpoint.entry_id in states and checkpoint.state != states[checkpoint.entry_id][1]:
+            problems.append(f"{label}: checkpoint at entry {checkpoint.entry_id} differs from its history")
+
+    # The last entry of each moment defines the state at that moment.
+    last_at = {entry.created_at: entry for entry in history}
+    for at, entry in last_at.items():
+        rebuilt = state_at(organization_id, model_name, object_id, at, using=using)
+        if rebuilt is None or rebuilt.state != states[entry.pk][1]:
+            problems.append(f"{label}: state at {at.isoformat()} (entry {entry.pk}) does not match")
+    return problems
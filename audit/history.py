@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import AuditLog
+
+
+Snapshot = Dict[str, Any]
+# field -> [old value, new value]
+ChangeSet = Dict[str, List[Any]]
+
+
+def audit_storage_mode() -> str:
+    """
+    "diff" (updates store only changed fields) or "full" (complete
+    before/after snapshots for every entry).
+    """
+
+    return getattr(settings, "AUDIT_LOG_STORAGE", "diff")
+
+
+def diff_snapshots(before: Optional[Snapshot], after: Optional[Snapshot]) -> ChangeSet:
+    """
+    Fields whose value differs between two snapshots, as [old, new] pairs.
+    """
+
+    before, after = before or {}, after or {}
+    return {
+        name: [before.get(name), after.get(name)]
+        for name in sorted(set(before) | set(after))
+        if before.get(name) != after.get(name)
+    }
+
+
+def is_full(entry: AuditLog) -> bool:
+    """
+    Whether an entry carries complete snapshots rather than a change set.
+    """
+
+    return entry.changes is None
+
+
+def state_after(entry: AuditLog, previous: Optional[Snapshot]) -> Optional[Snapshot]:
+    if entry.action == AuditLog.ACTION_DELETE:
+        return None
+    if is_full(entry):
+        return entry.after
+    state = dict(previous or {})
+    state.update({name: values[1] for name, values in entry.changes.items()})
+    return state
+
+
+def state_before(entry: AuditLog, following: Optional[Snapshot]) -> Optional[Snapshot]:
+    if entry.action == AuditLog.ACTION_CREATE:
+        return None
+    if is_full(entry):
+        return entry.before
+    state = dict(following or {})
+    state.update({name: values[0] for name, values in entry.changes.items()})
+    return state
+
+
+def replay(
+    history: List[AuditLog], final: Optional[Snapshot] = None
+) -> Dict[int, Tuple[Optional[Snapshot], Optional[Snapshot]]]:
+    """
+    Full (before, after) of every entry in one object's history, ordered
+    oldest first. States are rolled forward from the last full snapshot
+    and, for entries older than any (e.g. auditing started after the
+    object was created), backward from the next one. `final`, when known
+    (e.g. from a checkpoint), is the state after the last entry.
+    """
+
+    states: Dict[int, Tuple[Optional[Snapshot], Optional[Snapshot]]] = {}
+    known = False
+    current: Optional[Snapshot] = None
+    for entry in history:
+        known = known or is_full(entry) or entry.action == AuditLog.ACTION_CREATE
+        before = entry.before if is_full(entry) else current
+        current = state_after(entry, current)
+        if known:
+            states[entry.pk] = (before, current)
+
+    following: Optional[Snapshot] = final
+    for entry in reversed(history):
+        if entry.pk in states:
+            following = states[entry.pk][0]
+            continue
+        before = state_before(entry, following)
+        after = following if following is not None else state_after(entry, None)
+        states[entry.pk] = (before, after)
+        following = before
+    return states
+
+
+def full_states(entries: Iterable[AuditLog]) -> Dict[int, Tuple[Optional[Snapshot], Optional[Snapshot]]]:
+    """
+    Full (before, after) snapshots of the given entries, keyed by entry id.
+    Loads the history of all their objects in a single query.
+    """
+
+    entries = list(entries)
+    objects = {(entry.model_name, entry.object_id) for entry in entries}
+    if not objects:
+        return {}
+    condition = Q()
+    for model_name, object_id in objects:
+        condition |= Q(model_name=model_name, object_id=object_id)
+
+    histories: Dict[Tuple[str, str], List[AuditLog]] = defaultdict(list)
+    using = entries[0]._state.db
+    for entry in (
+        AuditLog.objects.using(using)
+        .filter(condition, organization_id__in={entry.organization_id for entry in entries})
+        .order_by("created_at", "id")
+        .only("id", "action", "model_name", "object_id", "before", "after", "changes")
+    ):
+        histories[(entry.model_name, entry.object_id)].append(entry)
+
+    states: Dict[int, Tuple[Optional[Snapshot], Optional[Snapshot]]] = {}
+    for history in histories.values():
+        states.update(replay(history))
+    return {entry.pk: states.get(entry.pk, (entry.before, entry.after)) for entry in entries}
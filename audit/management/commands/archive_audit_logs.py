@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from audit.tasks import archive_audit_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming audit log partitions and move entries past their "
+        "organization's retention to compressed JSONL archives "
+        "(the archive_audit_logs Celery task, run in-process)."
+    )
+
+    def handle(self, *args, **options):
+        for alias, result in archive_audit_logs().items():
+            created = ", ".join(result["partitions_created"]) or "none"
+            self.stdout.write(
+                f"{alias}: archived {result['archived']} entries into {result['files']} files, "
+                f"dropped {result['partitions_dropped']} partitions, created partitions: {created}"
+            )
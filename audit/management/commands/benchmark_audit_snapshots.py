@@ -0,0 +1,110 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from audit.snapshots import snapshot
+from billing.models import Invoice
+from organizations.models import Organization
+from projects.models import Project
+from tasks.models import Task
+
+
+def reflective_snapshot(instance):
+    """
+    The previous AuditLogMixin._serialize_instance, kept as the baseline.
+    """
+
+    data = {}
+    for field in instance._meta.fields:
+        name = field.name
+        value = getattr(instance, name)
+        if isinstance(field, (models.ForeignKey, models.OneToOneField)):
+            value = getattr(value, "pk", None)
+        elif isinstance(field, (models.DateTimeField, models.DateField)):
+            value = value.isoformat() if value else None
+        elif isinstance(field, models.DecimalField):
+            value = str(value) if value is not None else None
+        data[name] = value
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark of the per-write audit snapshot overhead: the previous "
+        "reflective serializer plus re-fetch versus the compiled snapshots. "
+        "Runs against throwaway rows inside a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        with transaction.atomic():
+            organization = Organization.objects.create(name="Benchmark", slug="audit-benchmark")
+            project = Project.objects.create(organization=organization, name="Benchmark")
+            task = Task.objects.create(organization=organization, project=project, title="Benchmark")
+            invoice = Invoice.objects.create(
+                organization=organization,
+                number="BENCH-1",
+                client_name="Benchmark",
+                client_email="bench@example.com",
+                issue_date=timezone.localdate(),
+                due_date=timezone.localdate(),
+                total_amount=Decimal("10.00"),
+            )
+
+            for label, instance in (("Task", task), ("Invoice", invoice)):
+                model = type(instance)
+                fresh = model.objects.get(pk=instance.pk)
+                with CaptureQueriesContext(connection) as reflective_queries:
+                    reflective_snapshot(fresh)
+                fresh = model.objects.get(pk=instance.pk)
+                with CaptureQueriesContext(connection) as compiled_queries:
+                    snapshot(fresh)
+                # File fields used to leak FieldFile objects, which JSONField
+                # cannot store; the compiled snapshot keeps their name.
+                old, new = reflective_snapshot(fresh), snapshot(fresh)
+                differing = sorted(
+                    name for name in new if old[name] != new[name] and not hasattr(old[name], "storage")
+                )
+                if differing:
+                    self.stderr.write(f"{label}: snapshots differ in {', '.join(differing)}")
+
+                reflective = self._time(reflective_snapshot, fresh, iterations)
+                compiled = self._time(snapshot, fresh, iterations)
+                self.stdout.write(
+                    f"{label} snapshot: reflective {reflective:.2f} us "
+                    f"({len(reflective_queries)} queries on a fresh instance), "
+                    f"compiled {compiled:.2f} us ({len(compiled_queries)} queries), "
+                    f"{reflective / compiled:.1f}x"
+                )
+
+            # Audit work of one update: previously a re-fetch through
+            # get_object() plus two reflective snapshots, now two compiled ones.
+            rounds = max(iterations // 20, 1)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                reflective_snapshot(Task.objects.get(pk=task.pk))
+                reflective_snapshot(task)
+            before = (time.perf_counter() - start) / rounds * 1e6
+            start = time.perf_counter()
+            for _ in range(rounds):
+                snapshot(task)
+                snapshot(task)
+            after = (time.perf_counter() - start) / rounds * 1e6
+            self.stdout.write(
+                f"Per-update audit overhead: before {before:.1f} us, after {after:.1f} us"
+            )
+
+            transaction.set_rollback(True)
+
+    def _time(self, function, instance, iterations: int) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function(instance)
+        return (time.perf_counter() - start) / iterations * 1e6
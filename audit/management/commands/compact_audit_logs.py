@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from audit.history import diff_snapshots
+from audit.models import AuditLog
+from organizations.sharding import shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite update entries stored with full before/after snapshots into "
+        "diff-only change sets. Creates and deletes are left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the entries that would be compacted.",
+        )
+
+    def handle(self, *args, **options):
+        for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]:
+            compacted = self._compact(alias, options["batch_size"], options["dry_run"])
+            verb = "would compact" if options["dry_run"] else "compacted"
+            self.stdout.write(f"{alias}: {verb} {compacted} entries")
+
+    def _compact(self, alias: str, batch_size: int, dry_run: bool) -> int:
+        pending = AuditLog.objects.using(alias).filter(
+            action=AuditLog.ACTION_UPDATE, changes__isnull=True
+        )
+        if dry_run:
+            return pending.count()
+
+        compacted = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                pending.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("id", "before", "after", "changes")[:batch_size]
+            )
+            if not batch:
+                return compacted
+            for entry in batch:
+                entry.changes = diff_snapshots(entry.before, entry.after)
+                entry.before = entry.after = None
+            with transaction.atomic(using=alias):
+                AuditLog.objects.using(alias).bulk_update(batch, ["changes", "before", "after"])
+            compacted += len(batch)
+            last_pk = batch[-1].pk
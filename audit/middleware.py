@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import logging
+
+from django.http import HttpRequest
+
+from .sinks import finish_request_buffer, get_audit_sink, start_request_buffer
+
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBufferMiddleware:
+    """
+    Collect the audit entries committed while handling a request and hand
+    them to the audit sink in one batch once the view has finished.
+
+    The changes they describe are committed by then, so a failing sink is
+    logged rather than turning the finished response into an error.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        token = start_request_buffer()
+        try:
+            return self.get_response(request)
+        finally:
+            entries = finish_request_buffer(token)
+            if entries:
+                try:
+                    get_audit_sink().write(entries)
+                except Exception:
+                    logger.exception(
+                        "Could not write %d audit entries of %s %s",
+                        len(entries),
+                        request.method,
+                        request.path,
+                    )
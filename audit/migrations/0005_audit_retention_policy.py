@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_audit_change_sets'),
+        ('organizations', '0002_tenantshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditRetentionPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('retention_days', models.PositiveIntegerField(blank=True, help_text='Leave empty to keep entries forever.', null=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='audit_retention', to='organizations.organization')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,123 @@
+import datetime
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+
+PARTITIONS_AHEAD = 2
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _aware(month):
+    return timezone.make_aware(datetime.datetime.combine(month, datetime.time.min))
+
+
+def partition_auditlog(apps, schema_editor):
+    """
+    Turn audit_auditlog into a table range-partitioned by month on
+    created_at (PostgreSQL only; other backends keep a single table and
+    audit.partitions treats months as logical periods).
+
+    The primary key becomes (id, created_at), as PostgreSQL requires the
+    partition key in unique constraints; ids stay unique through their
+    sequence, so Django keeps using `id` alone.
+    """
+
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    AuditLog = apps.get_model("audit", "AuditLog")
+    Organization = apps.get_model("organizations", "Organization")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    table = AuditLog._meta.db_table
+    old_table = f"{table}_unpartitioned"
+    sequence = f"{table}_partitioned_id_seq"
+    columns = (
+        '"id", "created_at", "updated_at", "action", "model_name", "object_id", '
+        '"before", "after", "changes", "organization_id", "user_id"'
+    )
+
+    with connection.cursor() as cursor:
+        # Unapplying leaves the partitioned table in place; nothing to redo.
+        cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [table])
+        if cursor.fetchone() is not None:
+            return
+
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{old_table}"')
+        cursor.execute(f'ALTER INDEX IF EXISTS "{table}_pkey" RENAME TO "{old_table}_pkey"')
+        cursor.execute(f'CREATE SEQUENCE "{sequence}"')
+        cursor.execute(
+            f"""
+            CREATE TABLE "{table}" (
+                "id" bigint NOT NULL DEFAULT nextval('"{sequence}"'),
+                "created_at" timestamp with time zone NOT NULL,
+                "updated_at" timestamp with time zone NOT NULL,
+                "action" varchar(20) NOT NULL,
+                "model_name" varchar(255) NOT NULL,
+                "object_id" varchar(64) NOT NULL,
+                "before" jsonb NULL,
+                "after" jsonb NULL,
+                "changes" jsonb NULL,
+                "organization_id" bigint NULL
+                    REFERENCES "{Organization._meta.db_table}" ("id") DEFERRABLE INITIALLY DEFERRED,
+                "user_id" bigint NULL
+                    REFERENCES "{User._meta.db_table}" ("id") DEFERRABLE INITIALLY DEFERRED,
+                PRIMARY KEY ("id", "created_at")
+            ) PARTITION BY RANGE ("created_at")
+            """
+        )
+
+        # One partition per month from the oldest entry to a little ahead of
+        # today, plus a default partition so an insert never fails for want
+        # of one (audit.partitions.ensure_partitions keeps months ahead).
+        cursor.execute(f'SELECT MIN("created_at") FROM "{old_table}"')
+        oldest = cursor.fetchone()[0]
+        current = timezone.localdate().replace(day=1)
+        month = timezone.localtime(oldest).date().replace(day=1) if oldest else current
+        month = min(month, current)
+        last = _add_months(current, PARTITIONS_AHEAD)
+        while month <= last:
+            cursor.execute(
+                f'CREATE TABLE "{table}_p{month:%Y%m}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [_aware(month), _aware(_add_months(month, 1))],
+            )
+            month = _add_months(month, 1)
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        cursor.execute(f'INSERT INTO "{table}" ({columns}) SELECT {columns} FROM "{old_table}"')
+        # Run the deferred foreign key checks of the copy now: PostgreSQL
+        # refuses to index a table with pending trigger events.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            f"SELECT setval('\"{sequence}\"', COALESCE(MAX(\"id\"), 0) + 1, false) FROM \"{table}\""
+        )
+        cursor.execute(f'DROP TABLE "{old_table}"')
+        cursor.execute(f'ALTER SEQUENCE "{sequence}" RENAME TO "{table}_id_seq"')
+        cursor.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY "{table}"."id"')
+
+    # Same indexes as before, now defined on the partitioned parent and
+    # inherited by every partition.
+    for statement in schema_editor._model_indexes_sql(AuditLog):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0005_audit_retention_policy"),
+        ("organizations", "0002_tenantshard"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The partitioned table is schema-compatible with the plain one, so
+        # going back only means leaving it in place.
+        migrations.RunPython(partition_auditlog, migrations.RunPython.noop),
+    ]
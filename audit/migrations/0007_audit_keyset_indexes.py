@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0006_partition_auditlog'),
+        ('organizations', '0002_tenantshard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='auditlog_org_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='auditlog_object_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='auditlog_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['model_name', 'object_id', 'created_at', 'id'], name='auditlog_object_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['organization', 'action', 'created_at', 'id'], name='auditlog_org_action_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='auditlog_user_idx'),
+        ),
+    ]
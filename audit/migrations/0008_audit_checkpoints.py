@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0007_audit_keyset_indexes'),
+        ('organizations', '0002_tenantshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(max_length=255)),
+                ('object_id', models.CharField(max_length=64)),
+                ('entry_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('state', models.JSONField(blank=True, null=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_checkpoints', to='organizations.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_name', 'object_id', 'created_at', 'entry_id'], name='auditcheckpoint_object_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model_name', 'object_id', 'entry_id'), name='auditcheckpoint_entry_unique')],
+            },
+        ),
+    ]
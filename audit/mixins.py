@@ -1,18 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.utils import timezone
 
+from .history import audit_storage_mode, diff_snapshots
 from .models import AuditLog
+from .sinks import AuditEntry, get_audit_sink
+from .snapshots import snapshot
 
 
 class AuditLogMixin:
     """
     Reusable mixin for DRF viewsets to automatically log create/update/delete.
-    """
 
-    audit_log_model = AuditLog
+    Entries go to the configured audit sink (settings.AUDIT_LOG_SINK), which
+    by default writes them in one batch per request after commit.
+    """
 
     def _get_organization_for_instance(self, instance: models.Model):
         # Direct organization attribute
@@ -35,21 +40,37 @@ class AuditLogMixin:
     def _serialize_instance(self, instance: Optional[models.Model]) -> Optional[Dict[str, Any]]:
         if instance is None:
             return None
-        data: Dict[str, Any] = {}
-        for field in instance._meta.fields:
-            name = field.name
-            value = getattr(instance, name)
-            # Represent related fields by their primary key
-            if isinstance(field, (models.ForeignKey, models.OneToOneField)):
-                value = getattr(value, "pk", None)
-            # Convert datetime/date to ISO string for JSON serialization
-            elif isinstance(field, (models.DateTimeField, models.DateField)):
-                value = value.isoformat() if value else None
-            # Convert Decimal to string for JSON serialization
-            elif isinstance(field, models.DecimalField):
-                value = str(value) if value is not None else None
-            data[name] = value
-        return data
+        # Per-model function compiled once; see audit.snapshots.
+        return snapshot(instance)
+
+    def _audit_entry(
+        self,
+        *,
+        instance: models.Model,
+        action: str,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+    ) -> AuditEntry:
+        changes = None
+        if action == AuditLog.ACTION_UPDATE and audit_storage_mode() == "diff":
+            # Updates keep only the changed fields; creates and deletes keep
+            # full snapshots to anchor the reconstruction of the others.
+            changes = diff_snapshots(before, after)
+            before = after = None
+
+        user = getattr(self.request, "user", None)
+        organization = self._get_organization_for_instance(instance)
+        return {
+            "user_id": user.pk if user is not None and user.is_authenticated else None,
+            "organization_id": getattr(organization, "pk", None),
+            "action": action,
+            "model_name": instance._meta.label,
+            "object_id": str(getattr(instance, "pk", "")),
+            "before": before,
+            "after": after,
+            "changes": changes,
+            "created_at": timezone.now(),
+        }
 
     def _create_audit_log(
         self,
@@ -59,16 +80,14 @@ class AuditLogMixin:
         before: Optional[Dict[str, Any]],
         after: Optional[Dict[str, Any]],
     ) -> None:
-        AuditLogModel = self.audit_log_model
-        AuditLogModel.objects.create(
-            user=getattr(self.request, "user", None),
-            organization=self._get_organization_for_instance(instance),
-            action=action,
-            model_name=instance._meta.label,
-            object_id=str(getattr(instance, "pk", "")),
-            before=before,
-            after=after,
-        )
+        entry = self._audit_entry(instance=instance, action=action, before=before, after=after)
+        get_audit_sink().emit(entry, using=instance._state.db or DEFAULT_DB_ALIAS)
+
+    def _create_audit_logs(self, entries: List[AuditEntry], using: str = DEFAULT_DB_ALIAS) -> None:
+        # Entries built with _audit_entry for many changes at once, written
+        # by the sink in one batch.
+        if entries:
+            get_audit_sink().emit_many(entries, using=using)
 
     # Hooks
 
@@ -86,13 +105,11 @@ class AuditLogMixin:
         )
 
     def perform_update(self, serializer):
-        instance = self.get_object()
-        before = self._serialize_instance(instance)
-        # Check if instance was already saved (by subclass override)
-        if serializer.instance and serializer.instance.pk:
-            instance = serializer.instance
-        else:
-            instance = serializer.save()
+        # serializer.instance is the object update() just loaded through
+        # get_object(); snapshot it before saving rather than fetching and
+        # permission-checking it a second time.
+        before = self._serialize_instance(serializer.instance)
+        instance = serializer.save()
         self._create_audit_log(
             instance=instance,
             action=AuditLog.ACTION_UPDATE,
@@ -102,11 +119,13 @@ class AuditLogMixin:
 
     def perform_destroy(self, instance):
         before = self._serialize_instance(instance)
-        self._create_audit_log(
-            instance=instance,
-            action=AuditLog.ACTION_DELETE,
-            before=before,
-            after=None,
-        )
-        super().perform_destroy(instance)
+        # The entry is only released once the delete itself has committed.
+        with transaction.atomic(using=instance._state.db):
+            self._create_audit_log(
+                instance=instance,
+                action=AuditLog.ACTION_DELETE,
+                before=before,
+                after=None,
+            )
+            super().perform_destroy(instance)
 
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from core.models import TimeStampedModel
 
@@ -7,6 +8,9 @@ from core.models import TimeStampedModel
 class AuditLog(TimeStampedModel):
     """
     Stores before/after snapshots for important changes.
+
+    Partitioned by month on created_at (see audit.partitions); filter on
+    created_at to keep queries within the partitions of interest.
     """
 
     ACTION_CREATE = "create"
@@ -38,7 +42,78 @@ class AuditLog(TimeStampedModel):
     object_id = models.CharField(max_length=64)
     before = models.JSONField(null=True, blank=True)
     after = models.JSONField(null=True, blank=True)
+    # Diff-only updates store {field: [old, new]} here and leave before/after
+    # empty; see audit.history for rebuilding full snapshots.
+    changes = models.JSONField(null=True, blank=True)
+    # Time of the audited change, set by the producer: entries may be
+    # written well after it (see audit.sinks).
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-created_at"]
+        # Every index ends in (created_at, id), the keyset the API pages on
+        # (see audit.pagination), so filtered pages are plain range scans.
+        indexes = [
+            models.Index(fields=["organization", "-created_at", "-id"], name="auditlog_org_created_idx"),
+            # History of a single object, for rebuilding diff-only entries.
+            models.Index(fields=["model_name", "object_id", "created_at", "id"], name="auditlog_object_idx"),
+            models.Index(fields=["organization", "action", "created_at", "id"], name="auditlog_org_action_idx"),
+            models.Index(fields=["user", "created_at", "id"], name="auditlog_user_idx"),
+        ]
+
+
+class AuditRetentionPolicy(TimeStampedModel):
+    """
+    How long an organization's audit entries stay in the database before
+    they are archived to compressed JSONL files and removed (see
+    audit.archive). Organizations without a policy use
+    settings.AUDIT_LOG_RETENTION_DAYS.
+    """
+
+    organization = models.OneToOneField(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="audit_retention",
+    )
+    retention_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Leave empty to keep entries forever.",
+    )
+
 
+class AuditCheckpoint(models.Model):
+    """
+    Full state of one audited object right after a given AuditLog entry.
+
+    Written every AUDIT_CHECKPOINT_INTERVAL entries of the object by
+    audit.checkpoints.build_checkpoints, so rebuilding the object at any
+    point in time replays at most that many entries (see
+    audit.checkpoints.state_at). Purely derived data: safe to rebuild.
+    """
+
+    organization = models.ForeignKey(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="audit_checkpoints",
+    )
+    model_name = models.CharField(max_length=255)
+    object_id = models.CharField(max_length=64)
+    # Position of the entry in the log's (created_at, id) order. A plain
+    # id: the partitioned log has no single-column key to point a FK at.
+    entry_id = models.BigIntegerField()
+    created_at = models.DateTimeField()
+    # None when the entry deleted the object.
+    state = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_name", "object_id", "entry_id"], name="auditcheckpoint_entry_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["model_name", "object_id", "created_at", "entry_id"], name="auditcheckpoint_object_idx"
+            ),
+        ]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import Optional, Tuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# (created_at, id, reverse)
+Position = Tuple[object, int, bool]
+
+
+def encode_position(created_at, pk: int, reverse: bool = False) -> str:
+    """
+    Opaque token for a position in the (created_at, id) order of the log.
+    """
+
+    raw = f"{created_at.isoformat()}|{pk}|{int(reverse)}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+
+def decode_position(token: str) -> Position:
+    """
+    Inverse of encode_position; raises ValueError for malformed tokens.
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(token.encode("ascii")).decode("ascii")
+    except (UnicodeError, binascii.Error) as exc:
+        raise ValueError(str(exc)) from exc
+    created_at, pk, reverse = raw.split("|")
+    moment = parse_datetime(created_at)
+    if moment is None:
+        raise ValueError(f"Invalid position time: {created_at!r}")
+    return moment, int(pk), reverse == "1"
+
+
+class AuditLogCursorPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Each page is a range scan starting right after the previous page's
+    last entry, so it costs the same at any depth and needs no COUNT(*).
+    The opaque `cursor` parameter encodes that position; `next` and
+    `previous` links carry it.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        if position is None:
+            reverse = False
+        else:
+            created_at, pk, reverse = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(id__gt=pk), created_at__gte=created_at
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at
+                )
+        ordering = ("created_at", "id") if reverse else ("-created_at", "-id")
+        results = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Going back, there is always a page after this one (the one we
+        # came from); going forward, one before it unless this is the first.
+        self.has_next = has_more or reverse
+        self.has_previous = has_more if reverse else position is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request) -> int:
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                size = int(value)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def decode_cursor(self, request) -> Optional[Position]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return decode_position(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, entry, reverse: bool) -> str:
+        encoded = encode_position(entry.created_at, entry.pk, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
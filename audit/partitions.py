@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import datetime
+import re
+from typing import List
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+
+
+# AuditLog is range-partitioned by month on created_at. On PostgreSQL every
+# month is a native partition (audit_auditlog_pYYYYMM) of audit_auditlog,
+# set up by migration 0006; the planner prunes partitions outside a
+# created_at filter and retention drops whole partitions. Other backends
+# (SQLite in development) keep a single table and treat each month as a
+# logical period: the same functions work on created_at ranges there.
+
+TABLE = AuditLog._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: datetime.date):
+    """
+    [start, end) of a month as aware datetimes in the current timezone.
+    """
+
+    start = timezone.make_aware(datetime.datetime.combine(month, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(add_months(month, 1), datetime.time.min))
+    return start, end
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned(using: str = DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass", [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def partition_months(using: str = DEFAULT_DB_ALIAS) -> List[datetime.date]:
+    """
+    Months that currently hold (or may hold) audit entries, oldest first.
+    """
+
+    if is_partitioned(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = %s",
+                [TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        months = []
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                months.append(datetime.date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    bounds = AuditLog.objects.using(using).order_by("created_at").values_list("created_at", flat=True)
+    oldest = bounds.first()
+    if oldest is None:
+        return []
+    newest = bounds.last()
+    first = month_start(timezone.localtime(oldest).date())
+    last = month_start(timezone.localtime(newest).date())
+    months = [first]
+    while months[-1] < last:
+        months.append(add_months(months[-1], 1))
+    return months
+
+
+def ensure_partitions(using: str = DEFAULT_DB_ALIAS, ahead: int = None) -> List[str]:
+    """
+    Create the partitions for the current month and `ahead` months after it
+    (PostgreSQL only). Returns the names of partitions created.
+    """
+
+    if not is_partitioned(using):
+        return []
+    if ahead is None:
+        ahead = getattr(settings, "AUDIT_LOG_PARTITIONS_AHEAD", 2)
+
+    existing = set(partition_months(using))
+    current = month_start(timezone.localdate())
+    created = []
+    with connections[using].cursor() as cursor:
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if month in existing:
+                continue
+            start, end = month_bounds(month)
+            name = partition_name(month)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{TABLE}" '
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+            created.append(name)
+    return created
+
+
+def drop_month(month: datetime.date, using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Remove every entry of a month: detach and drop its partition on
+    PostgreSQL, delete the period's rows elsewhere.
+    """
+
+    if is_partitioned(using):
+        name = partition_name(month)
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(f'DROP TABLE "{name}"')
+        return
+
+    start, end = month_bounds(month)
+    AuditLog.objects.using(using).filter(created_at__gte=start, created_at__lt=end).delete()
@@ -1,9 +1,19 @@
 from rest_framework import serializers
 
+from core.fieldsets import SparseFieldsetSerializerMixin
+
 from .models import AuditLog
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
+class AuditLogSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    `before`/`after` are the stored snapshots, or the rebuilt full ones when
+    the view passes `full_states` in the context (see audit.history).
+    """
+
+    before = serializers.SerializerMethodField()
+    after = serializers.SerializerMethodField()
+
     class Meta:
         model = AuditLog
         fields = [
@@ -15,7 +25,21 @@ class AuditLogSerializer(serializers.ModelSerializer):
             "object_id",
             "before",
             "after",
+            "changes",
             "created_at",
         ]
         read_only_fields = fields
 
+    def _full_state(self, obj):
+        states = self.context.get("full_states")
+        if states is None or obj.pk not in states:
+            return None
+        return states[obj.pk]
+
+    def get_before(self, obj):
+        state = self._full_state(obj)
+        return obj.before if state is None else state[0]
+
+    def get_after(self, obj):
+        state = self._full_state(obj)
+        return obj.after if state is None else state[1]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from organizations.sharding import tenant_context
+
+from .models import AuditLog
+
+
+logger = logging.getLogger(__name__)
+
+# An audit entry is a dict of AuditLog attnames (user_id, organization_id,
+# action, model_name, object_id, before, after, created_at).
+AuditEntry = Dict[str, Any]
+
+# Entries of the current request whose transaction has committed, waiting
+# for the request to finish (see AuditBufferMiddleware).
+_request_buffer: contextvars.ContextVar[Optional[List[AuditEntry]]] = contextvars.ContextVar(
+    "audit_request_buffer", default=None
+)
+
+
+def start_request_buffer() -> contextvars.Token:
+    return _request_buffer.set([])
+
+
+def finish_request_buffer(token: contextvars.Token) -> List[AuditEntry]:
+    entries = _request_buffer.get() or []
+    _request_buffer.reset(token)
+    return entries
+
+
+def write_entries(entries: List[AuditEntry]) -> None:
+    """
+    Persist entries with one bulk INSERT per organization, each on that
+    organization's shard.
+    """
+
+    by_organization: Dict[Optional[int], List[AuditLog]] = defaultdict(list)
+    for entry in entries:
+        by_organization[entry["organization_id"]].append(AuditLog(**entry))
+    for organization_id, logs in by_organization.items():
+        if organization_id is None:
+            AuditLog.objects.using(DEFAULT_DB_ALIAS).bulk_create(logs)
+            continue
+        with tenant_context(organization_id):
+            AuditLog.objects.bulk_create(logs)
+
+
+class AuditSink:
+    """
+    Destination of the entries produced by AuditLogMixin.
+
+    `emit` is called right after the audited change, inside whatever
+    transaction made it (`emit_many` for several changes at once); `write`
+    persists entries for good.
+    """
+
+    def emit(self, entry: AuditEntry, using: str = DEFAULT_DB_ALIAS) -> None:
+        raise NotImplementedError
+
+    def emit_many(self, entries: List[AuditEntry], using: str = DEFAULT_DB_ALIAS) -> None:
+        for entry in entries:
+            self.emit(entry, using=using)
+
+    def write(self, entries: List[AuditEntry]) -> None:
+        write_entries(entries)
+
+
+class DirectAuditSink(AuditSink):
+    """
+    One INSERT per emit, immediately and in the caller's transaction.
+    """
+
+    def emit(self, entry: AuditEntry, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.write([entry])
+
+    def emit_many(self, entries: List[AuditEntry], using: str = DEFAULT_DB_ALIAS) -> None:
+        self.write(entries)
+
+
+class BufferedAuditSink(AuditSink):
+    """
+    Hold entries until the transaction of the audited change commits and
+    write each request's entries in a single batch when it finishes.
+
+    Entries are handed over through `transaction.on_commit`, so a rollback
+    (including of a savepoint) drops them together with the change itself.
+    Outside a request they are written as soon as their transaction
+    commits.
+    """
+
+    def emit(self, entry: AuditEntry, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.emit_many([entry], using=using)
+
+    def emit_many(self, entries: List[AuditEntry], using: str = DEFAULT_DB_ALIAS) -> None:
+        buffer = _request_buffer.get()
+        if buffer is not None:
+            transaction.on_commit(lambda: buffer.extend(entries), using=using)
+        else:
+            transaction.on_commit(lambda: self.write(entries), using=using)
+
+
+class CeleryAuditSink(BufferedAuditSink):
+    """
+    Buffered like BufferedAuditSink, but batches are queued for a Celery
+    worker instead of being inserted by the web process. Falls back to a
+    direct write when the broker is unavailable, so nothing is lost.
+    """
+
+    def write(self, entries: List[AuditEntry]) -> None:
+        from .tasks import write_audit_entries
+
+        try:
+            write_audit_entries.delay([serialize_entry(entry) for entry in entries])
+        except Exception:  # pragma: no cover - depends on the broker
+            logger.exception("Could not queue %d audit entries; writing them directly", len(entries))
+            super().write(entries)
+
+
+def serialize_entry(entry: AuditEntry) -> AuditEntry:
+    return {**entry, "created_at": entry["created_at"].isoformat()}
+
+
+def deserialize_entry(data: AuditEntry) -> AuditEntry:
+    return {**data, "created_at": parse_datetime(data["created_at"])}
+
+
+_sink: Optional[AuditSink] = None
+
+
+def get_audit_sink() -> AuditSink:
+    global _sink
+    if _sink is None:
+        path = getattr(settings, "AUDIT_LOG_SINK", "audit.sinks.BufferedAuditSink")
+        _sink = import_string(path)()
+    return _sink
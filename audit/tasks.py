@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from celery import shared_task
+from django.db import DEFAULT_DB_ALIAS
+
+from organizations.sharding import shard_aliases
+
+from .archive import archive_expired
+from .checkpoints import build_checkpoints
+from .partitions import ensure_partitions
+from .sinks import deserialize_entry, write_entries
+
+
+@shared_task
+def write_audit_entries(entries: List[Dict[str, Any]]) -> None:
+    """
+    Persist a batch of audit entries queued by CeleryAuditSink.
+    """
+
+    write_entries([deserialize_entry(entry) for entry in entries])
+
+
+@shared_task
+def archive_audit_logs() -> Dict[str, Dict[str, Any]]:
+    """
+    Daily maintenance of the audit log on every database: create upcoming
+    monthly partitions, then archive and drop entries past retention.
+    """
+
+    results = {}
+    for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]:
+        created = ensure_partitions(using=alias)
+        results[alias] = {"partitions_created": created, **archive_expired(using=alias)}
+    return results
+
+
+@shared_task
+def build_audit_checkpoints() -> Dict[str, int]:
+    """
+    Checkpoint every object that logged a full interval of entries since
+    its latest checkpoint, on every database.
+    """
+
+    return {alias: build_checkpoints(using=alias) for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]}
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from audit.models import AuditLog
+from organizations.models import Membership, Organization
+from projects.models import Project
+
+
+# Transactions really commit here, so the buffered entries reach the
+# middleware's flush.
+class AuditBufferMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        organization = Organization.objects.create(name="Acme", slug="acme")
+        Membership.objects.create(user=user, organization=organization, role="owner")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + str(RefreshToken.for_user(user).access_token),
+            HTTP_X_ORGANIZATION_SLUG=organization.slug,
+        )
+
+    def create_project(self):
+        return self.client.post("/api/v1/projects/projects/", {"name": "Launch"})
+
+    def test_entries_are_written_after_the_request(self):
+        response = self.create_project()
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            AuditLog.objects.filter(model_name="projects.Project", object_id=str(response.data["id"])).exists()
+        )
+
+    def test_failing_sink_does_not_fail_the_request(self):
+        with mock.patch("audit.sinks.write_entries", side_effect=DatabaseError("audit table unavailable")):
+            with self.assertLogs("audit.middleware", "ERROR"):
+                response = self.create_project()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Project.objects.filter(pk=response.data["id"]).exists())
+        self.assertFalse(AuditLog.objects.exists())
@@ -1,8 +1,19 @@
-from rest_framework import permissions, viewsets
+import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import exceptions, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from organizations.permissions import IsOrganizationMember, IsOwnerOrAdmin
 
+from .checkpoints import state_at
+from .export import CONTENT_TYPES, EXPORT_FORMATS, csv_stream, export_rows, ndjson_stream, resume_after
+from .history import full_states
 from .models import AuditLog
+from .pagination import AuditLogCursorPagination
 from .serializers import AuditLogSerializer
 
 
@@ -10,12 +21,142 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Read-only access to audit logs for the current organization.
     Restricted to organization owners/admins.
+
+    Diff-only updates carry their changed fields in `changes`; pass
+    `?full=true` to get complete before/after snapshots for every entry.
+
+    Filters: `?model_name=`, `?object_id=` (with model_name), `?user=`,
+    `?action=`, and `?since=` / `?until=` (ISO date or datetime, until
+    exclusive) bounding created_at; on PostgreSQL only the monthly
+    partitions in that range are scanned. Pages are keyset cursors over
+    (created_at, id), newest first (see AuditLogCursorPagination).
+
+    `export/` streams every matching entry, oldest first, as NDJSON or
+    `?output=csv`; `state/` rebuilds one object as of a past moment.
     """
 
     serializer_class = AuditLogSerializer
+    pagination_class = AuditLogCursorPagination
     permission_classes = [permissions.IsAuthenticated, IsOrganizationMember, IsOwnerOrAdmin]
 
     def get_queryset(self):
         org = getattr(self.request, "organization", None)
-        return AuditLog.objects.filter(organization=org)
+        queryset = AuditLog.objects.filter(organization=org)
+        params = self.request.query_params
+
+        model_name = params.get("model_name")
+        if model_name:
+            queryset = queryset.filter(model_name=model_name)
+        object_id = params.get("object_id")
+        if object_id:
+            if not model_name:
+                raise exceptions.ValidationError({"object_id": "Requires the model_name parameter."})
+            queryset = queryset.filter(object_id=object_id)
+        user = params.get("user")
+        if user:
+            if not user.isdigit():
+                raise exceptions.ValidationError({"user": "Expected a user id."})
+            queryset = queryset.filter(user_id=int(user))
+        action = params.get("action")
+        if action:
+            if action not in dict(AuditLog.ACTION_CHOICES):
+                raise exceptions.ValidationError(
+                    {"action": f"Expected one of: {', '.join(dict(AuditLog.ACTION_CHOICES))}."}
+                )
+            queryset = queryset.filter(action=action)
+
+        since = self._parse_moment("since")
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        until = self._parse_moment("until")
+        if until is not None:
+            queryset = queryset.filter(created_at__lt=until)
+        return queryset
+
+    def _parse_moment(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            moment = parse_datetime(value)
+            day = parse_date(value) if moment is None else None
+        except ValueError:
+            moment = day = None
+        if moment is None:
+            if day is None:
+                raise exceptions.ValidationError({param: "Expected an ISO date or datetime."})
+            moment = datetime.datetime.combine(day, datetime.time.min)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def get_serializer(self, *args, **kwargs):
+        full = self.request.query_params.get("full", "").lower() in ("1", "true", "yes")
+        if args and full:
+            instances = args[0] if kwargs.get("many") else [args[0]]
+            context = kwargs.setdefault("context", self.get_serializer_context())
+            context["full_states"] = full_states(instances)
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream the filtered log, oldest first, as NDJSON (default) or CSV
+        (`?output=csv`). Each entry carries a `cursor`; after a dropped
+        connection pass the last one received as `?after=` to resume.
+        """
+
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise exceptions.ValidationError({"output": f"Expected one of: {', '.join(EXPORT_FORMATS)}."})
+        try:
+            queryset = resume_after(self.get_queryset(), request.query_params.get("after"))
+        except ValueError:
+            raise exceptions.ValidationError({"after": "Invalid cursor."})
+        # The body is produced after the view returns, outside the tenant
+        # context the database router relies on: pin the alias now.
+        queryset = queryset.using(queryset.db)
+
+        rows = export_rows(queryset)
+        stream = csv_stream(rows) if output == "csv" else ndjson_stream(rows)
+        response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[output])
+        slug = request.organization.slug
+        response["Content-Disposition"] = (
+            f'attachment; filename="audit-{slug}-{timezone.localdate():%Y%m%d}.{output}"'
+        )
+        response["Cache-Control"] = "no-store"
+        return response
+
+    @action(detail=False, methods=["get"], url_path="state")
+    def state(self, request):
+        """
+        State of one object at `?at=` (ISO date or datetime, default now),
+        rebuilt from its audit trail: `?model_name=tasks.Task&object_id=42`.
+        `state` is null if the object was deleted at that moment.
+        """
+
+        params = request.query_params
+        model_name, object_id = params.get("model_name"), params.get("object_id")
+        missing = [name for name in ("model_name", "object_id") if not params.get(name)]
+        if missing:
+            raise exceptions.ValidationError({name: "This parameter is required." for name in missing})
+        at = self._parse_moment("at") or timezone.now()
 
+        result = state_at(
+            request.organization.pk, model_name, object_id, at, using=AuditLog.objects.all().db
+        )
+        if result is None:
+            raise exceptions.NotFound("No audit history for this object at that time.")
+        return Response(
+            {
+                "model_name": model_name,
+                "object_id": object_id,
+                "at": at,
+                "exists": result.state is not None,
+                "state": result.state,
+                "entry": result.entry_id,
+                "entry_at": result.entry_at,
+                "checkpoint": result.checkpoint,
+                "replayed": result.replayed,
+            }
+        )
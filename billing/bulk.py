@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from audit.snapshots import Snapshot, snapshot
+
+from .models import Invoice, InvoiceItem
+from .totals import recalculate_totals
+
+
+# Fields a batch may set on an item.
+ITEM_FIELDS = ("description", "quantity", "unit_price")
+
+
+def bulk_item_limit() -> int:
+    """
+    Most creates, updates and deletes one batch may contain in total.
+    """
+
+    return getattr(settings, "INVOICE_ITEMS_BULK_MAX", 1000)
+
+
+@dataclass
+class ItemBatchResult:
+    created: List[InvoiceItem] = field(default_factory=list)
+    updated: List[InvoiceItem] = field(default_factory=list)
+    deleted: List[InvoiceItem] = field(default_factory=list)
+    # Snapshots of the touched items by id (None: did not exist).
+    before: Dict[str, Optional[Snapshot]] = field(default_factory=dict)
+    after: Dict[str, Optional[Snapshot]] = field(default_factory=dict)
+
+
+def apply_item_batch(
+    invoice: Invoice,
+    create: List[Dict[str, Any]],
+    update: List[Dict[str, Any]],
+    delete: List[int],
+) -> ItemBatchResult:
+    """
+    Create, update and delete items of one invoice in a single
+    transaction: one INSERT, one UPDATE and one DELETE whatever the batch
+    size, then one total recalculation (see billing.totals).
+
+    `update` entries hold the item "id" and the fields to change; every id
+    must belong to `invoice` (the caller validates the batch beforehand).
+    """
+
+    using = invoice._state.db
+    result = ItemBatchResult()
+    with transaction.atomic(using=using):
+        touched = [entry["id"] for entry in update] + list(delete)
+        existing = {
+            item.pk: item
+            for item in InvoiceItem.objects.using(using)
+            .select_for_update()
+            .filter(invoice=invoice, pk__in=touched)
+            .order_by("pk")
+        }
+        for item in existing.values():
+            item.invoice = invoice
+        missing = set(touched) - set(existing)
+        if missing:
+            # Deleted by a concurrent request since validation.
+            raise InvoiceItem.DoesNotExist(f"Items {sorted(missing)} no longer exist.")
+
+        for pk in delete:
+            result.before[str(pk)] = snapshot(existing[pk])
+            result.after[str(pk)] = None
+        if delete:
+            InvoiceItem.objects.using(using).filter(pk__in=delete).delete()
+            result.deleted = [existing[pk] for pk in sorted(delete)]
+
+        if update:
+            now = timezone.now()
+            changed_fields = {"updated_at"}
+            for entry in update:
+                item = existing[entry["id"]]
+                result.before[str(item.pk)] = snapshot(item)
+                for name in ITEM_FIELDS:
+                    if name in entry:
+                        setattr(item, name, entry[name])
+                        changed_fields.add(name)
+                item.updated_at = now
+                result.after[str(item.pk)] = snapshot(item)
+                result.updated.append(item)
+            InvoiceItem.objects.using(using).bulk_update(result.updated, sorted(changed_fields))
+
+        if create:
+            result.created = InvoiceItem.objects.using(using).bulk_create(
+                [InvoiceItem(invoice=invoice, **entry) for entry in create]
+            )
+            for item in result.created:
+                result.before[str(item.pk)] = None
+                result.after[str(item.pk)] = snapshot(item)
+
+        recalculate_totals([invoice.pk], using=using)
+        invoice.refresh_from_db(using=using, fields=["total_amount"])
+    return result
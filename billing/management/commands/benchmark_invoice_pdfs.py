@@ -0,0 +1,90 @@
+import datetime
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from billing.pdf import _init_worker, compiled_template, content_hash, render_pdf
+
+
+def synthetic_document(index: int, lines: int):
+    items = []
+    for line in range(lines):
+        unit_price = Decimal(100 + (index * 7 + line * 13) % 900) / 4
+        quantity = 1 + (index + line) % 9
+        items.append(
+            {
+                "description": f"Service line {line + 1} of invoice {index}",
+                "quantity": quantity,
+                "unit_price": str(unit_price.quantize(Decimal("0.01"))),
+                "line_total": str((unit_price * quantity).quantize(Decimal("0.01"))),
+            }
+        )
+    return {
+        "organization": "Benchmark Ltd",
+        "number": f"BENCH{index:06d}",
+        "client_name": f"Client {index % 50}",
+        "client_email": f"client{index % 50}@example.com",
+        "issue_date": datetime.date(2026, 1, 31).isoformat(),
+        "due_date": datetime.date(2026, 2, 28).isoformat(),
+        "status": "Pending",
+        "total_amount": str(sum(Decimal(item["line_total"]) for item in items)),
+        "items": items,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure invoice PDF rendering throughput on synthetic invoices, "
+        "in-process and across process pools. Touches no data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--invoices", type=int, default=500, help="Invoices to render per run.")
+        parser.add_argument("--lines", type=int, default=10, help="Line items per invoice.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            action="append",
+            help="Pool size to measure (repeatable). Defaults to 1, 2, 4, ... up to the CPU count.",
+        )
+
+    def handle(self, *args, **options):
+        if options["invoices"] < 1 or options["lines"] < 0:
+            raise CommandError("--invoices must be positive and --lines non-negative.")
+        documents = [synthetic_document(index, options["lines"]) for index in range(options["invoices"])]
+        counts = options["processes"]
+        if not counts:
+            cpus = os.cpu_count() or 1
+            counts = sorted({1, cpus, *(2**power for power in range(1, cpus.bit_length()) if 2**power < cpus)})
+
+        compiled_template()
+        started = time.perf_counter()
+        for document in documents:
+            content_hash(document)
+        hashing = time.perf_counter() - started
+        self.stdout.write(
+            f"content hash: {len(documents) / hashing:,.0f} invoices/s "
+            "(the cost of skipping an unchanged invoice)"
+        )
+
+        connections.close_all()
+        baseline = None
+        for processes in counts:
+            started = time.perf_counter()
+            if processes == 1:
+                size = sum(len(render_pdf(document)) for document in documents)
+            else:
+                with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+                    chunksize = max(1, len(documents) // (processes * 4))
+                    size = sum(len(pdf) for pdf in executor.map(render_pdf, documents, chunksize=chunksize))
+            seconds = time.perf_counter() - started
+            rate = len(documents) / seconds
+            baseline = baseline or rate
+            self.stdout.write(
+                f"{processes:>3} process(es): {rate:8.1f} invoices/s, {seconds:6.2f}s, "
+                f"x{rate / baseline:.2f}, {size / len(documents) / 1024:.1f} KiB/PDF"
+            )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.models import Invoice
+from billing.totals import drifted_totals, recalculate_totals
+from organizations.models import Organization
+from organizations.sharding import get_tenant_placement
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every invoice's total_amount with the sum of its items and "
+        "report (or repair) invoices whose total drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            dest="slugs",
+            help="Organization slug (repeatable). Defaults to all organizations.",
+        )
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Recalculate the totals of invoices that drifted.",
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.order_by("pk")
+        if options["slugs"]:
+            organizations = organizations.filter(slug__in=options["slugs"])
+
+        drifted = []
+        for organization in organizations.iterator():
+            database, _ = get_tenant_placement(organization.pk)
+            invoices = Invoice.objects.using(database).filter(organization=organization)
+            found = list(drifted_totals(invoices))
+            if not found:
+                continue
+            for pk, stored, computed in found:
+                drifted.append(f"{organization.slug}/{pk}")
+                self.stdout.write(f"{organization.slug}: invoice {pk} total {stored}, items sum to {computed}")
+            if options["repair"]:
+                recalculate_totals([pk for pk, _, _ in found], using=database)
+                self.stdout.write(self.style.SUCCESS(f"Repaired {len(found)} invoices of {organization.slug}"))
+
+        if drifted and not options["repair"]:
+            raise CommandError(f"{len(drifted)} invoice totals drifted: " + ", ".join(drifted))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Invoice totals are consistent."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from billing.tasks import mark_overdue_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Move pending invoices past their due date to overdue "
+        "(the mark_overdue_invoices Celery task, run in-process)."
+    )
+
+    def handle(self, *args, **options):
+        for alias, moved in mark_overdue_invoices().items():
+            self.stdout.write(f"{alias}: {moved} invoices now overdue")
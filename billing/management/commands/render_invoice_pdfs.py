@@ -0,0 +1,77 @@
+import datetime
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from billing.models import Invoice
+from billing.pdf import render_invoices
+from organizations.models import Organization
+from organizations.sharding import get_tenant_placement
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the PDFs of invoices whose content changed since their last "
+        "render, across a pool of worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            dest="slugs",
+            help="Organization slug (repeatable). Defaults to all organizations.",
+        )
+        parser.add_argument(
+            "--month",
+            help="Only invoices issued in this month (YYYY-MM).",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: one per CPU; 1 renders in-process).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-render invoices whose content did not change.",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1:
+            raise CommandError("--processes must be at least 1.")
+        month = None
+        if options["month"]:
+            try:
+                month = datetime.datetime.strptime(options["month"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("--month must be formatted as YYYY-MM.")
+
+        organizations = Organization.objects.order_by("pk")
+        if options["slugs"]:
+            organizations = organizations.filter(slug__in=options["slugs"])
+
+        rendered = unchanged = failed = 0
+        for organization in list(organizations):
+            database, _ = get_tenant_placement(organization.pk)
+            invoices = Invoice.objects.using(database).filter(organization=organization)
+            if month is not None:
+                invoices = invoices.filter(issue_date__year=month.year, issue_date__month=month.month)
+            result = render_invoices(invoices, processes=options["processes"], force=options["force"])
+            if result.rendered:
+                self.stdout.write(
+                    f"{organization.slug}: rendered {result.rendered} invoices in {result.seconds:.1f}s "
+                    f"({result.rendered / result.seconds:.1f}/s), {result.unchanged} unchanged"
+                )
+            if result.failed:
+                self.stderr.write(f"{organization.slug}: {result.failed} invoices failed to render (see the log)")
+            rendered += result.rendered
+            unchanged += result.unchanged
+            failed += result.failed
+
+        summary = f"Rendered {rendered} invoice PDFs, {unchanged} unchanged"
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{summary}, {failed} failed."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary}."))
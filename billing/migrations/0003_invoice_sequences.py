@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0002_organization_scoped_indexes'),
+        ('organizations', '0002_tenantshard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+                ('prefix', models.CharField(blank=True, max_length=20)),
+                ('number_format', models.CharField(blank=True, max_length=50)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='invoice_sequence', to='organizations.organization')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -38,9 +38,22 @@ class Invoice(OrganizationScopedModel):
         null=True,
         blank=True,
     )
+    # Content hash of the data pdf_file was rendered from (billing.pdf).
+    pdf_hash = models.CharField(max_length=64, blank=True)
 
     class Meta:
         unique_together = ("organization", "number")
+        indexes = [
+            # Revenue per month filters on status and groups by issue_date.
+            models.Index(
+                fields=["organization", "status", "issue_date"],
+                name="invoice_org_status_issue_idx",
+            ),
+            models.Index(fields=["organization", "due_date"], name="invoice_org_due_date_idx"),
+            models.Index(fields=["organization", "created_at"], name="invoice_org_created_idx"),
+            # The overdue sweep (billing.overdue) across all organizations.
+            models.Index(fields=["status", "due_date"], name="invoice_status_due_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         return f"Invoice {self.number}"
@@ -60,3 +73,25 @@ class InvoiceItem(TimeStampedModel):
     def line_total(self) -> Decimal:
         return self.quantity * self.unit_price
 
+
+
+class InvoiceSequence(TimeStampedModel):
+    """
+    Per-organization invoice number counter (see billing.numbering).
+
+    `number_format` is a str.format template over {prefix}, {seq}, {year}
+    and {month}; blank fields fall back to settings.INVOICE_NUMBER_FORMAT
+    and settings.INVOICE_NUMBER_PREFIX.
+    """
+
+    organization = models.OneToOneField(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="invoice_sequence",
+    )
+    next_value = models.PositiveBigIntegerField(default=1)
+    prefix = models.CharField(max_length=20, blank=True)
+    number_format = models.CharField(max_length=50, blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"Invoice sequence of {self.organization_id} at {self.next_value}"
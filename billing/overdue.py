@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from analytics.cache import bump_data_version
+from audit.history import audit_storage_mode, diff_snapshots
+from audit.models import AuditLog
+from audit.snapshots import snapshot
+
+from .models import Invoice
+
+
+def overdue_batch_size() -> int:
+    """
+    Invoices flipped per transaction: bounds how long any row stays locked.
+    """
+
+    return getattr(settings, "INVOICE_OVERDUE_BATCH_SIZE", 1000)
+
+
+def _transition_entry(invoice: Invoice, before, after, now: datetime.datetime) -> AuditLog:
+    changes = None
+    if audit_storage_mode() == "diff":
+        changes = diff_snapshots(before, after)
+        before = after = None
+    return AuditLog(
+        user=None,
+        organization_id=invoice.organization_id,
+        action=AuditLog.ACTION_UPDATE,
+        model_name=Invoice._meta.label,
+        object_id=str(invoice.pk),
+        before=before,
+        after=after,
+        changes=changes,
+        created_at=now,
+    )
+
+
+def _mark_batch(today: datetime.date, batch_size: int, using: str) -> List[Invoice]:
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        # Walks the (status, due_date) index; rows locked by a concurrent
+        # edit are skipped and picked up by the next run instead of waited on.
+        invoices = list(
+            Invoice.objects.using(using)
+            .select_for_update(skip_locked=True)
+            .filter(status=Invoice.STATUS_PENDING, due_date__lt=today)
+            .order_by("due_date", "pk")[:batch_size]
+        )
+        if not invoices:
+            return []
+
+        entries = []
+        for invoice in invoices:
+            before = snapshot(invoice)
+            invoice.status = Invoice.STATUS_OVERDUE
+            invoice.updated_at = now
+            entries.append(_transition_entry(invoice, before, snapshot(invoice), now))
+
+        Invoice.objects.using(using).filter(pk__in=[invoice.pk for invoice in invoices]).update(
+            status=Invoice.STATUS_OVERDUE, updated_at=now
+        )
+        AuditLog.objects.using(using).bulk_create(entries)
+    return invoices
+
+
+def mark_overdue(
+    today: Optional[datetime.date] = None,
+    using: str = DEFAULT_DB_ALIAS,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Move pending invoices due before `today` to overdue, on one database.
+    Returns the number of invoices moved.
+
+    Works in short transactions of `batch_size` invoices, each one UPDATE
+    and one audit INSERT, so neither memory nor lock time grows with the
+    backlog. The update bypasses the model signals: revenue rollups count
+    pending and overdue invoices alike, and the analytics cache of every
+    affected organization is invalidated here. The PDFs of each batch are
+    re-rendered in the background, one task per organization.
+    """
+
+    from .tasks import queue_invoice_pdfs  # billing.tasks imports this module
+
+    today = today or timezone.localdate()
+    batch_size = batch_size or overdue_batch_size()
+    moved = 0
+    while True:
+        invoices = _mark_batch(today, batch_size, using)
+        by_organization = defaultdict(list)
+        for invoice in invoices:
+            by_organization[invoice.organization_id].append(invoice.pk)
+        for organization_id, invoice_ids in by_organization.items():
+            bump_data_version(organization_id)
+            queue_invoice_pdfs(invoice_ids, organization_id)
+        moved += len(invoices)
+        if len(invoices) < batch_size:
+            return moved
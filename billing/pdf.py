@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import Invoice
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_NAME = "billing/invoice_pdf.html"
+# Embedded for documents the built-in (Latin-1) PDF fonts cannot print.
+UNICODE_FONT = "DejaVuSans"
+UNICODE_FONT_FILES = {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf"}
+FONT_DIR = os.path.join(os.path.dirname(__file__), "fonts")
+# Part of every content hash: bump when rendering changes outside the
+# template (fonts, page setup) so existing PDFs are re-rendered.
+RENDERER_VERSION = "1"
+
+Document = Dict[str, Any]
+
+
+# Documents and hashes (database side)
+
+
+def invoice_document(invoice: Invoice) -> Document:
+    """
+    Everything printed on an invoice, as plain JSON-compatible data. Reads
+    `invoice.organization` and `invoice.items`; prefetch them for batches.
+    """
+
+    return {
+        "organization": invoice.organization.name,
+        "number": invoice.number,
+        "client_name": invoice.client_name,
+        "client_email": invoice.client_email,
+        "issue_date": invoice.issue_date.isoformat(),
+        "due_date": invoice.due_date.isoformat(),
+        "status": invoice.get_status_display(),
+        "total_amount": str(invoice.total_amount),
+        "items": [
+            {
+                "description": item.description,
+                "quantity": item.quantity,
+                "unit_price": str(item.unit_price),
+                "line_total": str(item.line_total),
+            }
+            for item in sorted(invoice.items.all(), key=lambda item: item.pk)
+        ],
+    }
+
+
+def content_hash(document: Document) -> str:
+    """
+    SHA-256 over the document, the template source and RENDERER_VERSION:
+    equal hashes mean byte-for-byte the same invoice content.
+    """
+
+    _, template_digest = compiled_template()
+    payload = json.dumps(document, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(f"{RENDERER_VERSION}:{template_digest}:{payload}".encode("utf-8")).hexdigest()
+
+
+def pdf_path(invoice: Invoice, digest: str) -> str:
+    number = get_valid_filename(invoice.number) or str(invoice.pk)
+    return f"invoices/{invoice.organization_id}/{number}-{digest[:16]}.pdf"
+
+
+def is_current(invoice: Invoice, digest: str) -> bool:
+    return bool(invoice.pdf_file) and invoice.pdf_hash == digest
+
+
+# Rendering (no database access; runs in pool workers)
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_template():
+    """
+    The compiled invoice template and a digest of its source, built once
+    per process.
+    """
+
+    template = get_template(TEMPLATE_NAME)
+    source = template.template.source
+    return template, hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _use_unicode_font(pdf) -> None:
+    for style, filename in UNICODE_FONT_FILES.items():
+        pdf.add_font(UNICODE_FONT, style, os.path.join(FONT_DIR, filename))
+    # Scripts DejaVu Sans lacks (e.g. CJK) come from the configured fonts.
+    fallbacks = []
+    for index, path in enumerate(getattr(settings, "INVOICE_PDF_FALLBACK_FONTS", [])):
+        family = f"Fallback{index}"
+        pdf.add_font(family, "", path)
+        fallbacks.append(family)
+    if fallbacks:
+        pdf.set_fallback_fonts(fallbacks)
+    pdf.set_font(UNICODE_FONT, size=10)
+
+
+def render_pdf(document: Document) -> bytes:
+    """
+    PDF bytes of a document. Helvetica, which every viewer has built in,
+    only covers Latin-1; documents with other characters (en dashes, the
+    euro sign, CJK) embed a Unicode font instead. Loading that font costs far more
+    than rendering an invoice, so it is only done when needed.
+    """
+
+    from fpdf import FPDF
+
+    template, _ = compiled_template()
+    html = template.render({"invoice": document})
+    pdf = FPDF(format="A4")
+    pdf.set_title(f"Invoice {document['number']}")
+    pdf.set_author(document["organization"])
+    pdf.add_page()
+    try:
+        html.encode("latin-1")
+    except UnicodeEncodeError:
+        _use_unicode_font(pdf)
+    else:
+        pdf.set_font("Helvetica", size=10)
+    pdf.write_html(html)
+    return bytes(pdf.output())
+
+
+def _init_worker() -> None:
+    import django
+    from django.apps import apps
+
+    # Forked workers inherit the configured project; spawned ones set it up.
+    if not apps.ready:
+        django.setup()
+    compiled_template()
+
+
+def _render_job(job: Tuple[int, Document]) -> Tuple[int, Optional[bytes], Optional[str]]:
+    pk, document = job
+    try:
+        return pk, render_pdf(document), None
+    except Exception:
+        # Reported by the parent: one broken invoice must not abort the batch.
+        return pk, None, traceback.format_exc()
+
+
+# Storing
+
+
+def _store(invoice: Invoice, digest: str, content: bytes) -> Optional[str]:
+    """
+    Write the PDF under its content-addressed name (unless an earlier run
+    already did) and point the invoice at it. Returns the replaced file.
+    """
+
+    name = pdf_path(invoice, digest)
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    previous = invoice.pdf_file.name if invoice.pdf_file else None
+    invoice.pdf_file.name = name
+    invoice.pdf_hash = digest
+    return previous if previous and previous != name else None
+
+
+def _delete_files(names: Iterable[str]) -> None:
+    for name in names:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def render_invoice(invoice: Invoice, force: bool = False) -> bool:
+    """
+    (Re-)render one invoice's PDF unless its content is unchanged since the
+    last render. Returns whether it was rendered.
+    """
+
+    document = invoice_document(invoice)
+    digest = content_hash(document)
+    if not force and is_current(invoice, digest):
+        return False
+    replaced = _store(invoice, digest, render_pdf(document))
+    invoice.save(update_fields=["pdf_file", "pdf_hash", "updated_at"])
+    if replaced:
+        transaction.on_commit(lambda: _delete_files([replaced]), using=invoice._state.db)
+    return True
+
+
+@dataclass
+class BatchResult:
+    rendered: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+def _pending(invoices, force: bool, chunk_size: int) -> Iterator[List[Tuple[Invoice, str, Document]]]:
+    batch = []
+    queryset = invoices.select_related("organization").prefetch_related("items").order_by("pk")
+    for invoice in queryset.iterator(chunk_size=chunk_size):
+        document = invoice_document(invoice)
+        batch.append((invoice, content_hash(document), document))
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def render_invoices(
+    invoices,
+    processes: Optional[int] = None,
+    force: bool = False,
+    chunk_size: int = 200,
+) -> BatchResult:
+    """
+    Render the PDFs of every invoice in the `invoices` queryset whose
+    content changed, spread over a pool of `processes` worker processes
+    (default: one per CPU; 1 renders in-process).
+
+    This process streams the invoices and their items in chunks, hashes
+    them and stores the results; workers only turn documents into PDF
+    bytes, so they never touch the database. Invoices that fail to render
+    are logged and counted in `failed`; the rest of the batch carries on.
+    """
+
+    processes = processes or os.cpu_count() or 1
+    result = BatchResult()
+    started = time.perf_counter()
+    using = invoices.db
+
+    executor = None
+    if processes > 1:
+        # Workers must not inherit open database connections.
+        connections.close_all()
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker)
+    try:
+        for batch in _pending(invoices, force, chunk_size):
+            jobs = {}
+            for invoice, digest, document in batch:
+                if not force and is_current(invoice, digest):
+                    result.unchanged += 1
+                else:
+                    jobs[invoice.pk] = (invoice, digest, document)
+            if not jobs:
+                continue
+
+            work = [(pk, document) for pk, (_, _, document) in jobs.items()]
+            if executor is None:
+                rendered = map(_render_job, work)
+            else:
+                rendered = executor.map(_render_job, work, chunksize=max(1, len(work) // (processes * 4)))
+
+            replaced = []
+            changed = []
+            now = timezone.now()
+            for pk, content, error in rendered:
+                if content is None:
+                    logger.error("Could not render the PDF of invoice %s:\n%s", pk, error)
+                    result.failed += 1
+                    continue
+                invoice, digest, _ = jobs[pk]
+                previous = _store(invoice, digest, content)
+                if previous:
+                    replaced.append(previous)
+                invoice.updated_at = now
+                changed.append(invoice)
+            with transaction.atomic(using=using):
+                Invoice.objects.using(using).bulk_update(changed, ["pdf_file", "pdf_hash", "updated_at"])
+            _delete_files(replaced)
+            result.rendered += len(changed)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    result.seconds = time.perf_counter() - started
+    return result
@@ -1,11 +1,16 @@
 from decimal import Decimal
 
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Invoice, InvoiceItem
+from core.fieldsets import SparseFieldsetSerializerMixin
 
+from .bulk import ITEM_FIELDS, bulk_item_limit
+from .models import Invoice, InvoiceItem, InvoiceSequence
+from .numbering import effective_format, effective_prefix, format_number, validate_number_format
 
-class InvoiceItemSerializer(serializers.ModelSerializer):
+
+class InvoiceItemSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     line_total = serializers.SerializerMethodField()
 
     class Meta:
@@ -21,12 +26,79 @@ class InvoiceItemSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "line_total", "created_at", "updated_at"]
+        field_sources = {"line_total": ["quantity", "unit_price"]}
 
     def get_line_total(self, obj) -> Decimal:
         return obj.line_total
 
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceItemFieldsSerializer(serializers.ModelSerializer):
+    """
+    The writable fields of one item in a batch; see InvoiceItemBatchSerializer.
+    """
+
+    class Meta:
+        model = InvoiceItem
+        fields = list(ITEM_FIELDS)
+
+
+class InvoiceItemUpdateSerializer(InvoiceItemFieldsSerializer):
+    id = serializers.IntegerField()
+
+    class Meta(InvoiceItemFieldsSerializer.Meta):
+        fields = ["id", *ITEM_FIELDS]
+        extra_kwargs = {name: {"required": False} for name in ITEM_FIELDS}
+
+
+class InvoiceItemBatchSerializer(serializers.Serializer):
+    """
+    Items of one invoice to create, update (by id, changed fields only) and
+    delete (by id) together. Validated as a whole before anything is
+    written.
+    """
+
+    invoice = serializers.PrimaryKeyRelatedField(queryset=Invoice.objects.all())
+    create = InvoiceItemFieldsSerializer(many=True, required=False, default=list)
+    update = InvoiceItemUpdateSerializer(many=True, required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only invoices of the current organization.
+        request = self.context.get("request")
+        organization = getattr(request, "organization", None)
+        self.fields["invoice"].queryset = Invoice.objects.filter(organization=organization)
+
+    def validate(self, attrs):
+        size = len(attrs["create"]) + len(attrs["update"]) + len(attrs["delete"])
+        if size == 0:
+            raise serializers.ValidationError("The batch is empty.")
+        if size > bulk_item_limit():
+            raise serializers.ValidationError(f"A batch holds at most {bulk_item_limit()} items.")
+
+        updated = [entry["id"] for entry in attrs["update"]]
+        deleted = attrs["delete"]
+        errors = {}
+        if len(set(updated)) != len(updated):
+            errors["update"] = "Each item may be updated once per batch."
+        if len(set(deleted)) != len(deleted):
+            errors["delete"] = "Each item may be deleted once per batch."
+        elif set(updated) & set(deleted):
+            errors["delete"] = "Items cannot be updated and deleted in the same batch."
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        ids = set(updated) | set(deleted)
+        known = set(InvoiceItem.objects.filter(invoice=attrs["invoice"], pk__in=ids).values_list("pk", flat=True))
+        unknown = sorted(ids - known)
+        if unknown:
+            raise serializers.ValidationError(
+                {"update" if set(unknown) & set(updated) else "delete": f"Unknown items of this invoice: {unknown}."}
+            )
+        return attrs
+
+
+class InvoiceSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     items = InvoiceItemSerializer(many=True, read_only=True)
 
     class Meta:
@@ -46,5 +118,48 @@ class InvoiceSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "organization", "total_amount", "pdf_file", "created_at", "updated_at"]
+        # Lists render items only with ?expand=items (see core.fieldsets).
+        expandable_fields = {"items": "items"}
+        # Numbers are allocated on create; see billing.numbering.
+        read_only_fields = [
+            "id",
+            "organization",
+            "number",
+            "total_amount",
+            "pdf_file",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class InvoiceSequenceSerializer(serializers.ModelSerializer):
+    """
+    Numbering settings of an organization. Blank `prefix`/`number_format`
+    use the project-wide defaults; `next_number` previews the next number.
+    """
+
+    next_number = serializers.SerializerMethodField()
+
+    class Meta:
+        model = InvoiceSequence
+        fields = ["prefix", "number_format", "next_value", "next_number"]
+
+    def validate_next_value(self, value: int) -> int:
+        if value < 1:
+            raise serializers.ValidationError("Must be at least 1.")
+        return value
+
+    def validate(self, attrs):
+        sequence = InvoiceSequence(
+            number_format=attrs.get("number_format", getattr(self.instance, "number_format", "")),
+            prefix=attrs.get("prefix", getattr(self.instance, "prefix", "")),
+        )
+        try:
+            validate_number_format(effective_format(sequence), effective_prefix(sequence))
+        except ValueError as exc:
+            raise serializers.ValidationError({"number_format": str(exc)})
+        return attrs
+
+    def get_next_number(self, obj) -> str:
+        return format_number(effective_format(obj), effective_prefix(obj), obj.next_value, timezone.localdate())
 
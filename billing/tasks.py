@@ -1,26 +1,86 @@
 from __future__ import annotations
 
+import logging
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
 from celery import shared_task
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from organizations.sharding import shard_aliases, tenant_context
 
 from .models import Invoice
+from .overdue import mark_overdue
+from .pdf import render_invoice, render_invoices
+
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
-def generate_invoice_pdf(invoice_id: int) -> None:
+def generate_invoice_pdf(invoice_id: int, organization_id: Optional[int] = None) -> None:
     """
-    Background task to generate a PDF for an invoice.
+    Background task to (re-)render the PDF of an invoice.
+
+    Skips the render when nothing printed on the invoice changed since the
+    last one (see billing.pdf).
+    """
+
+    # Route to the organization's shard when sharding is in use.
+    with tenant_context(organization_id) if organization_id is not None else nullcontext():
+        try:
+            invoice = Invoice.objects.select_related("organization").prefetch_related("items").get(id=invoice_id)
+        except Invoice.DoesNotExist:  # pragma: no cover - defensive
+            return
 
-    For now this is a stub that simply marks the invoice as having a PDF.
-    In a real implementation you would render a template to PDF here.
+        render_invoice(invoice)
+
+
+@shared_task
+def generate_invoice_pdfs(invoice_ids: List[int], organization_id: Optional[int] = None) -> int:
+    """
+    Background task to (re-)render the PDFs of several invoices of one
+    organization, skipping unchanged ones. Returns the number rendered.
     """
 
+    with tenant_context(organization_id) if organization_id is not None else nullcontext():
+        return render_invoices(Invoice.objects.filter(pk__in=invoice_ids), processes=1).rendered
+
+
+def _queue_render(task, *args) -> None:
     try:
-        invoice = Invoice.objects.get(id=invoice_id)
-    except Invoice.DoesNotExist:  # pragma: no cover - defensive
-        return
+        task.delay(*args)
+    except Exception:  # pragma: no cover - depends on the broker
+        # Not fatal: render_invoice_pdfs re-renders whatever changed.
+        logger.exception("Could not queue %s%r", task.name, args)
+
 
-    # Stub implementation: just pretend a PDF was generated.
-    if not invoice.pdf_file:
-        invoice.pdf_file.name = f"invoices/{invoice.number}.pdf"
-        invoice.save(update_fields=["pdf_file"])
+def queue_invoice_pdf(invoice: Invoice) -> None:
+    """
+    Re-render the PDF of `invoice` once the current transaction commits.
+    Call after any change printed on it (total, status, client, dates).
+    """
+
+    transaction.on_commit(
+        lambda: _queue_render(generate_invoice_pdf, invoice.pk, invoice.organization_id),
+        using=invoice._state.db,
+    )
+
+
+def queue_invoice_pdfs(invoice_ids: List[int], organization_id: Optional[int] = None) -> None:
+    """
+    Re-render the PDFs of several invoices of one organization, from
+    committed changes.
+    """
+
+    _queue_render(generate_invoice_pdfs, invoice_ids, organization_id)
+
+
+@shared_task
+def mark_overdue_invoices() -> Dict[str, int]:
+    """
+    Move pending invoices past their due date to overdue, on every
+    database.
+    """
 
+    return {alias: mark_overdue(using=alias) for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]}
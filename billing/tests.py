@@ -0,0 +1,186 @@
+import datetime
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from audit.models import AuditLog
+from audit.sinks import DirectAuditSink, write_entries
+from billing import pdf
+from billing.models import Invoice, InvoiceItem
+from billing.numbering import validate_number_format
+from organizations.models import Membership, Organization
+
+
+class ValidateNumberFormatTests(SimpleTestCase):
+    def test_accepts_known_fields(self):
+        validate_number_format("{prefix}{year}-{month:02d}-{seq:05d}", "INV-")
+
+    def test_rejects_invalid_formats(self):
+        for number_format in (
+            "{prefix.x}{seq}",
+            "{seq[0]}",
+            "{seq.real}",
+            "{}",
+            "{0}",
+            "{day}{seq}",
+            "{seq:{month}}",
+            "{{seq}}",
+            "{seq",
+            "{seq:q}",
+            "{prefix:d}{seq}",
+            "INV",
+        ):
+            with self.subTest(number_format=number_format):
+                with self.assertRaises(ValueError):
+                    validate_number_format(number_format, "INV-")
+
+    def test_rejects_numbers_longer_than_the_column(self):
+        with self.assertRaises(ValueError):
+            validate_number_format("{prefix}{seq}", "X" * 60)
+
+
+class InvoiceNumberingViewTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        organization = Organization.objects.create(name="Acme", slug="acme")
+        Membership.objects.create(user=user, organization=organization, role="owner")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + str(RefreshToken.for_user(user).access_token),
+            HTTP_X_ORGANIZATION_SLUG=organization.slug,
+        )
+
+    def test_invalid_format_is_a_validation_error(self):
+        for number_format in ("{prefix.x}{seq}", "{seq[0]}"):
+            with self.subTest(number_format=number_format):
+                response = self.client.patch(
+                    "/api/v1/billing/invoice-numbering/", {"number_format": number_format}, format="json"
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("number_format", response.data)
+
+    def test_valid_format_previews_the_next_number(self):
+        response = self.client.patch(
+            "/api/v1/billing/invoice-numbering/",
+            {"prefix": "INV-", "number_format": "{prefix}{seq:04d}"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["next_number"], "INV-0001")
+
+
+class InvoicePdfTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        storage_override = override_settings(MEDIA_ROOT=media_root)
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+
+    def create_invoice(self, number: str, description: str, client_name: str = "Example GmbH") -> Invoice:
+        invoice = Invoice.objects.create(
+            organization=self.organization,
+            number=number,
+            client_name=client_name,
+            client_email="billing@example.com",
+            issue_date=datetime.date(2026, 1, 5),
+            due_date=datetime.date(2026, 2, 5),
+            total_amount=Decimal("12.50"),
+        )
+        InvoiceItem.objects.create(invoice=invoice, description=description, quantity=1, unit_price=Decimal("12.50"))
+        return invoice
+
+    def test_renders_text_outside_latin_1(self):
+        invoice = self.create_invoice("INV-1", "Consulting – € rate", "株式会社 Example")
+        # Without fallback fonts, CJK glyphs are reported missing, not fatal.
+        with self.assertLogs("fpdf", "WARNING"):
+            content = pdf.render_pdf(pdf.invoice_document(invoice))
+        self.assertTrue(content.startswith(b"%PDF"))
+        self.assertIn(pdf.UNICODE_FONT.encode(), content)
+
+    def test_latin_1_text_uses_the_built_in_font(self):
+        content = pdf.render_pdf(pdf.invoice_document(self.create_invoice("INV-1", "Café service")))
+        self.assertIn(b"Helvetica", content)
+        self.assertNotIn(pdf.UNICODE_FONT.encode(), content)
+
+    def test_batch_continues_past_a_failing_invoice(self):
+        broken = self.create_invoice("INV-1", "Broken")
+        fine = self.create_invoice("INV-2", "Fine")
+        render_pdf = pdf.render_pdf
+
+        def failing_render(document):
+            if document["number"] == broken.number:
+                raise RuntimeError("renderer crashed")
+            return render_pdf(document)
+
+        with mock.patch.object(pdf, "render_pdf", failing_render), self.assertLogs("billing.pdf", "ERROR"):
+            result = pdf.render_invoices(Invoice.objects.filter(organization=self.organization), processes=1)
+
+        self.assertEqual((result.rendered, result.failed), (1, 1))
+        broken.refresh_from_db()
+        fine.refresh_from_db()
+        self.assertFalse(broken.pdf_file)
+        self.assertTrue(fine.pdf_file)
+
+
+class InvoiceItemBulkTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+        Membership.objects.create(user=user, organization=self.organization, role="owner")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + str(RefreshToken.for_user(user).access_token),
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+        )
+        self.invoice = Invoice.objects.create(
+            organization=self.organization,
+            number="INV-1",
+            client_name="Example GmbH",
+            client_email="billing@example.com",
+            issue_date=datetime.date(2026, 1, 5),
+            due_date=datetime.date(2026, 2, 5),
+            total_amount=Decimal("0.00"),
+        )
+        self.kept = InvoiceItem.objects.create(invoice=self.invoice, description="Kept", unit_price=Decimal("10.00"))
+        self.removed = InvoiceItem.objects.create(invoice=self.invoice, description="Removed", unit_price=Decimal("5.00"))
+
+    @mock.patch("audit.mixins.get_audit_sink", return_value=DirectAuditSink())
+    def test_entries_are_written_in_one_batch(self, _):
+        payload = {
+            "invoice": self.invoice.pk,
+            "create": [
+                {"description": "New", "quantity": 2, "unit_price": "7.50"},
+                {"description": "Other", "quantity": 1, "unit_price": "1.00"},
+            ],
+            "update": [{"id": self.kept.pk, "quantity": 3}],
+            "delete": [self.removed.pk],
+        }
+        with mock.patch("audit.sinks.write_entries", wraps=write_entries) as write:
+            response = self.client.post("/api/v1/billing/invoice-items/bulk/", payload, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_amount"], "46.00")
+        write.assert_called_once()
+        logged = AuditLog.objects.values_list("model_name", "action")
+        self.assertCountEqual(
+            logged,
+            [
+                ("billing.InvoiceItem", AuditLog.ACTION_CREATE),
+                ("billing.InvoiceItem", AuditLog.ACTION_CREATE),
+                ("billing.InvoiceItem", AuditLog.ACTION_UPDATE),
+                ("billing.InvoiceItem", AuditLog.ACTION_DELETE),
+                ("billing.Invoice", AuditLog.ACTION_UPDATE),
+            ],
+        )
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+
+from .models import Invoice, InvoiceItem
+from .tasks import queue_invoice_pdf
+
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+LINE_TOTAL = ExpressionWrapper(
+    F("quantity") * F("unit_price"),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+def _money(value) -> Decimal:
+    # SQLite sums decimals as floats; round back to cents.
+    return Decimal(value or 0).quantize(CENT)
+
+
+def computed_totals(invoice_ids: Iterable[int], using: str = DEFAULT_DB_ALIAS) -> Dict[int, Decimal]:
+    """
+    Sum of line totals per invoice, aggregated in the database. Invoices
+    without items are absent.
+    """
+
+    rows = (
+        InvoiceItem.objects.using(using)
+        .filter(invoice_id__in=list(invoice_ids))
+        .order_by()
+        .values("invoice_id")
+        .annotate(total=Sum(LINE_TOTAL))
+    )
+    return {row["invoice_id"]: _money(row["total"]) for row in rows}
+
+
+def recalculate_totals(invoice_ids: Iterable[int], using: str = DEFAULT_DB_ALIAS) -> List[Invoice]:
+    """
+    Set `total_amount` of the given invoices from a single aggregate over
+    their items. Returns the invoices whose total changed.
+
+    The invoices are locked (in pk order, so concurrent callers cannot
+    deadlock) before aggregating: a concurrent item edit to the same
+    invoice waits, then aggregates after this one committed, so the last
+    total written always includes every committed item. Totals are saved
+    through the model so the analytics rollups follow them, and changed
+    invoices get their PDF re-rendered after commit.
+    """
+
+    invoice_ids = sorted(set(invoice_ids))
+    if not invoice_ids:
+        return []
+    changed = []
+    with transaction.atomic(using=using):
+        invoices = list(
+            Invoice.objects.using(using).select_for_update().filter(pk__in=invoice_ids).order_by("pk")
+        )
+        totals = computed_totals(invoice_ids, using=using)
+        for invoice in invoices:
+            total = totals.get(invoice.pk, ZERO)
+            if invoice.total_amount != total:
+                invoice.total_amount = total
+                invoice.save(update_fields=["total_amount"])
+                queue_invoice_pdf(invoice)
+                changed.append(invoice)
+    return changed
+
+
+def recalculate_total(invoice: Invoice) -> Invoice:
+    """
+    Recalculate one invoice and refresh `invoice.total_amount` in place.
+    """
+
+    using = invoice._state.db or DEFAULT_DB_ALIAS
+    changed = recalculate_totals([invoice.pk], using=using)
+    if changed:
+        invoice.total_amount = changed[0].total_amount
+    return invoice
+
+
+def drifted_totals(invoices, chunk_size: int = 2000) -> Iterator[Tuple[int, Decimal, Decimal]]:
+    """
+    (invoice id, stored total, computed total) for every invoice of the
+    `invoices` queryset whose stored total differs from its items.
+    """
+
+    using = invoices.db
+    batch: List[Tuple[int, Decimal]] = []
+
+    def check(batch):
+        totals = computed_totals([pk for pk, _ in batch], using=using)
+        for pk, stored in batch:
+            computed = totals.get(pk, ZERO)
+            if stored != computed:
+                yield pk, stored, computed
+
+    for pk, stored in invoices.order_by("pk").values_list("pk", "total_amount").iterator(chunk_size=chunk_size):
+        batch.append((pk, stored))
+        if len(batch) >= chunk_size:
+            yield from check(batch)
+            batch = []
+    if batch:
+        yield from check(batch)
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import InvoiceItemViewSet, InvoiceViewSet
+from .views import InvoiceItemViewSet, InvoiceNumberingView, InvoiceViewSet
 
 
 router = DefaultRouter()
@@ -10,6 +10,7 @@ router.register("invoice-items", InvoiceItemViewSet, basename="invoice-item")
 
 
 urlpatterns = [
+    path("invoice-numbering/", InvoiceNumberingView.as_view(), name="invoice-numbering"),
     path("", include(router.urls)),
 ]
 
@@ -1,16 +1,33 @@
 from decimal import Decimal
 
-from rest_framework import permissions, viewsets
-
-from organizations.permissions import IsOrganizationMember
+from django.db import router, transaction
+from rest_framework import exceptions, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.downloads import PassthroughRenderer, file_download
+from core.fieldsets import SparseFieldsetViewMixin
+from organizations.permissions import IsOrganizationMember, IsOwnerOrAdmin
 from audit.mixins import AuditLogMixin
-
-from .models import Invoice, InvoiceItem
-from .serializers import InvoiceItemSerializer, InvoiceSerializer
-from .tasks import generate_invoice_pdf
-
-
-class InvoiceViewSet(AuditLogMixin, viewsets.ModelViewSet):
+from audit.models import AuditLog
+from audit.snapshots import snapshot
+
+from .bulk import apply_item_batch
+from .models import Invoice, InvoiceItem, InvoiceSequence
+from .numbering import allocate_invoice_number, initial_value, locked_sequence
+from .serializers import (
+    InvoiceItemBatchSerializer,
+    InvoiceItemSerializer,
+    InvoiceSequenceSerializer,
+    InvoiceSerializer,
+)
+from .tasks import queue_invoice_pdf
+from .totals import recalculate_total, recalculate_totals
+
+
+class InvoiceViewSet(SparseFieldsetViewMixin, AuditLogMixin, viewsets.ModelViewSet):
     """
     Manage invoices for the current organization.
     """
@@ -20,37 +37,82 @@ class InvoiceViewSet(AuditLogMixin, viewsets.ModelViewSet):
 
     def get_queryset(self):
         org = getattr(self.request, "organization", None)
-        return Invoice.objects.filter(organization=org).prefetch_related("items")
+        # Items are prefetched only when rendered; see core.fieldsets.
+        return Invoice.objects.filter(organization=org)
 
     def perform_create(self, serializer):
         org = getattr(self.request, "organization", None)
+        using = router.db_for_write(Invoice)
+
+        with transaction.atomic(using=using):
+            # The organization's sequence row stays locked until the
+            # invoice is committed; see billing.numbering.
+            number = allocate_invoice_number(
+                org.pk, day=serializer.validated_data.get("issue_date"), using=using
+            )
+            invoice = serializer.save(
+                organization=org,
+                number=number,
+                total_amount=Decimal("0.00"),
+            )
+            super().perform_create(serializer)  # Logs the saved invoice
+            # Trigger PDF generation in background.
+            queue_invoice_pdf(invoice)
 
-        # Auto-generate invoice number: simple incremental per organization.
-        last_invoice = (
-            Invoice.objects.filter(organization=org)
-            .order_by("-created_at")
-            .first()
-        )
-        if last_invoice:
-            try:
-                last_number_int = int(last_invoice.number)
-            except ValueError:
-                last_number_int = 0
-            next_number = f"{last_number_int + 1:05d}"
-        else:
-            next_number = "00001"
-
-        invoice = serializer.save(
-            organization=org,
-            number=next_number,
-            total_amount=Decimal("0.00"),
-        )
+    def perform_update(self, serializer):
+        with transaction.atomic(using=serializer.instance._state.db):
+            super().perform_update(serializer)  # Saves and logs
+            # Re-rendered only if something printed on it changed.
+            queue_invoice_pdf(serializer.instance)
+
+    @action(detail=True, methods=["get"], url_path="pdf", renderer_classes=[PassthroughRenderer])
+    def pdf(self, request, pk=None):
+        """
+        Download the invoice PDF; see core.downloads.
+        """
 
-        # Trigger PDF generation in background.
-        generate_invoice_pdf.delay(invoice.id)
+        invoice = get_object_or_404(self.get_queryset(), pk=pk)
+        self.check_object_permissions(request, invoice)
+        filename = f"invoice-{invoice.number}.pdf"
+        return file_download(request, invoice.pdf_file, filename=filename)
 
 
-class InvoiceItemViewSet(AuditLogMixin, viewsets.ModelViewSet):
+class InvoiceNumberingView(APIView):
+    """
+    Invoice numbering of the current organization: the number format, its
+    prefix and the next sequence value. Changes restricted to
+    organization owners/admins.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+
+    def get_permissions(self):
+        permissions_ = super().get_permissions()
+        if self.request.method not in permissions.SAFE_METHODS:
+            permissions_.append(IsOwnerOrAdmin())
+        return permissions_
+
+    def get(self, request):
+        organization = request.organization
+        sequence = InvoiceSequence.objects.filter(organization=organization).first()
+        if sequence is None:
+            # Not used yet: show what the first allocation would start from.
+            using = InvoiceSequence.objects.db
+            sequence = InvoiceSequence(organization=organization, next_value=initial_value(organization.pk, using))
+        return Response(InvoiceSequenceSerializer(sequence).data)
+
+    def patch(self, request):
+        organization = request.organization
+        using = router.db_for_write(InvoiceSequence)
+        with transaction.atomic(using=using):
+            sequence = locked_sequence(organization.pk, using=using)
+            serializer = InvoiceSequenceSerializer(sequence, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+        return Response(serializer.data)
+
+
+class InvoiceItemViewSet(SparseFieldsetViewMixin, AuditLogMixin, viewsets.ModelViewSet):
     """
     Manage invoice line items.
     """
@@ -64,24 +126,93 @@ class InvoiceItemViewSet(AuditLogMixin, viewsets.ModelViewSet):
             "invoice"
         )
 
+    # Item writes and the invoice total they imply commit together.
+
     def perform_create(self, serializer):
-        item = serializer.save()
-        self._recalculate_total(item.invoice)
-        # Audit logging handled by AuditLogMixin
-        super().perform_create(serializer)
+        with transaction.atomic(using=router.db_for_write(InvoiceItem)):
+            item = serializer.save()
+            self._recalculate_total(item.invoice)
+            # Audit logging handled by AuditLogMixin
+            super().perform_create(serializer)
 
     def perform_update(self, serializer):
-        item = serializer.save()  # Save first
-        super().perform_update(serializer)  # Logs (detects instance already saved)
-        self._recalculate_total(item.invoice)
+        previous_invoice_id = serializer.instance.invoice_id
+        with transaction.atomic(using=serializer.instance._state.db):
+            super().perform_update(serializer)  # Saves and logs
+            item = serializer.instance
+            if item.invoice_id != previous_invoice_id:
+                # Moved to another invoice: both totals change.
+                recalculate_totals([previous_invoice_id, item.invoice_id], using=item._state.db)
+                item.invoice.refresh_from_db(fields=["total_amount"])
+            else:
+                self._recalculate_total(item.invoice)
 
     def perform_destroy(self, instance):
         invoice = instance.invoice
-        super().perform_destroy(instance)  # This logs and deletes
-        self._recalculate_total(invoice)
+        with transaction.atomic(using=instance._state.db):
+            super().perform_destroy(instance)  # This logs and deletes
+            self._recalculate_total(invoice)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create, update and delete items of one invoice in one request:
+
+            {"invoice": 1,
+             "create": [{"description": ..., "quantity": ..., "unit_price": ...}],
+             "update": [{"id": 7, "quantity": 3}],
+             "delete": [8, 9]}
+
+        The whole batch is validated first, then written in one
+        transaction with bulk queries; the invoice total is recalculated
+        once. Every touched item gets its own audit entry, and the invoice
+        an update entry when its total changed; the entries are written
+        together in one batch.
+        """
+
+        serializer = InvoiceItemBatchSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        invoice = data["invoice"]
+
+        with transaction.atomic(using=invoice._state.db):
+            before = snapshot(invoice)
+            try:
+                result = apply_item_batch(invoice, data["create"], data["update"], data["delete"])
+            except InvoiceItem.DoesNotExist as exc:
+                raise exceptions.ValidationError({"items": str(exc)})
+            entries = [
+                self._audit_entry(
+                    instance=item,
+                    action=action_,
+                    before=result.before[str(item.pk)],
+                    after=result.after[str(item.pk)],
+                )
+                for action_, items in (
+                    (AuditLog.ACTION_DELETE, result.deleted),
+                    (AuditLog.ACTION_UPDATE, result.updated),
+                    (AuditLog.ACTION_CREATE, result.created),
+                )
+                for item in items
+            ]
+            after = snapshot(invoice)
+            if after != before:
+                entries.append(
+                    self._audit_entry(instance=invoice, action=AuditLog.ACTION_UPDATE, before=before, after=after)
+                )
+            self._create_audit_logs(entries, using=invoice._state.db)
+
+        return Response(
+            {
+                "invoice": invoice.pk,
+                "total_amount": InvoiceSerializer().fields["total_amount"].to_representation(invoice.total_amount),
+                "created": InvoiceItemSerializer(result.created, many=True).data,
+                "updated": InvoiceItemSerializer(result.updated, many=True).data,
+                "deleted": [item.pk for item in result.deleted],
+            }
+        )
 
     def _recalculate_total(self, invoice: Invoice) -> None:
-        total = sum((item.line_total for item in invoice.items.all()), Decimal("0.00"))
-        invoice.total_amount = total
-        invoice.save(update_fields=["total_amount"])
-
+        # One aggregate over the items, under a lock on the invoice row;
+        # see billing.totals.
+        recalculate_total(invoice)
@@ -51,6 +51,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # Multi-tenant detection (placeholder, implemented in organizations.middleware)
     "organizations.middleware.CurrentOrganizationMiddleware",
+    # Read-replica routing per view (no-op unless READ_REPLICAS is set)
+    "core.middleware.ReadReplicaMiddleware",
+    # Batches the request's audit entries (see AUDIT_LOG_SINK)
+    "audit.middleware.AuditBufferMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -96,6 +100,46 @@ else:
         }
     }
 
+# Tenant shards: extra database aliases organizations can be placed on via
+# the organizations.TenantShard directory, e.g. TENANT_SHARDS="shard1 shard2".
+# Each shard needs `migrate --database <alias>` and `init_tenant_shard <alias>`.
+TENANT_SHARDS: list[str] = os.getenv("TENANT_SHARDS", "").split()
+for _alias in TENANT_SHARDS:
+    DATABASES[_alias] = {
+        **DATABASES["default"],
+        "NAME": (
+            f"{DATABASES['default']['NAME']}_{_alias}"
+            if DATABASES["default"]["ENGINE"].endswith("postgresql")
+            else BASE_DIR / f"db_{_alias}.sqlite3"
+        ),
+    }
+
+# Read replicas of the default database, e.g. READ_REPLICAS="replica1". On
+# PostgreSQL each replica's host comes from <ALIAS>_HOST (e.g. REPLICA1_HOST).
+READ_REPLICAS: list[str] = os.getenv("READ_REPLICAS", "").split()
+for _alias in READ_REPLICAS:
+    DATABASES[_alias] = {
+        **DATABASES["default"],
+        "NAME": (
+            DATABASES["default"]["NAME"]
+            if DATABASES["default"]["ENGINE"].endswith("postgresql")
+            else BASE_DIR / f"db_{_alias}.sqlite3"
+        ),
+        "HOST": os.getenv(f"{_alias.upper()}_HOST", DATABASES["default"].get("HOST", "")),
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_REPLICAS: dict[str, list[str]] = (
+    {"default": READ_REPLICAS} if READ_REPLICAS else {}
+)
+# Views opt in per action via `read_replica_actions`; this is the fallback.
+READ_REPLICA_DEFAULT_ACTIONS = ("list",)
+# After a write, the user's reads stay on the primary for this long.
+READ_REPLICA_PIN_SECONDS = int(os.getenv("READ_REPLICA_PIN_SECONDS", "10"))
+
+DATABASE_ROUTERS = (["core.routers.ReadReplicaRouter"] if DATABASE_REPLICAS else []) + (
+    ["organizations.routers.TenantShardRouter"] if TENANT_SHARDS else []
+)
+
 
 AUTH_USER_MODEL = "accounts.User"
 
@@ -131,6 +175,14 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# How authorized downloads of media files (core.downloads) are sent:
+# "django" streams them from the worker (development); "x-accel-redirect"
+# hands them to nginx through an internal location serving MEDIA_ROOT at
+# FILE_DOWNLOAD_INTERNAL_PREFIX, e.g.
+#     location /protected-media/ { internal; alias /srv/flowdesk/media/; }
+# "x-sendfile" to Apache/lighttpd by absolute path.
+FILE_DOWNLOAD_SERVER = os.getenv("FILE_DOWNLOAD_SERVER", "django")
+FILE_DOWNLOAD_INTERNAL_PREFIX = os.getenv("FILE_DOWNLOAD_INTERNAL_PREFIX", "/protected-media/")
 
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -139,7 +191,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # DRF / JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ReadRoutingJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -155,6 +207,20 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Opt-in: embed organization memberships/roles as signed access-token claims
+# so permission checks need no database queries (see accounts.tokens).
+TENANCY_JWT_CLAIMS = os.getenv("TENANCY_JWT_CLAIMS", "False") == "True"
+if TENANCY_JWT_CLAIMS:
+    REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"] = (
+        "accounts.authentication.TenancyJWTAuthentication",
+    )
+    SIMPLE_JWT["TOKEN_OBTAIN_SERIALIZER"] = (
+        "accounts.serializers.TenancyTokenObtainPairSerializer"
+    )
+    SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"] = (
+        "accounts.serializers.TenancyTokenRefreshSerializer"
+    )
+
 
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
@@ -177,7 +243,105 @@ CHANNEL_LAYERS = {
 }
 
 
+# Cache. Tenant, membership and analytics entries are invalidated through
+# version keys that every web and Celery process must see, so the cache is
+# Redis; in-process memory is only used when developing (DEBUG) without
+# REDIS_CACHE_URL, i.e. with a single process.
+REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL", "" if DEBUG else "redis://localhost:6379/2")
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Tenant and membership caches (organizations.resolver / organizations.context).
+# GENERATION_TTL bounds how long other processes may resolve a changed
+# organization from their local copy.
+TENANT_CACHE = {
+    "LOCAL_MAX_ENTRIES": int(os.getenv("TENANT_CACHE_LOCAL_MAX_ENTRIES", "1024")),
+    "TTL": int(os.getenv("TENANT_CACHE_TTL", "300")),
+    "NEGATIVE_TTL": int(os.getenv("TENANT_CACHE_NEGATIVE_TTL", "30")),
+    "GENERATION_TTL": float(os.getenv("TENANT_CACHE_GENERATION_TTL", "1")),
+    "MEMBERSHIP_TTL": int(os.getenv("TENANT_CACHE_MEMBERSHIP_TTL", "300")),
+}
+
+# Analytics responses are invalidated by a per-organization data version
+# bumped on every task/project/invoice write; the timeout only bounds how
+# long unreachable entries of old versions occupy the cache.
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_TIMEOUT", "86400"))
+# Longest since/until window of the cumulative flow (one row per day).
+CUMULATIVE_FLOW_MAX_DAYS = int(os.getenv("CUMULATIVE_FLOW_MAX_DAYS", "731"))
+
+# Where AuditLogMixin entries go: BufferedAuditSink (one bulk insert per
+# request after commit), CeleryAuditSink (batches drained by a worker) or
+# DirectAuditSink (one insert per change, inside the transaction).
+AUDIT_LOG_SINK = os.getenv("AUDIT_LOG_SINK", "audit.sinks.BufferedAuditSink")
+# "diff" stores only the changed fields of updates; "full" keeps complete
+# before/after snapshots. compact_audit_logs converts existing full rows.
+AUDIT_LOG_STORAGE = os.getenv("AUDIT_LOG_STORAGE", "diff")
+# Days audit entries stay online for organizations without an
+# AuditRetentionPolicy (unset: forever). Expired months are exported to
+# AUDIT_ARCHIVE_ROOT as gzipped JSONL by the archive_audit_logs task.
+AUDIT_LOG_RETENTION_DAYS = (
+    int(os.getenv("AUDIT_LOG_RETENTION_DAYS")) if os.getenv("AUDIT_LOG_RETENTION_DAYS") else None
+)
+AUDIT_ARCHIVE_ROOT = Path(os.getenv("AUDIT_ARCHIVE_ROOT", BASE_DIR / "audit_archive"))
+# Monthly audit log partitions created ahead of time (PostgreSQL).
+AUDIT_LOG_PARTITIONS_AHEAD = int(os.getenv("AUDIT_LOG_PARTITIONS_AHEAD", "2"))
+# Entries of an object between two state checkpoints: the most a
+# point-in-time reconstruction replays (see audit.checkpoints).
+AUDIT_CHECKPOINT_INTERVAL = int(os.getenv("AUDIT_CHECKPOINT_INTERVAL", "50"))
+
+# Default invoice numbering (organizations may override both): a
+# str.format template over {prefix}, {seq}, {year} and {month}.
+INVOICE_NUMBER_FORMAT = os.getenv("INVOICE_NUMBER_FORMAT", "{prefix}{seq:05d}")
+INVOICE_NUMBER_PREFIX = os.getenv("INVOICE_NUMBER_PREFIX", "")
+# Most item creates, updates and deletes in one bulk request
+# (POST /invoice-items/bulk/).
+INVOICE_ITEMS_BULK_MAX = int(os.getenv("INVOICE_ITEMS_BULK_MAX", "1000"))
+# Invoices moved to overdue per transaction by mark_overdue_invoices.
+INVOICE_OVERDUE_BATCH_SIZE = int(os.getenv("INVOICE_OVERDUE_BATCH_SIZE", "1000"))
+# TrueType fonts (paths separated by os.pathsep) for characters the bundled
+# DejaVu Sans lacks in invoice PDFs, e.g. a Noto Sans CJK file.
+INVOICE_PDF_FALLBACK_FONTS = [
+    path for path in os.getenv("INVOICE_PDF_FALLBACK_FONTS", "").split(os.pathsep) if path
+]
+# Task rank keys longer than this get their board column respaced in the
+# background (see tasks.ranking).
+TASK_RANK_REBALANCE_LENGTH = int(os.getenv("TASK_RANK_REBALANCE_LENGTH", "24"))
+
+
 # Celery (basic config; worker configuration is typically in celery.py)
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+CELERY_BEAT_SCHEDULE = {
+    "archive-audit-logs": {
+        "task": "audit.tasks.archive_audit_logs",
+        "schedule": timedelta(days=1),
+    },
+    "build-audit-checkpoints": {
+        "task": "audit.tasks.build_audit_checkpoints",
+        "schedule": timedelta(hours=1),
+    },
+    "reconcile-rollups": {
+        "task": "analytics.tasks.reconcile_rollups",
+        "schedule": timedelta(days=1),
+    },
+    "mark-overdue-invoices": {
+        "task": "billing.tasks.mark_overdue_invoices",
+        "schedule": timedelta(hours=1),
+    },
+    "rebalance-task-ranks": {
+        "task": "tasks.tasks.rebalance_task_ranks",
+        "schedule": timedelta(days=1),
+    },
+}
 
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import mimetypes
+import posixpath
+import re
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+from rest_framework.renderers import BaseRenderer
+
+
+DOWNLOAD_SERVERS = ("django", "x-accel-redirect", "x-sendfile")
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class PassthroughRenderer(BaseRenderer):
+    """
+    Lets download views accept any Accept header; they return plain
+    Django responses, so nothing is ever rendered.
+    """
+
+    media_type = "*/*"
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+def download_server() -> str:
+    server = getattr(settings, "FILE_DOWNLOAD_SERVER", "django")
+    if server not in DOWNLOAD_SERVERS:
+        raise ImproperlyConfigured(f"FILE_DOWNLOAD_SERVER must be one of {', '.join(DOWNLOAD_SERVERS)}.")
+    return server
+
+
+def _byte_range(request, size: int, etag: str, modified: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) byte of a satisfiable single range request, None to send
+    the whole file. Raises ValueError when the range cannot be satisfied.
+    """
+
+    match = _RANGE.match(request.META.get("HTTP_RANGE", "").replace(" ", ""))
+    if match is None or match.groups() == ("", ""):
+        # No range, or a form we do not serve (several ranges): whole file.
+        return None
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != modified:
+        # The client's copy is outdated: send the current file in full.
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # The final `last` bytes.
+        if int(last) == 0:
+            raise ValueError("Empty suffix range.")
+        return max(0, size - int(last)), size - 1
+    first = int(first)
+    last = min(int(last), size - 1) if last else size - 1
+    if first >= size or first > last:
+        raise ValueError("Range outside the file.")
+    return first, last
+
+
+def _read_range(file: File, first: int, last: int) -> Iterator[bytes]:
+    with file:
+        file.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _stream(request, field_file, size: int, etag: str, modified: int) -> HttpResponse:
+    storage, name = field_file.storage, field_file.name
+    try:
+        byte_range = _byte_range(request, size, etag, modified)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    if byte_range is None:
+        return FileResponse(storage.open(name, "rb"))
+    first, last = byte_range
+    response = StreamingHttpResponse(_read_range(storage.open(name, "rb"), first, last), status=206)
+    response["Content-Range"] = f"bytes {first}-{last}/{size}"
+    response["Content-Length"] = str(last - first + 1)
+    return response
+
+
+def _offload(server: str, field_file) -> HttpResponse:
+    response = HttpResponse()
+    if server == "x-accel-redirect":
+        prefix = getattr(settings, "FILE_DOWNLOAD_INTERNAL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = quote(posixpath.join(prefix, field_file.name))
+    else:
+        response["X-Sendfile"] = field_file.path
+    # The proxy sends the body, and answers range requests, itself.
+    return response
+
+
+def file_download(request, field_file, filename: Optional[str] = None) -> HttpResponse:
+    """
+    Response sending `field_file` as an attachment named `filename`
+    (default: its base name), to be returned once the caller checked
+    access. Raises Http404 when the file is missing from storage.
+
+    Conditional requests are answered here (304/412) from a strong ETag
+    and Last-Modified. Clients revalidate every time (private, no-cache),
+    so access is rechecked, but a cached copy costs them a 304. The body
+    is sent per settings.FILE_DOWNLOAD_SERVER: "x-accel-redirect" (nginx)
+    and "x-sendfile" (Apache, lighttpd) hand the transfer, byte ranges
+    included, to the front proxy; "django" streams it from the worker,
+    serving single byte ranges, and is meant for development.
+
+    ETags use nginx's format (hex mtime and size), so validators issued
+    here and by nginx for the same file agree. They are strong because
+    storages never rewrite a stored file in place: every save gets a
+    fresh name.
+    """
+
+    if not field_file:
+        raise Http404("No file.")
+    storage, name = field_file.storage, field_file.name
+    try:
+        size = storage.size(name)
+        modified = int(storage.get_modified_time(name).timestamp())
+    except (FileNotFoundError, NotImplementedError):
+        raise Http404("File not found.")
+    etag = quote_etag(f"{modified:x}-{size:x}")
+
+    response = get_conditional_response(request, etag=etag, last_modified=modified)
+    if response is None:
+        server = download_server()
+        if server == "django":
+            response = _stream(request, field_file, size, etag, modified)
+        else:
+            response = _offload(server, field_file)
+        if response.status_code != 416:
+            filename = filename or posixpath.basename(name)
+            content_type, encoding = mimetypes.guess_type(filename)
+            # Compressed files are sent as stored, not decoded by clients.
+            response["Content-Type"] = content_type if content_type and not encoding else "application/octet-stream"
+            response["Content-Disposition"] = content_disposition_header(True, filename)
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
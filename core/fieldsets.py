@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import exceptions, permissions
+
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+# Viewset actions whose querysets are narrowed to the rendered fields.
+NARROWED_ACTIONS = ("list", "retrieve")
+
+
+def _param_names(request, param: str) -> Optional[List[str]]:
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _is_read(request) -> bool:
+    # Writes keep every field: narrowing a serializer would drop input.
+    return request is not None and request.method in permissions.SAFE_METHODS
+
+
+def selected_fields(serializer_class, request, listing: bool) -> List[str]:
+    """
+    Fields of `serializer_class` to render for a read `request`.
+
+    `?fields=a,b` keeps only those fields; `?expand=x` adds expandable
+    fields (Meta.expandable_fields, e.g. nested items), which lists omit
+    unless expanded or named in `?fields=`. Raises ValidationError for
+    unknown names.
+    """
+
+    meta = serializer_class.Meta
+    declared = list(meta.fields)
+    expandable = getattr(meta, "expandable_fields", {})
+    fields = _param_names(request, FIELDS_PARAM)
+    expand = _param_names(request, EXPAND_PARAM) or []
+
+    unknown = [name for name in fields or [] if name not in declared]
+    if unknown:
+        raise exceptions.ValidationError(
+            {FIELDS_PARAM: f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(declared)}."}
+        )
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        raise exceptions.ValidationError(
+            {EXPAND_PARAM: f"Cannot expand: {', '.join(unknown)}. Expandable: {', '.join(expandable) or 'none'}."}
+        )
+
+    if fields is not None:
+        return [name for name in declared if name in fields or name in expand]
+    return [name for name in declared if not (listing and name in expandable) or name in expand]
+
+
+def _columns(serializer_class, names: List[str]) -> Optional[List[str]]:
+    """
+    Model fields read to render the `names` fields, or None when a field
+    cannot be traced to columns (the queryset is then left whole).
+    """
+
+    meta = serializer_class.Meta
+    expandable = getattr(meta, "expandable_fields", {})
+    sources = getattr(meta, "field_sources", {})
+    declared = serializer_class._declared_fields
+    columns = []
+    for name in names:
+        if name in expandable:
+            continue
+        if name in sources:
+            columns.extend(sources[name])
+            continue
+        source = getattr(declared.get(name), "source", None) or name
+        if source == "*":
+            return None
+        try:
+            field = meta.model._meta.get_field(source.split(".")[0])
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete:
+            return None
+        columns.append(field.name)
+    return columns
+
+
+def narrow_queryset(queryset, serializer_class, request, listing: bool):
+    """
+    `queryset` loading only what the rendered fields read: only() their
+    columns, and prefetch expandable relations only when rendered.
+    """
+
+    names = selected_fields(serializer_class, request, listing)
+    for name, lookup in getattr(serializer_class.Meta, "expandable_fields", {}).items():
+        if name in names:
+            queryset = queryset.prefetch_related(lookup)
+
+    columns = _columns(serializer_class, names)
+    if columns is None:
+        return queryset
+    if isinstance(queryset.query.select_related, dict):
+        # Relations the view joins must stay loaded.
+        columns.extend(queryset.query.select_related)
+    return queryset.only(*columns)
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Renders only the fields picked by `?fields=` / `?expand=` (see
+    selected_fields) when it is the view's serializer on a read request.
+    Expandable fields are declared as {field: prefetch lookup} in
+    Meta.expandable_fields; Meta.field_sources names the model fields
+    behind computed ones, e.g. {"line_total": ["quantity", "unit_price"]}.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        view = self.context.get("view")
+        get_serializer_class = getattr(view, "get_serializer_class", None)
+        if not _is_read(request) or get_serializer_class is None or type(self) is not get_serializer_class():
+            return
+        keep = set(selected_fields(type(self), request, listing=getattr(view, "action", None) == "list"))
+        for name in [name for name in self.fields if name not in keep]:
+            self.fields.pop(name)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Narrows list and retrieve querysets to the fields rendered by a
+    SparseFieldsetSerializerMixin serializer (see narrow_queryset).
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not _is_read(self.request) or getattr(self, "action", None) not in NARROWED_ACTIONS:
+            return queryset
+        return narrow_queryset(queryset, self.get_serializer_class(), self.request, listing=self.action == "list")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Callable, List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import QuerySet
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from audit.views import AuditLogViewSet
+from billing.models import Invoice
+from billing.views import InvoiceItemViewSet, InvoiceViewSet
+from notifications.views import NotificationViewSet
+from organizations.models import Organization
+from organizations.views import MembershipViewSet
+from projects.models import Project
+from projects.views import ProjectViewSet
+from tasks.models import Task
+from tasks.views import TaskCommentViewSet, TaskViewSet
+
+
+User = get_user_model()
+
+
+def _viewset_queryset(viewset_class) -> Callable:
+    def build(request) -> QuerySet:
+        view = viewset_class()
+        view.request = request
+        view.action = "list"
+        view.kwargs = {}
+        view.format_kwarg = None
+        return view.get_queryset()
+
+    return build
+
+
+# Hot access paths: every viewset list queryset plus the organization-scoped
+# filters used by the analytics endpoints.
+HOT_QUERIES: List[Tuple[str, Callable]] = [
+    ("TaskViewSet", _viewset_queryset(TaskViewSet)),
+    ("TaskCommentViewSet", _viewset_queryset(TaskCommentViewSet)),
+    ("ProjectViewSet", _viewset_queryset(ProjectViewSet)),
+    ("InvoiceViewSet", _viewset_queryset(InvoiceViewSet)),
+    ("InvoiceItemViewSet", _viewset_queryset(InvoiceItemViewSet)),
+    ("MembershipViewSet", _viewset_queryset(MembershipViewSet)),
+    ("AuditLogViewSet", _viewset_queryset(AuditLogViewSet)),
+    ("NotificationViewSet", _viewset_queryset(NotificationViewSet)),
+    (
+        "Task by status",
+        lambda r: Task.objects.filter(organization=r.organization, status=Task.STATUS_DONE),
+    ),
+    (
+        "Task by assignee",
+        lambda r: Task.objects.filter(organization=r.organization, assignee=r.user),
+    ),
+    (
+        "Task by due_date",
+        lambda r: Task.objects.filter(organization=r.organization, due_date__lt="2000-01-01"),
+    ),
+    (
+        "Project by status/end_date",
+        lambda r: Project.objects.filter(
+            organization=r.organization,
+            status__in=[Project.STATUS_ACTIVE, Project.STATUS_PLANNED],
+            end_date__lt="2000-01-01",
+        ),
+    ),
+    (
+        "Invoice by status",
+        lambda r: Invoice.objects.filter(
+            organization=r.organization, status=Invoice.STATUS_PENDING
+        ),
+    ),
+    (
+        "Invoice by due_date",
+        lambda r: Invoice.objects.filter(
+            organization=r.organization, due_date__lt="2000-01-01"
+        ),
+    ),
+    (
+        "Invoice latest",
+        lambda r: Invoice.objects.filter(organization=r.organization).order_by("-created_at")[:1],
+    ),
+]
+
+
+def _is_sequential_scan(vendor: str, line: str) -> bool:
+    line = line.strip()
+    if vendor == "postgresql":
+        return "Seq Scan" in line
+    if vendor == "sqlite":
+        # "SCAN <table>" without an index is a full table scan; "SCAN ...
+        # USING (COVERING) INDEX" walks an index in order and is acceptable.
+        return line.startswith("SCAN ") and "USING" not in line
+    return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the hot organization-scoped querysets and fail if any "
+        "of them plans a sequential scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan of every query.",
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        connection = connections[alias]
+        vendor = connection.vendor
+        if vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Unsupported database vendor: {vendor}")
+
+        # Unsaved instances are enough to build the filters; no rows needed.
+        # A real DRF request, since views read e.g. its query_params.
+        http_request = APIRequestFactory().get("/")
+        http_request.organization = Organization(pk=1)
+        request = Request(http_request)
+        request.user = User(pk=1)
+        failures = []
+
+        for label, build in HOT_QUERIES:
+            queryset = build(request).using(alias)
+            with transaction.atomic(using=alias):
+                if vendor == "postgresql":
+                    # Tiny test tables make the planner prefer seq scans; only
+                    # complain when no index can serve the query at all.
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL enable_seqscan = off")
+                plan = queryset.explain()
+
+            offending = [line for line in plan.splitlines() if _is_sequential_scan(vendor, line)]
+            if options["verbose_plans"] or offending:
+                self.stdout.write(f"{label}:\n{plan}\n")
+            if offending:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f"FAIL  {label}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok    {label}"))
+
+        if failures:
+            raise CommandError(
+                "Sequential scan in query plan for: " + ", ".join(failures)
+            )
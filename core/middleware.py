@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.http import HttpRequest
+
+from .routers import pin_to_primary, replica_map, reset_read_state, use_primary, use_replica
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadReplicaMiddleware:
+    """
+    Decide per view whether its reads may be served by a read replica.
+
+    Views opt in through a `read_replica_actions` attribute listing the
+    viewset actions (e.g. "list") or, for plain APIViews, the lower-case
+    HTTP methods (e.g. "get") that are safe to serve from a replica. Views
+    without the attribute use settings.READ_REPLICA_DEFAULT_ACTIONS.
+    Successful writes pin the user to the primary for a short window.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        if not replica_map():
+            return self.get_response(request)
+
+        request._read_replica_token = use_primary()
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_state(request._read_replica_token)
+
+        user = getattr(request, "user", None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            pin_to_primary(user.pk)
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        if not replica_map() or request.method not in SAFE_METHODS:
+            return None
+
+        view_class = getattr(view_func, "cls", None)
+        if view_class is None:
+            return None
+        allowed = getattr(
+            view_class,
+            "read_replica_actions",
+            getattr(settings, "READ_REPLICA_DEFAULT_ACTIONS", ("list",)),
+        )
+        actions = getattr(view_func, "actions", None)
+        method = request.method.lower()
+        action = actions.get(method) if actions else method
+        if action in allowed:
+            use_replica()
+        return None
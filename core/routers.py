@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import contextvars
+import random
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+
+
+# Apps whose reads always go to the primary.
+PRIMARY_APP_LABELS = ("auth", "sessions", "contenttypes")
+
+# Per-request routing state set by core.middleware.ReadReplicaMiddleware.
+_read_state: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar(
+    "read_replica_state", default=None
+)
+
+
+def replica_map() -> Dict[str, List[str]]:
+    return getattr(settings, "DATABASE_REPLICAS", {})
+
+
+def primary_of(alias: str) -> str:
+    for primary, replicas in replica_map().items():
+        if alias in replicas:
+            return primary
+    return alias
+
+
+def _pin_cache_key(user_id) -> str:
+    return f"replica:pin:{user_id}"
+
+
+def pin_to_primary(user_id) -> None:
+    """
+    Send this user's reads to the primary for READ_REPLICA_PIN_SECONDS, so
+    a client always reads its own writes despite replication lag.
+    """
+
+    timeout = getattr(settings, "READ_REPLICA_PIN_SECONDS", 10)
+    cache.set(_pin_cache_key(user_id), True, timeout=timeout)
+
+
+def _is_pinned(state: dict) -> bool:
+    if "pinned" not in state:
+        user_id = state.get("user_id")
+        if user_id is None:
+            # Not authenticated (yet): DRF authenticates inside the view, so
+            # decide again on the next read instead of memoizing.
+            return False
+        state["pinned"] = bool(cache.get(_pin_cache_key(user_id)))
+    return state["pinned"]
+
+
+def _reads_from_primary(model) -> bool:
+    # Session and user lookups feed authentication itself, so they never ask
+    # the pin check (which would need the user they are loading).
+    opts = model._meta
+    return opts.app_label in PRIMARY_APP_LABELS or opts.label == settings.AUTH_USER_MODEL
+
+
+def set_read_user(user_id) -> None:
+    """
+    Record the authenticated user of the current request for the pin check.
+
+    Called by the DRF authenticator (see accounts.authentication); the
+    router itself never evaluates `request.user`.
+    """
+
+    state = _read_state.get()
+    if state is not None:
+        state["user_id"] = user_id
+        state.pop("pinned", None)
+
+
+def use_replica() -> contextvars.Token:
+    return _read_state.set({})
+
+
+def use_primary() -> contextvars.Token:
+    return _read_state.set(None)
+
+
+def reset_read_state(token: contextvars.Token) -> None:
+    _read_state.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Send reads to a replica of the database the other routers would pick.
+
+    Only reads made while a view has opted in (see ReadReplicaMiddleware)
+    go to replicas; everything else, reads inside a transaction, session
+    and user lookups, and reads by a client pinned after a recent write
+    stay on the primary. Must be
+    listed first in DATABASE_ROUTERS.
+    """
+
+    def _primary_for(self, action: str, model, **hints) -> str:
+        for other in router.routers:
+            if other is self:
+                continue
+            method = getattr(other, action, None)
+            database = method(model, **hints) if method else None
+            if database:
+                return primary_of(database)
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return primary_of(instance._state.db)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        primary = self._primary_for("db_for_read", model, **hints)
+        replicas = replica_map().get(primary)
+        state = _read_state.get()
+        if (
+            not replicas
+            or state is None
+            or connections[primary].in_atomic_block
+            or _reads_from_primary(model)
+            or _is_pinned(state)
+        ):
+            return primary
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Instances read from a replica must still be written to the primary.
+        return self._primary_for("db_for_write", model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if primary_of(obj1._state.db or DEFAULT_DB_ALIAS) == primary_of(
+            obj2._state.db or DEFAULT_DB_ALIAS
+        ):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if primary_of(db) != db:
+            return False
+        return None
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.routers import (
+    ReadReplicaRouter,
+    pin_to_primary,
+    reset_read_state,
+    set_read_user,
+    use_primary,
+    use_replica,
+)
+from organizations.models import Membership, Organization
+from projects.models import Project
+
+
+@override_settings(DATABASE_REPLICAS={"default": ["replica"]})
+class ReadReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReadReplicaRouter()
+        token = use_replica()
+        self.addCleanup(reset_read_state, token)
+
+    def test_opted_in_reads_go_to_a_replica(self):
+        self.assertEqual(self.router.db_for_read(Project), "replica")
+
+    def test_reads_outside_opted_in_views_stay_on_primary(self):
+        token = use_primary()
+        self.addCleanup(reset_read_state, token)
+        self.assertEqual(self.router.db_for_read(Project), "default")
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Project), "default")
+
+    def test_reads_inside_a_transaction_stay_on_primary(self):
+        connection = connections["default"]
+        connection.in_atomic_block = True
+        self.addCleanup(setattr, connection, "in_atomic_block", False)
+        self.assertEqual(self.router.db_for_read(Project), "default")
+
+    def test_session_and_user_reads_stay_on_primary(self):
+        self.assertEqual(self.router.db_for_read(Session), "default")
+        self.assertEqual(self.router.db_for_read(get_user_model()), "default")
+
+    def test_pinned_user_reads_from_primary(self):
+        pin_to_primary(1)
+        set_read_user(1)
+        self.assertEqual(self.router.db_for_read(Project), "default")
+
+        set_read_user(2)
+        self.assertEqual(self.router.db_for_read(Project), "replica")
+
+    def test_unauthenticated_reads_are_not_pinned(self):
+        pin_to_primary(1)
+        self.assertEqual(self.router.db_for_read(Project), "replica")
+
+
+# The primary doubles as its own replica so the routing path runs against the
+# single test database.
+@override_settings(
+    DATABASE_REPLICAS={"default": ["default"]},
+    DATABASE_ROUTERS=["core.routers.ReadReplicaRouter"],
+)
+class ReadReplicaMiddlewareTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+        Membership.objects.create(user=self.user, organization=self.organization, role="owner")
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + str(RefreshToken.for_user(self.user).access_token),
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+        )
+
+    def test_opted_in_view_with_session_cookie(self):
+        # Loading the session user must not recurse through the router.
+        self.client.force_login(self.user)
+        response = self.client.get("/api/v1/projects/projects/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_successful_write_pins_the_user(self):
+        response = self.client.post("/api/v1/projects/projects/", {"name": "Launch"})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(cache.get(f"replica:pin:{self.user.pk}"))
+
+    def test_failed_write_does_not_pin(self):
+        response = self.client.post("/api/v1/projects/projects/", {})
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(cache.get(f"replica:pin:{self.user.pk}"))
@@ -23,16 +23,15 @@ const Dashboard = () => {
   const fetchStats = async () => {
     try {
       setLoading(true)
-      const [projectsRes, tasksRes] = await Promise.all([
-        api.get('/analytics/active-projects/'),
-        api.get('/analytics/task-completion-rate/'),
-      ])
+      const { data } = await api.get('/analytics/summary/', {
+        params: { include: 'projects,tasks' },
+      })
       setStats({
-        activeProjects: projectsRes.data.active_projects || 0,
-        overdueProjects: projectsRes.data.overdue_projects || 0,
-        totalTasks: tasksRes.data.total_tasks || 0,
-        completedTasks: tasksRes.data.completed_tasks || 0,
-        completionRate: tasksRes.data.completion_rate || 0,
+        activeProjects: data.projects?.active_projects || 0,
+        overdueProjects: data.projects?.overdue_projects || 0,
+        totalTasks: data.tasks?.total_tasks || 0,
+        completedTasks: data.tasks?.completed_tasks || 0,
+        completionRate: data.tasks?.completion_rate || 0,
       })
     } catch (error) {
       console.error('Failed to fetch stats:', error)
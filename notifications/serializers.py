@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
+from core.fieldsets import SparseFieldsetSerializerMixin
+
 from .models import Notification
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = [
@@ -1,11 +1,13 @@
 from django.utils import timezone
 from rest_framework import permissions, viewsets, decorators, response
 
+from core.fieldsets import SparseFieldsetViewMixin
+
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     List and manage notifications for the current user.
     """
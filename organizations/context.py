@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Membership
+
+
+_MISSING = "__missing__"
+
+_UNKNOWN = object()
+
+# Access-token claims used when settings.TENANCY_JWT_CLAIMS is enabled.
+ORGANIZATIONS_CLAIM = "orgs"
+MEMBERSHIP_VERSION_CLAIM = "mv"
+
+
+def _membership_cache_key(user_id, organization_id) -> str:
+    return f"tenant:membership:{user_id}:{organization_id}"
+
+
+def _membership_version_key(user_id) -> str:
+    return f"tenant:membership-version:{user_id}"
+
+
+def _http_request(request):
+    # DRF wraps the Django request; store state on the underlying object so it
+    # is shared by middleware, permissions and views alike.
+    return getattr(request, "_request", request)
+
+
+def get_membership(user_id, organization_id) -> Optional[Membership]:
+    """
+    Cached lookup of a user's membership in an organization.
+
+    Results (including "not a member") are kept in the shared cache and
+    invalidated by the Membership signals in `organizations.signals`.
+    """
+
+    key = _membership_cache_key(user_id, organization_id)
+    membership = cache.get(key)
+    if membership is None:
+        membership = (
+            Membership.objects.filter(user_id=user_id, organization_id=organization_id)
+            .only("id", "user_id", "organization_id", "role")
+            .first()
+        ) or _MISSING
+        ttl = getattr(settings, "TENANT_CACHE", {}).get("MEMBERSHIP_TTL", 300)
+        cache.set(key, membership, timeout=ttl)
+    return None if membership == _MISSING else membership
+
+
+def get_request_membership(request) -> Optional[Membership]:
+    """
+    Resolve the current user's membership in `request.organization` once per
+    request and attach it as `request.membership`.
+    """
+
+    org = getattr(request, "organization", None)
+    user = getattr(request, "user", None)
+    if not org or user is None or not user.is_authenticated:
+        return None
+
+    http_request = _http_request(request)
+    resolved = getattr(http_request, "_membership_for", None)
+    if resolved == (user.pk, org.pk):
+        return http_request.membership
+
+    membership = _membership_from_claims(request, user, org)
+    if membership is _UNKNOWN:
+        membership = get_membership(user.pk, org.pk)
+    http_request._membership_for = (user.pk, org.pk)
+    http_request.membership = membership
+    return membership
+
+
+def _membership_from_claims(request, user, org):
+    """
+    Build the membership from signed access-token claims.
+
+    Returns `_UNKNOWN` when the token carries no claims or when its membership
+    version no longer matches the user's current one, in which case the
+    caller falls back to the cached database lookup.
+    """
+
+    token = getattr(request, "auth", None)
+    if token is None or not hasattr(token, "get"):
+        return _UNKNOWN
+    organizations = token.get(ORGANIZATIONS_CLAIM)
+    if organizations is None:
+        return _UNKNOWN
+    version = token.get(MEMBERSHIP_VERSION_CLAIM)
+    if version is None or version != get_membership_version(user.pk):
+        return _UNKNOWN
+
+    role = organizations.get(str(org.pk))
+    if role is None:
+        return None
+    return Membership(user_id=user.pk, organization_id=org.pk, role=role)
+
+
+def build_membership_claims(user_id) -> Dict[str, object]:
+    """
+    Claims describing a user's memberships, for embedding in access tokens.
+    """
+
+    # Read the version first: a membership change racing with this call then
+    # leaves the token with an outdated version rather than outdated roles.
+    version = ensure_membership_version(user_id)
+    organizations = {
+        str(organization_id): role
+        for organization_id, role in Membership.objects.filter(
+            user_id=user_id
+        ).values_list("organization_id", "role")
+    }
+    return {ORGANIZATIONS_CLAIM: organizations, MEMBERSHIP_VERSION_CLAIM: version}
+
+
+def get_membership_version(user_id) -> Optional[int]:
+    return cache.get(_membership_version_key(user_id))
+
+
+def ensure_membership_version(user_id) -> int:
+    key = _membership_version_key(user_id)
+    # Seed with a timestamp so a version lost to cache eviction never
+    # restarts at a value an older token might still carry.
+    cache.add(key, int(time.time() * 1000), timeout=None)
+    return cache.get(key)
+
+
+def bump_membership_version(user_id) -> None:
+    key = _membership_version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def invalidate_membership(user_id, organization_id) -> None:
+    cache.delete(_membership_cache_key(user_id, organization_id))
+    bump_membership_version(user_id)
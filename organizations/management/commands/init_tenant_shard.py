@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.sharding import set_id_offset, shard_aliases, sync_reference_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare a migrated tenant shard: mirror users/organizations onto it "
+        "and optionally offset its primary-key sequences."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("database", help="Shard alias from settings.TENANT_SHARDS.")
+        parser.add_argument(
+            "--id-offset",
+            type=int,
+            help="Start tenant table sequences at this value (e.g. 10**12 per shard).",
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        if alias not in shard_aliases():
+            raise CommandError(f"{alias!r} is not listed in settings.TENANT_SHARDS.")
+
+        sync_reference_rows(alias)
+        if options["id_offset"] is not None:
+            set_id_offset(alias, options["id_offset"])
+        self.stdout.write(self.style.SUCCESS(f"Shard {alias} is ready."))
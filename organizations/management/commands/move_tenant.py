@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from organizations.models import Organization, TenantShard
+from organizations.sharding import (
+    copy_rows,
+    get_tenant_placement,
+    invalidate_tenant_placement,
+    organization_lookup,
+    shard_aliases,
+    sync_reference_rows,
+    tenant_models,
+)
+
+
+def _chunks(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move an organization's data to another database shard while it stays "
+        "online. Rows are bulk copied, then changes are caught up; writes are "
+        "refused only during the short final sync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Organization slug.")
+        parser.add_argument("database", help="Target database alias.")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--catch-up-passes",
+            type=int,
+            default=3,
+            help="Incremental copy passes to run before switching to read-only.",
+        )
+        parser.add_argument(
+            "--drain-seconds",
+            type=float,
+            default=5.0,
+            help="Wait after switching to read-only so in-flight writes finish.",
+        )
+        parser.add_argument(
+            "--keep-source",
+            action="store_true",
+            help="Leave the copied rows on the source database.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(slug=options["slug"])
+        except Organization.DoesNotExist as exc:
+            raise CommandError(f"Unknown organization {options['slug']!r}.") from exc
+
+        target = options["database"]
+        if target != DEFAULT_DB_ALIAS and target not in shard_aliases():
+            raise CommandError(f"{target!r} is not listed in settings.TENANT_SHARDS.")
+        source, _ = get_tenant_placement(organization.pk)
+        if source == target:
+            raise CommandError(f"{organization.slug} already lives on {target}.")
+
+        self.organization = organization
+        self.chunk_size = options["chunk_size"]
+        self.source, self.target = source, target
+
+        if target != DEFAULT_DB_ALIAS:
+            sync_reference_rows(target)
+        self._check_primary_keys()
+
+        # Bulk copy, then catch up on rows changed meanwhile.
+        watermark = timezone.now()
+        self._copy_all(since=None)
+        for _ in range(options["catch_up_passes"]):
+            next_watermark = timezone.now()
+            copied = self._copy_all(since=watermark)
+            watermark = next_watermark
+            if not copied:
+                break
+
+        # Cut over: freeze writes, sync the tail (including deletions), switch.
+        self._set_placement(source, read_only=True)
+        try:
+            time.sleep(options["drain_seconds"])
+            self._copy_all(since=watermark)
+            self._remove_deleted_rows()
+            self._set_placement(target, read_only=False)
+        except BaseException:
+            self._set_placement(source, read_only=False)
+            raise
+
+        if not options["keep_source"]:
+            self._delete_source_rows()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Moved {organization.slug} from {source} to {target}.")
+        )
+
+    # Helpers
+
+    def _tenant_queryset(self, model, alias):
+        lookup = organization_lookup(model)
+        return model._base_manager.using(alias).filter(**{lookup: self.organization.pk})
+
+    def _source_pks(self, model):
+        return self._tenant_queryset(model, self.source).values_list("pk", flat=True)
+
+    def _target_pks(self, model):
+        return self._tenant_queryset(model, self.target).values_list("pk", flat=True)
+
+    def _check_primary_keys(self) -> None:
+        for model in tenant_models():
+            for chunk in _chunks(self._source_pks(model).iterator(), 500):
+                clash = (
+                    model._base_manager.using(self.target)
+                    .filter(pk__in=chunk)
+                    .exclude(**{organization_lookup(model): self.organization.pk})
+                    .exists()
+                )
+                if clash:
+                    raise CommandError(
+                        f"{model._meta.label} primary keys collide on {self.target}; "
+                        "initialise shards with init_tenant_shard --id-offset."
+                    )
+
+    def _copy_all(self, since: Optional[object]) -> int:
+        copied = 0
+        for model in tenant_models():
+            copied += self._copy_model(model, since)
+        return copied
+
+    def _copy_model(self, model, since) -> int:
+        queryset = self._tenant_queryset(model, self.source).order_by("pk")
+        if since is not None:
+            try:
+                model._meta.get_field("updated_at")
+            except FieldDoesNotExist:
+                # Insert-only models (status transitions, audit checkpoints)
+                # have no updated_at: catch up by copying the rows still
+                # missing on the target rather than all of them again.
+                return self._copy_missing_rows(model)
+            queryset = queryset.filter(updated_at__gte=since)
+
+        copied = 0
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            rows = list(chunk.values(*self._attnames(model))[: self.chunk_size])
+            if not rows:
+                break
+            with transaction.atomic(using=self.target):
+                copy_rows(model, rows, self.target)
+            copied += len(rows)
+            last_pk = rows[-1][model._meta.pk.attname]
+        return copied
+
+    def _copy_missing_rows(self, model) -> int:
+        # Two primary-key scans instead of re-copying every row; unlike a pk
+        # watermark this also finds rows whose transaction committed late.
+        missing = set(self._source_pks(model).iterator()) - set(self._target_pks(model).iterator())
+        copied = 0
+        for chunk in _chunks(sorted(missing), self.chunk_size):
+            rows = list(
+                self._tenant_queryset(model, self.source).filter(pk__in=chunk).values(*self._attnames(model))
+            )
+            with transaction.atomic(using=self.target):
+                copy_rows(model, rows, self.target)
+            copied += len(rows)
+        return copied
+
+    def _attnames(self, model):
+        return [field.attname for field in model._meta.concrete_fields]
+
+    def _remove_deleted_rows(self) -> None:
+        for model in reversed(tenant_models()):
+            source_pks = set(self._source_pks(model).iterator())
+            target_pks = set(self._target_pks(model).iterator())
+            for chunk in _chunks(target_pks - source_pks, 500):
+                # Raw delete: no cascades or signals, these rows are already
+                # gone from the tenant's point of view.
+                model._base_manager.using(self.target).filter(pk__in=chunk)._raw_delete(
+                    self.target
+                )
+
+    def _delete_source_rows(self) -> None:
+        for model in reversed(tenant_models()):
+            while True:
+                chunk = list(self._source_pks(model)[: self.chunk_size])
+                if not chunk:
+                    break
+                model._base_manager.using(self.source).filter(pk__in=chunk)._raw_delete(
+                    self.source
+                )
+
+    def _set_placement(self, database: str, read_only: bool) -> None:
+        TenantShard.objects.update_or_create(
+            organization=self.organization,
+            defaults={"database": database, "read_only": read_only},
+        )
+        invalidate_tenant_placement(self.organization.pk)
@@ -2,9 +2,19 @@ from __future__ import annotations
 
 from typing import Optional
 
-from django.http import HttpRequest
+from django.http import HttpRequest, JsonResponse
 
 from .models import Organization
+from .resolver import get_organization_by_slug
+from .sharding import (
+    activate_tenant,
+    deactivate_tenant,
+    get_current_tenant,
+    shard_aliases,
+)
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
 
 class CurrentOrganizationMiddleware:
@@ -12,7 +22,12 @@ class CurrentOrganizationMiddleware:
     Simple multi-tenant middleware.
 
     For now, it expects an `X-Organization-Slug` header and attaches the
-    matching Organization instance to `request.organization`.
+    matching Organization instance to `request.organization`. Lookups go
+    through the cached resolver in `organizations.resolver`.
+
+    When tenant shards are configured the organization also becomes the
+    current tenant for `organizations.routers.TenantShardRouter`, and writes
+    are refused while the tenant is being moved between shards.
     """
 
     def __init__(self, get_response):
@@ -20,7 +35,22 @@ class CurrentOrganizationMiddleware:
 
     def __call__(self, request: HttpRequest):
         request.organization = self._get_organization_from_request(request)
-        return self.get_response(request)
+        if not shard_aliases():
+            return self.get_response(request)
+
+        token = activate_tenant(request.organization)
+        try:
+            tenant = get_current_tenant()
+            if tenant is not None and tenant[2] and request.method not in SAFE_METHODS:
+                response = JsonResponse(
+                    {"detail": "Organization is being migrated; try again shortly."},
+                    status=503,
+                )
+                response["Retry-After"] = "30"
+                return response
+            return self.get_response(request)
+        finally:
+            deactivate_tenant(token)
 
     def _get_organization_from_request(
         self, request: HttpRequest
@@ -30,8 +60,5 @@ class CurrentOrganizationMiddleware:
         )
         if not slug:
             return None
-        try:
-            return Organization.objects.get(slug=slug)
-        except Organization.DoesNotExist:
-            return None
+        return get_organization_by_slug(slug)
 
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('database', models.CharField(max_length=100)),
+                ('read_only', models.BooleanField(default=False)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='shard', to='organizations.organization')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
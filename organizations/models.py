@@ -8,6 +8,13 @@ class Organization(TimeStampedModel):
     name = models.CharField(max_length=255)
     slug = models.SlugField(unique=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the persisted slug so renames can invalidate the old key.
+        instance._loaded_slug = instance.__dict__.get("slug")
+        return instance
+
     def __str__(self) -> str:  # pragma: no cover - trivial
         return self.name
 
@@ -43,3 +50,23 @@ class Membership(TimeStampedModel):
     def __str__(self) -> str:  # pragma: no cover - trivial
         return f"{self.user} in {self.organization} ({self.role})"
 
+
+
+class TenantShard(TimeStampedModel):
+    """
+    Tenant directory entry: which database alias holds an organization's data.
+
+    Organizations without an entry live on the default database. `read_only`
+    is set while a tenant is being moved between shards.
+    """
+
+    organization = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="shard",
+    )
+    database = models.CharField(max_length=100)
+    read_only = models.BooleanField(default=False)
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"{self.organization} on {self.database}"
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import permissions
 
+from .context import get_request_membership
 from .models import Membership
 
 
@@ -13,11 +14,7 @@ class IsOrganizationMember(permissions.BasePermission):
     """
 
     def has_permission(self, request, view) -> bool:
-        org = getattr(request, "organization", None)
-        user = request.user
-        if not org or not user.is_authenticated:
-            return False
-        return Membership.objects.filter(user=user, organization=org).exists()
+        return get_request_membership(request) is not None
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -26,14 +23,8 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     """
 
     def has_permission(self, request, view) -> bool:
-        org = getattr(request, "organization", None)
-        user = request.user
-        if not org or not user.is_authenticated:
-            return False
-
-        return Membership.objects.filter(
-            user=user,
-            organization=org,
-            role__in=[Membership.OWNER, Membership.ADMIN],
-        ).exists()
-
+        membership = get_request_membership(request)
+        return membership is not None and membership.role in (
+            Membership.OWNER,
+            Membership.ADMIN,
+        )
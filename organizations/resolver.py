@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Organization
+
+
+_MISSING = "__missing__"
+
+_GENERATION_KEY = "tenant:generation"
+
+
+def _tenant_cache_setting(name: str, default):
+    return getattr(settings, "TENANT_CACHE", {}).get(name, default)
+
+
+class OrganizationResolver:
+    """
+    Two-tier slug -> Organization cache used by the tenant middleware.
+
+    Lookups hit a small in-process LRU first, then the shared Django cache,
+    and only fall back to the database on a miss in both. Unknown slugs are
+    cached as well (for `NEGATIVE_TTL` seconds) so bogus slugs never reach
+    the database repeatedly.
+
+    Local entries are tagged with a generation counter kept in the shared
+    cache; saving or deleting any organization bumps it, which makes every
+    process drop its local copies. Each process reads the counter at most
+    once per `GENERATION_TTL` seconds, so local hits cost no round trip to
+    the shared cache: other processes may keep serving a renamed or deleted
+    organization for up to that long (the process making the change sees
+    it at once).
+    """
+
+    def __init__(self) -> None:
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # (generation, monotonic time it was read) or None.
+        self._checked_generation: Optional[tuple] = None
+
+    # Cache keys
+
+    @staticmethod
+    def _cache_key(slug: str) -> str:
+        return f"tenant:slug:{slug}"
+
+    def _generation(self) -> int:
+        checked = self._checked_generation
+        now = time.monotonic()
+        if checked is not None and now - checked[1] < _tenant_cache_setting("GENERATION_TTL", 1):
+            return checked[0]
+        generation = cache.get(_GENERATION_KEY)
+        if generation is None:
+            cache.add(_GENERATION_KEY, 1, timeout=None)
+            generation = cache.get(_GENERATION_KEY, 1)
+        self._checked_generation = (generation, now)
+        return generation
+
+    # Local LRU
+
+    def _get_local(self, slug: str, generation: int):
+        with self._lock:
+            entry = self._local.get(slug)
+            if entry is None:
+                return None
+            value, entry_generation, expires_at = entry
+            if entry_generation != generation or expires_at < time.monotonic():
+                del self._local[slug]
+                return None
+            self._local.move_to_end(slug)
+            return value
+
+    def _set_local(self, slug: str, value, generation: int, ttl: int) -> None:
+        max_entries = _tenant_cache_setting("LOCAL_MAX_ENTRIES", 1024)
+        with self._lock:
+            self._local[slug] = (value, generation, time.monotonic() + ttl)
+            self._local.move_to_end(slug)
+            while len(self._local) > max_entries:
+                self._local.popitem(last=False)
+
+    # Public API
+
+    def resolve(self, slug: str) -> Optional[Organization]:
+        ttl = _tenant_cache_setting("TTL", 300)
+        negative_ttl = _tenant_cache_setting("NEGATIVE_TTL", 30)
+        generation = self._generation()
+
+        value = self._get_local(slug, generation)
+        if value is None:
+            value = cache.get(self._cache_key(slug))
+            if value is None:
+                try:
+                    value = Organization.objects.get(slug=slug)
+                except Organization.DoesNotExist:
+                    value = _MISSING
+                cache.set(
+                    self._cache_key(slug),
+                    value,
+                    timeout=negative_ttl if value == _MISSING else ttl,
+                )
+            self._set_local(
+                slug, value, generation, negative_ttl if value == _MISSING else ttl
+            )
+
+        return None if value == _MISSING else value
+
+    def invalidate(self, *slugs: Optional[str]) -> None:
+        keys = [self._cache_key(slug) for slug in slugs if slug]
+        if keys:
+            cache.delete_many(keys)
+        try:
+            cache.incr(_GENERATION_KEY)
+        except ValueError:
+            cache.add(_GENERATION_KEY, 1, timeout=None)
+        self._checked_generation = None
+        with self._lock:
+            for slug in slugs:
+                self._local.pop(slug, None)
+
+    def clear_local(self) -> None:
+        self._checked_generation = None
+        with self._lock:
+            self._local.clear()
+
+
+resolver = OrganizationResolver()
+
+
+def get_organization_by_slug(slug: str) -> Optional[Organization]:
+    return resolver.resolve(slug)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Organization
+from .sharding import get_current_tenant, get_tenant_placement, organization_lookup
+
+
+def _database_for_new_instance(instance) -> Optional[str]:
+    """
+    Shard of an unsaved tenant instance, following only parents that are
+    already cached on it (never issuing a query).
+    """
+
+    path = organization_lookup(type(instance)).split("__")
+    obj = instance
+    for part in path[:-1]:
+        obj = obj._state.fields_cache.get(part)
+        if obj is None:
+            return None
+        if obj._state.db:
+            return obj._state.db
+    organization_id = getattr(obj, f"{path[-1]}_id", None)
+    if organization_id is None:
+        return None
+    return get_tenant_placement(organization_id)[0]
+
+
+class TenantShardRouter:
+    """
+    Route tenant-owned models to the shard of their organization.
+
+    The organization comes from the instance being saved or traversed when
+    Django passes one, and from the current tenant (set per request by
+    CurrentOrganizationMiddleware, or by `sharding.tenant_context`)
+    otherwise. Global models (users, organizations, memberships, the tenant
+    directory, ...) always live on the default database.
+    """
+
+    def _db_for_model(self, model, **hints) -> str:
+        if organization_lookup(model) is None:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get("instance")
+        if instance is not None:
+            if isinstance(instance, Organization):
+                return get_tenant_placement(instance.pk)[0]
+            if organization_lookup(type(instance)) is not None:
+                database = instance._state.db or _database_for_new_instance(instance)
+                if database:
+                    return database
+
+        tenant = get_current_tenant()
+        if tenant is not None:
+            return tenant[1]
+        return DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Global rows are mirrored onto every shard, so tenant rows may always
+        # point at them; tenant rows may only relate within one database.
+        if organization_lookup(type(obj1)) is None or organization_lookup(type(obj2)) is None:
+            return True
+        return obj1._state.db == obj2._state.db or None
@@ -1,20 +1,22 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from core.fieldsets import SparseFieldsetSerializerMixin
+
 from .models import Organization, Membership
 
 
 User = get_user_model()
 
 
-class OrganizationSerializer(serializers.ModelSerializer):
+class OrganizationSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Organization
         fields = ["id", "name", "slug", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
-class MembershipSerializer(serializers.ModelSerializer):
+class MembershipSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
 
     class Meta:
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, models
+
+from core.models import OrganizationScopedModel
+
+from .models import Organization, TenantShard
+
+
+# Tenant-owned models that do not derive from OrganizationScopedModel, mapped
+# to the lookup path of their organization. OrganizationScopedModel
+# subclasses are sharded automatically via "organization".
+TENANT_MODEL_PATHS: Dict[str, str] = {
+    "tasks.TaskComment": "task__organization",
+    "tasks.TaskAttachment": "task__organization",
+    "tasks.TaskStatusTransition": "organization",
+    "billing.InvoiceItem": "invoice__organization",
+    "billing.InvoiceSequence": "organization",
+    "audit.AuditLog": "organization",
+    "audit.AuditCheckpoint": "organization",
+}
+
+# (organization_id, database alias, read_only) for the tenant of the current
+# request or background job.
+_current_tenant: contextvars.ContextVar[Optional[Tuple[int, str, bool]]] = (
+    contextvars.ContextVar("current_tenant", default=None)
+)
+
+
+def shard_aliases() -> List[str]:
+    return list(getattr(settings, "TENANT_SHARDS", []))
+
+
+def organization_lookup(model: Type[models.Model]) -> Optional[str]:
+    """
+    Lookup path from a model to its organization, or None for global models.
+    """
+
+    if issubclass(model, OrganizationScopedModel):
+        return "organization"
+    return TENANT_MODEL_PATHS.get(model._meta.label)
+
+
+def tenant_models() -> List[Type[models.Model]]:
+    """
+    All tenant-owned models, parents before children.
+    """
+
+    pending = [m for m in apps.get_models() if organization_lookup(m) is not None]
+    ordered: List[Type[models.Model]] = []
+    while pending:
+        for model in pending:
+            parents = {
+                field.related_model
+                for field in model._meta.concrete_fields
+                if field.is_relation and field.related_model is not model
+            }
+            if not any(parent in pending for parent in parents):
+                ordered.append(model)
+                pending.remove(model)
+                break
+        else:  # pragma: no cover - defensive, cyclic tenant relations
+            ordered.extend(pending)
+            break
+    return ordered
+
+
+# Directory lookups
+
+
+def _placement_cache_key(organization_id) -> str:
+    return f"tenant:shard:{organization_id}"
+
+
+def get_tenant_placement(organization_id) -> Tuple[str, bool]:
+    """
+    (database alias, read_only) for an organization, cached in the shared
+    cache and invalidated when its TenantShard entry changes.
+    """
+
+    key = _placement_cache_key(organization_id)
+    placement = cache.get(key)
+    if placement is None:
+        entry = (
+            TenantShard.objects.using(DEFAULT_DB_ALIAS)
+            .filter(organization_id=organization_id)
+            .values_list("database", "read_only")
+            .first()
+        )
+        placement = tuple(entry) if entry else (DEFAULT_DB_ALIAS, False)
+        cache.set(key, placement, timeout=None)
+    return placement
+
+
+def invalidate_tenant_placement(organization_id) -> None:
+    cache.delete(_placement_cache_key(organization_id))
+
+
+# Current tenant
+
+
+def get_current_tenant() -> Optional[Tuple[int, str, bool]]:
+    return _current_tenant.get()
+
+
+def activate_tenant(organization: Optional[Organization]) -> contextvars.Token:
+    if organization is None:
+        return _current_tenant.set(None)
+    alias, read_only = get_tenant_placement(organization.pk)
+    return _current_tenant.set((organization.pk, alias, read_only))
+
+
+def deactivate_tenant(token: contextvars.Token) -> None:
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def tenant_context(organization_id) -> Iterator[None]:
+    """
+    Route tenant queries to the organization's shard, e.g. in Celery tasks.
+    """
+
+    alias, read_only = get_tenant_placement(organization_id)
+    token = _current_tenant.set((organization_id, alias, read_only))
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+# Reference rows
+
+
+def _reference_models() -> List[Type[models.Model]]:
+    return [get_user_model(), Organization]
+
+
+def _reference_fields(model: Type[models.Model]) -> List[models.Field]:
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if not field.is_relation
+    ]
+
+
+def mirror_reference_rows(instances, aliases: Optional[List[str]] = None) -> None:
+    """
+    Copy users/organizations onto shards so tenant rows there can reference
+    them. Mirrored users carry an unusable password; authentication always
+    happens against the default database.
+    """
+
+    aliases = shard_aliases() if aliases is None else aliases
+    instances = list(instances)
+    if not instances or not aliases:
+        return
+    model = type(instances[0])
+    fields = _reference_fields(model)
+    rows = []
+    for instance in instances:
+        values = {field.attname: getattr(instance, field.attname) for field in fields}
+        if "password" in values:
+            values["password"] = "!"
+        rows.append(values)
+    for alias in aliases:
+        copy_rows(model, rows, alias)
+
+
+def delete_reference_row(instance: models.Model) -> None:
+    for alias in shard_aliases():
+        type(instance)._base_manager.using(alias).filter(pk=instance.pk).delete()
+
+
+def sync_reference_rows(alias: str, chunk_size: int = 1000) -> None:
+    for model in _reference_models():
+        queryset = model._base_manager.using(DEFAULT_DB_ALIAS).order_by("pk")
+        last_pk = None
+        while True:
+            chunk = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            instances = list(chunk[:chunk_size])
+            if not instances:
+                break
+            mirror_reference_rows(instances, [alias])
+            last_pk = instances[-1].pk
+
+
+# Row copying
+
+
+def copy_rows(model: Type[models.Model], rows: List[Dict[str, object]], alias: str) -> None:
+    """
+    Upsert raw rows (attname -> python value) into `alias`, keeping primary
+    keys and timestamps exactly as they are in the source.
+    """
+
+    if not rows:
+        return
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+    fields = [
+        field for field in model._meta.concrete_fields if field.attname in rows[0]
+    ]
+    pk_column = model._meta.pk.column
+    columns = ", ".join(quote(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    updates = ", ".join(
+        f"{quote(field.column)} = excluded.{quote(field.column)}"
+        for field in fields
+        if not field.primary_key
+    )
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({quote(pk_column)}) DO UPDATE SET {updates}"
+    )
+    params = [
+        [field.get_db_prep_save(row[field.attname], connection) for field in fields]
+        for row in rows
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+def set_id_offset(alias: str, offset: int) -> None:
+    """
+    Start the auto-increment sequences of tenant tables on `alias` at
+    `offset`, so rows created on different shards never share a primary key
+    and tenants can be moved without renumbering.
+    """
+
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        for model in tenant_models():
+            table = model._meta.db_table
+            if connection.vendor == "sqlite":
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name = %s", [table])
+                cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                    [table, offset],
+                )
+            elif connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, %s), %s)",
+                    [table, model._meta.pk.column, offset],
+                )
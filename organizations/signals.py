@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .context import bump_membership_version, invalidate_membership
+from .models import Membership, Organization, TenantShard
+from .resolver import resolver
+from .sharding import (
+    delete_reference_row,
+    invalidate_tenant_placement,
+    mirror_reference_rows,
+)
+
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_organization_cache(sender, instance: Organization, **kwargs) -> None:
+    resolver.invalidate(instance.slug, getattr(instance, "_loaded_slug", None))
+    instance._loaded_slug = instance.slug
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_membership_cache(sender, instance: Membership, **kwargs) -> None:
+    user_id, organization_id = instance.user_id, instance.organization_id
+    invalidate_membership(user_id, organization_id)
+    # Invalidate again once committed so concurrent readers cannot re-cache
+    # (or mint tokens from) the pre-commit state.
+    transaction.on_commit(lambda: invalidate_membership(user_id, organization_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_tokens(sender, instance, signal, **kwargs) -> None:
+    # Access tokens of a user skip the user lookup only while their
+    # membership version is current; see accounts.authentication.
+    if signal is post_save and instance.is_active:
+        return
+    user_id = instance.pk
+    bump_membership_version(user_id)
+    transaction.on_commit(lambda: bump_membership_version(user_id))
+
+
+@receiver(post_save, sender=TenantShard)
+@receiver(post_delete, sender=TenantShard)
+def invalidate_tenant_placement_cache(sender, instance: TenantShard, **kwargs) -> None:
+    organization_id = instance.organization_id
+    invalidate_tenant_placement(organization_id)
+    transaction.on_commit(lambda: invalidate_tenant_placement(organization_id))
+
+
+# Users and organizations are mirrored onto every tenant shard so that
+# sharded rows can keep their foreign keys to them.
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Organization)
+def mirror_reference_row(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+    if using == DEFAULT_DB_ALIAS:
+        mirror_reference_rows([instance])
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Organization)
+def delete_mirrored_reference_row(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+    if using == DEFAULT_DB_ALIAS:
+        delete_reference_row(instance)
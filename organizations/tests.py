@@ -0,0 +1,172 @@
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, router
+from django.test import TestCase, override_settings
+
+from organizations.management.commands.move_tenant import Command as MoveTenantCommand
+from organizations.models import Organization, TenantShard
+from organizations.resolver import _GENERATION_KEY, OrganizationResolver, resolver
+from organizations.sharding import get_tenant_placement, tenant_context
+from projects.models import Project
+from tasks.models import Task, TaskComment, TaskStatusTransition
+
+
+class OrganizationResolverTests(TestCase):
+    # Saving an organization mirrors it onto any configured shards.
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        resolver.clear_local()
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+
+    def generation_reads(self, calls):
+        return sum(1 for call in calls.call_args_list if call.args[0] == _GENERATION_KEY)
+
+    def test_generation_is_read_once_per_ttl(self):
+        with mock.patch("organizations.resolver.cache.get", wraps=cache.get) as get:
+            for _ in range(5):
+                self.assertEqual(resolver.resolve("acme"), self.organization)
+        self.assertEqual(self.generation_reads(get), 1)
+
+    @override_settings(TENANT_CACHE={"GENERATION_TTL": 60})
+    def test_changes_reach_other_processes_after_the_ttl(self):
+        other_process = OrganizationResolver()
+        self.assertEqual(resolver.resolve("acme").name, "Acme")
+        self.assertEqual(other_process.resolve("acme").name, "Acme")
+
+        self.organization.name = "Acme Corp"
+        self.organization.save()
+        # The saving process sees the change at once; others within the TTL
+        # may still serve their local copy.
+        self.assertEqual(resolver.resolve("acme").name, "Acme Corp")
+        self.assertEqual(other_process.resolve("acme").name, "Acme")
+
+        with mock.patch("organizations.resolver.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(other_process.resolve("acme").name, "Acme Corp")
+
+
+# Run with two shards, e.g. TENANT_SHARDS="shard1 shard2" python manage.py
+# test organizations.tests; each shard gets its own SQLite test database.
+@skipUnless(len(settings.TENANT_SHARDS) >= 2, "needs TENANT_SHARDS with two shards")
+class ShardingTestCase(TestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.shard, self.other_shard = settings.TENANT_SHARDS[:2]
+        self.user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+
+    def place(self, organization, database, read_only=False):
+        TenantShard.objects.update_or_create(
+            organization=organization, defaults={"database": database, "read_only": read_only}
+        )
+
+    def create_task(self, title, status=Task.STATUS_TODO):
+        with tenant_context(self.organization.pk):
+            project = Project.objects.filter(organization=self.organization).first()
+            if project is None:
+                project = Project.objects.create(organization=self.organization, name="Launch")
+            return Task.objects.create(organization=self.organization, project=project, title=title, status=status)
+
+
+class TenantShardRouterTests(ShardingTestCase):
+    def test_tenant_rows_live_on_the_organization_shard(self):
+        self.place(self.organization, self.shard)
+        task = self.create_task("Write docs")
+
+        self.assertEqual(task._state.db, self.shard)
+        self.assertFalse(Task.objects.using(DEFAULT_DB_ALIAS).filter(pk=task.pk).exists())
+        with tenant_context(self.organization.pk):
+            self.assertEqual(Task.objects.get().title, "Write docs")
+
+    def test_routing_follows_the_instance(self):
+        self.place(self.organization, self.shard)
+        task = self.create_task("Write docs")
+
+        self.assertEqual(router.db_for_write(TaskComment, instance=TaskComment(task=task)), self.shard)
+        self.assertEqual(router.db_for_read(Project, instance=self.organization), self.shard)
+
+    def test_global_models_stay_on_default(self):
+        self.place(self.organization, self.shard)
+        with tenant_context(self.organization.pk):
+            self.assertEqual(router.db_for_read(get_user_model()), DEFAULT_DB_ALIAS)
+            self.assertEqual(router.db_for_write(Organization), DEFAULT_DB_ALIAS)
+
+    def test_unplaced_organizations_use_default(self):
+        task = self.create_task("Write docs")
+        self.assertEqual(task._state.db, DEFAULT_DB_ALIAS)
+
+
+class InitTenantShardTests(ShardingTestCase):
+    def test_mirrors_reference_rows_and_offsets_ids(self):
+        call_command("init_tenant_shard", self.other_shard, id_offset=10**6, stdout=mock.Mock())
+
+        self.assertTrue(get_user_model().objects.using(self.other_shard).filter(pk=self.user.pk).exists())
+        self.assertTrue(Organization.objects.using(self.other_shard).filter(pk=self.organization.pk).exists())
+        self.place(self.organization, self.other_shard)
+        self.assertGreater(self.create_task("Write docs").pk, 10**6)
+
+
+class MoveTenantTests(ShardingTestCase):
+    def move(self, **options):
+        call_command("move_tenant", "acme", self.shard, drain_seconds=0, stdout=mock.Mock(), **options)
+
+    def test_copies_changes_made_during_the_move(self):
+        task = self.create_task("Write docs")
+        removed = self.create_task("Obsolete")
+        with tenant_context(self.organization.pk):
+            comment = TaskComment.objects.create(task=task, author=self.user, body="First")
+        copy_all = MoveTenantCommand._copy_all
+        calls = []
+
+        def copy_all_then_write(command, since):
+            copied = copy_all(command, since)
+            calls.append(since)
+            if len(calls) == 1:
+                # Changes landing between the bulk copy and the cut-over.
+                with tenant_context(self.organization.pk):
+                    task.status = Task.STATUS_DONE
+                    task.save()
+                    removed.delete()
+                    comment.body = "Edited"
+                    comment.save()
+            return copied
+
+        with mock.patch.object(MoveTenantCommand, "_copy_all", copy_all_then_write):
+            self.move()
+
+        self.assertGreater(len(calls), 1)
+        self.assertEqual(get_tenant_placement(self.organization.pk), (self.shard, False))
+        with tenant_context(self.organization.pk):
+            self.assertEqual(list(Task.objects.values_list("title", "status")), [("Write docs", Task.STATUS_DONE)])
+            self.assertEqual(TaskComment.objects.get().body, "Edited")
+            # Insert-only rows (no updated_at) are caught up too.
+            self.assertCountEqual(
+                TaskStatusTransition.objects.filter(task=task).values_list("to_status", flat=True),
+                [Task.STATUS_TODO, Task.STATUS_DONE],
+            )
+        self.assertFalse(Task.objects.using(DEFAULT_DB_ALIAS).filter(organization=self.organization).exists())
+
+    def test_keep_source_leaves_the_rows(self):
+        self.create_task("Write docs")
+        self.move(keep_source=True)
+        self.assertTrue(Task.objects.using(DEFAULT_DB_ALIAS).filter(organization=self.organization).exists())
+        self.assertTrue(Task.objects.using(self.shard).filter(organization=self.organization).exists())
+
+    def test_failed_cut_over_restores_the_source_placement(self):
+        self.create_task("Write docs")
+        with mock.patch.object(MoveTenantCommand, "_remove_deleted_rows", side_effect=RuntimeError("lost")):
+            with self.assertRaises(RuntimeError):
+                self.move()
+
+        self.assertEqual(get_tenant_placement(self.organization.pk), (DEFAULT_DB_ALIAS, False))
+        self.assertTrue(Task.objects.using(DEFAULT_DB_ALIAS).filter(organization=self.organization).exists())
@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from rest_framework import mixins, permissions, viewsets
 
 from audit.mixins import AuditLogMixin
+from core.fieldsets import SparseFieldsetViewMixin
 from .models import Organization, Membership
 from .permissions import IsOwnerOrAdmin, IsOrganizationMember
 from .serializers import MembershipSerializer, OrganizationSerializer
@@ -11,6 +12,7 @@ User = get_user_model()
 
 
 class OrganizationViewSet(
+    SparseFieldsetViewMixin,
     mixins.CreateModelMixin,
     mixins.RetrieveModelMixin,
     mixins.ListModelMixin,
@@ -40,6 +42,7 @@ class OrganizationViewSet(
 
 
 class MembershipViewSet(
+    SparseFieldsetViewMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
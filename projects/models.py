@@ -33,6 +33,16 @@ class Project(OrganizationScopedModel):
     start_date = models.DateField(null=True, blank=True)
     end_date = models.DateField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Active/overdue project counts filter on status and end_date.
+            models.Index(
+                fields=["organization", "status", "end_date"],
+                name="project_org_status_end_idx",
+            ),
+            models.Index(fields=["organization", "created_at"], name="project_org_created_idx"),
+        ]
+
     def __str__(self) -> str:  # pragma: no cover - trivial
         return self.name
 
@@ -1,5 +1,6 @@
 from rest_framework import permissions, viewsets
 
+from core.fieldsets import SparseFieldsetViewMixin
 from organizations.permissions import IsOrganizationMember
 from audit.mixins import AuditLogMixin
 
@@ -7,7 +8,7 @@ from .models import Project
 from .serializers import ProjectSerializer
 
 
-class ProjectViewSet(AuditLogMixin, viewsets.ModelViewSet):
+class ProjectViewSet(SparseFieldsetViewMixin, AuditLogMixin, viewsets.ModelViewSet):
     """
     CRUD for projects within the current organization.
     """
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from organizations.models import Organization
+from organizations.sharding import tenant_context
+from tasks.models import Task, TaskStatusTransition
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the status transition log for tasks that predate it. Each task gets a "
+        "creation row at created_at and, unless it is still to do, a move to its "
+        "current status at updated_at; earlier intermediate statuses are unknown."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            action="append",
+            dest="slugs",
+            help="Organization slug (repeatable). Defaults to all organizations.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.order_by("pk")
+        if options["slugs"]:
+            organizations = organizations.filter(slug__in=options["slugs"])
+
+        for organization in organizations.iterator():
+            with tenant_context(organization.pk):
+                created = self._backfill(organization, options["batch_size"])
+            self.stdout.write(f"{organization.slug}: {created} transitions created")
+
+    def _backfill(self, organization, batch_size: int) -> int:
+        tasks = (
+            Task.objects.filter(organization=organization, status_transitions__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "status", "assignee_id", "created_at", "updated_at")
+        )
+        created = 0
+        last_pk = 0
+        while True:
+            chunk = list(tasks.filter(pk__gt=last_pk)[:batch_size])
+            if not chunk:
+                return created
+            rows = []
+            for pk, status, assignee_id, created_at, updated_at in chunk:
+                common = {"organization_id": organization.pk, "task_id": pk, "assignee_id": assignee_id}
+                rows.append(
+                    TaskStatusTransition(
+                        from_status="", to_status=Task.STATUS_TODO, created_at=created_at, **common
+                    )
+                )
+                if status != Task.STATUS_TODO:
+                    rows.append(
+                        TaskStatusTransition(
+                            from_status=Task.STATUS_TODO, to_status=status, created_at=updated_at, **common
+                        )
+                    )
+            TaskStatusTransition.objects.bulk_create(rows)
+            created += len(rows)
+            last_pk = chunk[-1][0]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:04
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def spaced_ranks(count):
+    # Frozen copy of tasks.ranking.spaced_ranks.
+    base = len(ALPHABET)
+    width = 1
+    while base**width < (count + 1) * base:
+        width += 1
+    step = base**width // (count + 1)
+    ranks = []
+    for index in range(1, count + 1):
+        value, digits = index * step, []
+        for _ in range(width):
+            value, digit = divmod(value, base)
+            digits.append(ALPHABET[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+
+def _columns(Task, alias, order_by):
+    tasks = Task.objects.using(alias).order_by("project_id", "status", *order_by).only("pk", "project_id", "status")
+    for _, column in groupby(tasks.iterator(chunk_size=2000), key=lambda task: (task.project_id, task.status)):
+        yield list(column)
+
+
+def ranks_from_positions(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    alias = schema_editor.connection.alias
+    for column in _columns(Task, alias, ["order", "pk"]):
+        for task, rank in zip(column, spaced_ranks(len(column))):
+            task.rank = rank
+        Task.objects.using(alias).bulk_update(column, ["rank"], batch_size=1000)
+
+
+def positions_from_ranks(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    alias = schema_editor.connection.alias
+    for column in _columns(Task, alias, ["rank", "pk"]):
+        for position, task in enumerate(column):
+            task.order = position
+        Task.objects.using(alias).bulk_update(column, ["order"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_status_transitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(ranks_from_positions, positions_from_ranks),
+        migrations.RemoveField(
+            model_name='task',
+            name='order',
+        ),
+        migrations.RenameField(
+            model_name='task',
+            old_name='rank',
+            new_name='order',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'order'], name='task_project_status_order_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 from core.models import OrganizationScopedModel, TimeStampedModel
 from projects.models import Project
@@ -49,7 +50,22 @@ class Task(OrganizationScopedModel):
         choices=PRIORITY_CHOICES,
         default=PRIORITY_MEDIUM,
     )
-    order = models.PositiveIntegerField(default=0)
+    # Lexicographic rank within the (project, status) column; see tasks.ranking.
+    order = models.CharField(max_length=64, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Status filters, completion counts and per-assignee productivity.
+            models.Index(
+                fields=["organization", "status", "assignee"],
+                name="task_org_status_assignee_idx",
+            ),
+            models.Index(fields=["organization", "assignee"], name="task_org_assignee_idx"),
+            models.Index(fields=["organization", "due_date"], name="task_org_due_date_idx"),
+            models.Index(fields=["organization", "created_at"], name="task_org_created_idx"),
+            # Board columns, read in rank order.
+            models.Index(fields=["project", "status", "order"], name="task_project_status_order_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         return self.title
@@ -82,3 +98,39 @@ class TaskAttachment(TimeStampedModel):
         related_name="uploaded_attachments",
     )
 
+
+
+class TaskStatusTransition(models.Model):
+    """
+    Append-only log of task status/assignee changes, the basis of the flow
+    analytics (cycle time, lead time, throughput, cumulative flow).
+
+    A task's first row has an empty `from_status` and marks its creation.
+    """
+
+    organization = models.ForeignKey(
+        "organizations.Organization",
+        on_delete=models.CASCADE,
+        related_name="task_status_transitions",
+    )
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name="status_transitions",
+    )
+    from_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, blank=True)
+    to_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    assignee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Flow analytics read an organization's log in (task, time) order.
+            models.Index(fields=["organization", "task", "created_at"], name="transition_org_task_idx"),
+        ]
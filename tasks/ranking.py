@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max, Q
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from projects.models import Project
+
+from .models import Task
+
+
+# Rank digits. Lowercase letters and digits sort the same under byte-wise
+# and locale collations, so the database orders keys like Python does.
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+RANK_MAX_LENGTH = Task._meta.get_field("order").max_length
+
+
+class ColumnChanged(Exception):
+    """
+    The tasks of a column changed between validating a new order and
+    locking the project to apply it.
+    """
+
+
+def rebalance_length() -> int:
+    """
+    Key length past which a column is rebalanced in the background.
+    """
+
+    return getattr(settings, "TASK_RANK_REBALANCE_LENGTH", 24)
+
+
+# Keys
+
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    # A key strictly between `low` ("" is the start) and `high` (None is the
+    # end). Keys never end in "0", so there is always room before any key.
+    if high is not None:
+        common = 0
+        while common < len(high) and (low[common] if common < len(low) else "0") == high[common]:
+            common += 1
+        if common:
+            return high[:common] + _midpoint(low[common:], high[common:])
+    low_digit = ALPHABET.index(low[0]) if low else 0
+    high_digit = ALPHABET.index(high[0]) if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return ALPHABET[(low_digit + high_digit) // 2]
+    if high is not None and len(high) > 1:
+        return high[0]
+    return ALPHABET[low_digit] + _midpoint(low[1:], None)
+
+
+def _successor(key: str) -> str:
+    # The next key after `key` with room to spare: its first digit below
+    # "z" stepped up, so appending grows keys by one digit every ~35 keys.
+    for index, digit in enumerate(key):
+        if digit != ALPHABET[-1]:
+            return key[:index] + ALPHABET[ALPHABET.index(digit) + 1]
+    return key + ALPHABET[1]
+
+
+def _predecessor(key: str) -> str:
+    # The mirror of _successor: the first digit above "0" stepped down (a
+    # trailing "0" would leave no room before the key, so "z" follows it).
+    index = next(index for index, digit in enumerate(key) if digit != ALPHABET[0])
+    digit = ALPHABET.index(key[index]) - 1
+    return key[:index] + ALPHABET[digit] + (ALPHABET[-1] if digit == 0 else "")
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Key sorting after `before` and before `after` (None: no neighbour on
+    that side). Raises ValueError unless before < after.
+    """
+
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"{before!r} does not sort before {after!r}.")
+    if before and after is None:
+        return _successor(before)
+    if after and before is None:
+        return _predecessor(after)
+    return _midpoint(before or "", after)
+
+
+def spaced_ranks(count: int) -> List[str]:
+    """
+    `count` increasing keys spread evenly over the key space, each as
+    short as the count allows, leaving room for moves between any two.
+    """
+
+    width = 1
+    while BASE**width < (count + 1) * BASE:
+        width += 1
+    step = BASE**width // (count + 1)
+    ranks = []
+    for index in range(1, count + 1):
+        value, digits = index * step, []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(ALPHABET[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+    return ranks
+
+
+# Columns
+
+
+def column(project_id: int, status: str, using: str = DEFAULT_DB_ALIAS):
+    return Task.objects.using(using).filter(project_id=project_id, status=status).order_by("order", "pk")
+
+
+def lock_project(project_id: int, using: str) -> None:
+    # Moves and rebalances of a project's columns queue on its row, so two
+    # cards dropped in the same gap never get the same key.
+    Project.objects.using(using).select_for_update().filter(pk=project_id).exists()
+
+
+def last_rank(project_id: int, status: str, using: str = DEFAULT_DB_ALIAS, exclude: Optional[int] = None) -> str:
+    """
+    Key placing a task at the end of a column.
+    """
+
+    tasks = column(project_id, status, using)
+    if exclude is not None:
+        tasks = tasks.exclude(pk=exclude)
+    last = tasks.aggregate(last=Max("order"))["last"]
+    return rank_between(last or None, None)
+
+
+def end_rank(project_id: int, status: str, using: str = DEFAULT_DB_ALIAS, exclude: Optional[int] = None) -> str:
+    """
+    last_rank(), respacing the column first when the key would not fit.
+    Call with the project locked.
+    """
+
+    rank = last_rank(project_id, status, using, exclude=exclude)
+    if len(rank) > RANK_MAX_LENGTH:
+        # The background rebalance fell behind: respace synchronously.
+        rebalance_column(project_id, status, using)
+        rank = last_rank(project_id, status, using, exclude=exclude)
+    return rank
+
+
+def rebalance_due(rank: str) -> bool:
+    """
+    Whether a column holding `rank` should be rebalanced in the background.
+    """
+
+    return len(rank) > rebalance_length()
+
+
+def rank_beside(task: Task, status: str, after: Optional[Task] = None, before: Optional[Task] = None) -> str:
+    """
+    Key placing `task` right after `after` or right before `before` in its
+    project's `status` column (at the end when neither is given). Only the
+    neighbours are read. Call with the project locked.
+    """
+
+    using = task._state.db
+    tasks = column(task.project_id, status, using).exclude(pk=task.pk)
+    if after is not None:
+        following = tasks.filter(Q(order__gt=after.order) | Q(order=after.order, pk__gt=after.pk)).first()
+        low, high = after.order, following.order if following is not None else None
+    elif before is not None:
+        preceding = (
+            tasks.filter(Q(order__lt=before.order) | Q(order=before.order, pk__lt=before.pk))
+            .order_by("-order", "-pk")
+            .first()
+        )
+        low, high = (preceding.order if preceding is not None else None), before.order
+    else:
+        return end_rank(task.project_id, status, using, exclude=task.pk)
+    if low is not None and high is not None and low >= high:
+        # Tied keys (e.g. from before ranks existed): spread the column out.
+        rebalance_column(task.project_id, status, using)
+        after = after and Task.objects.using(using).get(pk=after.pk)
+        before = before and Task.objects.using(using).get(pk=before.pk)
+        return rank_beside(task, status, after=after, before=before)
+    return rank_between(low or None, high or None)
+
+
+def move_task(task: Task, status: str, after: Optional[Task] = None, before: Optional[Task] = None) -> bool:
+    """
+    Move `task` into its project's `status` column, right after `after` or
+    right before `before` (at the end when neither is given), writing only
+    the task's own row. Returns whether the column is due for a rebalance.
+    """
+
+    using = task._state.db
+    with transaction.atomic(using=using):
+        lock_project(task.project_id, using)
+        rank = rank_beside(task, status, after=after, before=before)
+        if len(rank) > RANK_MAX_LENGTH:
+            # The background rebalance fell behind: respace synchronously.
+            rebalance_column(task.project_id, status, using)
+            after = after and Task.objects.using(using).get(pk=after.pk)
+            before = before and Task.objects.using(using).get(pk=before.pk)
+            rank = rank_beside(task, status, after=after, before=before)
+        task.order = rank
+        task.status = status
+        task.save(update_fields=["status", "order", "updated_at"])
+    return rebalance_due(rank)
+
+
+def apply_order(project_id: int, status: str, task_ids: Sequence[int], using: str = DEFAULT_DB_ALIAS) -> List[Task]:
+    """
+    Give the tasks `task_ids` of a project, in this order, evenly spaced
+    keys of the `status` column with one UPDATE (bumping `updated_at`, which
+    tenant moves catch up on). Tasks coming from another column are saved
+    individually so their status change is recorded.
+    Returns the tasks in their new order; raises ColumnChanged unless, under
+    the project lock, `task_ids` are still tasks of the project covering
+    the whole `status` column.
+    """
+
+    with transaction.atomic(using=using):
+        lock_project(project_id, using)
+        tasks = Task.objects.using(using).filter(project_id=project_id).filter(
+            Q(pk__in=task_ids) | Q(status=status)
+        ).in_bulk()
+        if tasks.keys() != set(task_ids):
+            gone = sorted(set(task_ids) - tasks.keys())
+            added = sorted(tasks.keys() - set(task_ids))
+            raise ColumnChanged(
+                f"The column changed meanwhile (tasks gone: {gone}, added: {added}); reload it and retry."
+            )
+        ordered = [tasks[pk] for pk in task_ids]
+        reordered = []
+        now = timezone.now()
+        for task, rank in zip(ordered, spaced_ranks(len(ordered))):
+            task.order = rank
+            if task.status == status:
+                task.updated_at = now
+                reordered.append(task)
+            else:
+                task.status = status
+                task.save(update_fields=["status", "order", "updated_at"])
+        Task.objects.using(using).bulk_update(reordered, ["order", "updated_at"], batch_size=1000)
+    return ordered
+
+
+def rebalance_column(project_id: int, status: str, using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Respace the keys of one column, keeping its order. Returns the number
+    of tasks rewritten (their `updated_at` is bumped, see apply_order).
+    """
+
+    with transaction.atomic(using=using):
+        lock_project(project_id, using)
+        tasks = list(column(project_id, status, using).only("pk", "order"))
+        changed = []
+        now = timezone.now()
+        for task, rank in zip(tasks, spaced_ranks(len(tasks))):
+            if task.order != rank:
+                task.order = rank
+                task.updated_at = now
+                changed.append(task)
+        Task.objects.using(using).bulk_update(changed, ["order", "updated_at"], batch_size=1000)
+    return len(changed)
+
+
+def long_columns(length: Optional[int] = None, using: str = DEFAULT_DB_ALIAS):
+    """
+    (project_id, status) of columns holding a key longer than `length`.
+    """
+
+    return (
+        Task.objects.using(using)
+        .annotate(rank_length=Length("order"))
+        .filter(rank_length__gt=length or rebalance_length())
+        .order_by()
+        .values_list("project_id", "status")
+        .distinct()
+    )
+
+
+def rebalance_long_columns(using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Rebalance every column with a key past rebalance_length().
+    """
+
+    return sum(rebalance_column(project_id, status, using) for project_id, status in list(long_columns(using=using)))
@@ -1,13 +1,16 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from core.fieldsets import SparseFieldsetSerializerMixin
+from projects.models import Project
+
 from .models import Task, TaskComment
 
 
 User = get_user_model()
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     assignee = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), required=False, allow_null=True
     )
@@ -28,10 +31,73 @@ class TaskSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "organization", "created_at", "updated_at"]
+        # Ranks are assigned on create and changed through move/reorder;
+        # see tasks.ranking.
+        read_only_fields = ["id", "organization", "order", "created_at", "updated_at"]
+
+
+class TaskMoveSerializer(serializers.Serializer):
+    """
+    Where to drop a task: its column (`status`, default unchanged) and the
+    task it goes right after or right before (at the end when neither).
+    """
+
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, required=False)
+    after = serializers.PrimaryKeyRelatedField(queryset=Task.objects.none(), required=False, allow_null=True)
+    before = serializers.PrimaryKeyRelatedField(queryset=Task.objects.none(), required=False, allow_null=True)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        task = self.context["task"]
+        # Neighbours come from the moved task's project.
+        neighbours = Task.objects.filter(
+            organization_id=task.organization_id, project_id=task.project_id
+        ).exclude(pk=task.pk)
+        self.fields["after"].queryset = neighbours
+        self.fields["before"].queryset = neighbours
+
+    def validate(self, attrs):
+        if attrs.get("after") is not None and attrs.get("before") is not None:
+            raise serializers.ValidationError("Give either after or before, not both.")
+        status = attrs.setdefault("status", self.context["task"].status)
+        for name in ("after", "before"):
+            neighbour = attrs.get(name)
+            if neighbour is not None and neighbour.status != status:
+                raise serializers.ValidationError({name: f"Task {neighbour.pk} is not in the {status} column."})
+        return attrs
+
+
+class TaskReorderSerializer(serializers.Serializer):
+    """
+    The complete new order of one column: every task of the project's
+    `status` column, plus any task of the project moved into it.
+    """
+
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.none())
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+    tasks = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        organization = getattr(request, "organization", None)
+        self.fields["project"].queryset = Project.objects.filter(organization=organization)
+
+    def validate(self, attrs):
+        ids = attrs["tasks"]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError({"tasks": "Each task may appear once."})
+        project_tasks = dict(Task.objects.filter(project=attrs["project"]).values_list("pk", "status"))
+        unknown = sorted(set(ids) - set(project_tasks))
+        if unknown:
+            raise serializers.ValidationError({"tasks": f"Not tasks of this project: {unknown}."})
+        missing = sorted(pk for pk, status in project_tasks.items() if status == attrs["status"] and pk not in set(ids))
+        if missing:
+            raise serializers.ValidationError({"tasks": f"The column also holds tasks {missing}; list all of them."})
+        return attrs
 
 
-class TaskCommentSerializer(serializers.ModelSerializer):
+class TaskCommentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Task, TaskStatusTransition
+
+
+TRANSITION_FIELDS = ("status", "assignee_id")
+
+
+@receiver(pre_save, sender=Task)
+def remember_transition_state(sender, instance: Task, raw=False, using=None, update_fields=None, **kwargs) -> None:
+    instance._transition_before = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None:
+        names = {sender._meta.get_field(name).attname for name in update_fields}
+        if not names.intersection(TRANSITION_FIELDS):
+            return
+    loaded = getattr(instance, "_loaded_values", None) or {}
+    if all(attname in loaded for attname in TRANSITION_FIELDS):
+        instance._transition_before = tuple(loaded[attname] for attname in TRANSITION_FIELDS)
+    else:
+        instance._transition_before = (
+            sender._base_manager.using(using)
+            .filter(pk=instance.pk)
+            .values_list(*TRANSITION_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Task)
+def record_status_transition(sender, instance: Task, created, raw=False, using=None, **kwargs) -> None:
+    if raw:
+        return
+    after = (instance.status, instance.assignee_id)
+    before = None if created else getattr(instance, "_transition_before", None)
+    if not created and (before is None or before == after):
+        return
+    TaskStatusTransition.objects.using(using).create(
+        organization_id=instance.organization_id,
+        task=instance,
+        from_status=before[0] if before else "",
+        to_status=instance.status,
+        assignee_id=instance.assignee_id,
+        created_at=instance.created_at if created else timezone.now(),
+    )
+    instance._loaded_values = {
+        **getattr(instance, "_loaded_values", {}),
+        **dict(zip(TRANSITION_FIELDS, after)),
+    }
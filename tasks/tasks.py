@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import logging
+from contextlib import nullcontext
+from typing import Dict, Optional
+
+from celery import shared_task
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+
+from organizations.sharding import shard_aliases, tenant_context
+
+from .models import Task
+from .ranking import rebalance_column, rebalance_due, rebalance_long_columns
+
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebalance_task_column(project_id: int, status: str, organization_id: Optional[int] = None) -> int:
+    """
+    Respace the rank keys of one board column after they grew long.
+    """
+
+    # Route to the organization's shard when sharding is in use.
+    with tenant_context(organization_id) if organization_id is not None else nullcontext():
+        return rebalance_column(project_id, status, using=router.db_for_write(Task))
+
+
+@shared_task
+def rebalance_task_ranks() -> Dict[str, int]:
+    """
+    Respace every column, on every database, whose keys grew past
+    TASK_RANK_REBALANCE_LENGTH (catches columns whose rebalance was never
+    queued or failed).
+    """
+
+    return {alias: rebalance_long_columns(using=alias) for alias in [DEFAULT_DB_ALIAS, *shard_aliases()]}
+
+
+def queue_rebalance(task: Task) -> None:
+    """
+    Respace the column of `task` once the current transaction commits, if
+    its key grew past TASK_RANK_REBALANCE_LENGTH.
+    """
+
+    if not rebalance_due(task.order):
+        return
+    args = (task.project_id, task.status, task.organization_id)
+
+    def queue():
+        try:
+            rebalance_task_column.delay(*args)
+        except Exception:  # pragma: no cover - depends on the broker
+            # Not fatal: the daily rebalance_task_ranks sweep catches it.
+            logger.exception("Could not queue the rebalance of column %r", args)
+
+    transaction.on_commit(queue, using=task._state.db)
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from organizations.models import Membership, Organization
+from projects.models import Project
+from tasks.models import Task
+from tasks.ranking import ColumnChanged, apply_order
+from tasks.serializers import TaskReorderSerializer
+
+
+class ReorderTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="secret"
+        )
+        self.organization = Organization.objects.create(name="Acme", slug="acme")
+        Membership.objects.create(user=user, organization=self.organization, role="owner")
+        self.project = Project.objects.create(organization=self.organization, name="Launch")
+        self.tasks = [
+            Task.objects.create(organization=self.organization, project=self.project, title=f"Task {index}")
+            for index in range(3)
+        ]
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer " + str(RefreshToken.for_user(user).access_token),
+            HTTP_X_ORGANIZATION_SLUG=self.organization.slug,
+        )
+
+    def reorder(self, ids):
+        return self.client.post(
+            "/api/v1/tasks/tasks/reorder/",
+            {"project": self.project.pk, "status": Task.STATUS_TODO, "tasks": ids},
+            format="json",
+        )
+
+    def test_applies_the_new_order(self):
+        ids = [task.pk for task in reversed(self.tasks)]
+        response = self.reorder(ids)
+        self.assertEqual(response.status_code, 200)
+        ordered = Task.objects.filter(project=self.project).order_by("order").values_list("pk", flat=True)
+        self.assertEqual(list(ordered), ids)
+
+    def test_task_deleted_after_validation_is_rejected(self):
+        validate = TaskReorderSerializer.validate
+
+        def validate_then_delete(serializer, attrs):
+            attrs = validate(serializer, attrs)
+            self.tasks[0].delete()
+            return attrs
+
+        with mock.patch.object(TaskReorderSerializer, "validate", validate_then_delete):
+            response = self.reorder([task.pk for task in self.tasks])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("tasks", response.data)
+
+    def test_column_changes_under_the_lock_are_detected(self):
+        ids = [task.pk for task in self.tasks]
+        moved = Task.objects.create(organization=self.organization, project=self.project, title="Added")
+        with self.assertRaises(ColumnChanged):
+            apply_order(self.project.pk, Task.STATUS_TODO, ids)
+
+        other = Project.objects.create(organization=self.organization, name="Other")
+        moved.project = other
+        moved.save()
+        with self.assertRaises(ColumnChanged):
+            apply_order(other.pk, Task.STATUS_TODO, ids)
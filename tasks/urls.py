@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import TaskCommentViewSet, TaskViewSet
+from .views import TaskAttachmentDownloadView, TaskCommentViewSet, TaskViewSet
 
 
 router = DefaultRouter()
@@ -10,6 +10,11 @@ router.register("task-comments", TaskCommentViewSet, basename="task-comment")
 
 
 urlpatterns = [
+    path(
+        "task-attachments/<int:pk>/download/",
+        TaskAttachmentDownloadView.as_view(),
+        name="task-attachment-download",
+    ),
     path("", include(router.urls)),
 ]
 
@@ -1,15 +1,30 @@
-from rest_framework import permissions, viewsets
+from django.db import router, transaction
+from rest_framework import exceptions, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from core.downloads import PassthroughRenderer, file_download
+from core.fieldsets import SparseFieldsetViewMixin
 from organizations.permissions import IsOrganizationMember
 from audit.mixins import AuditLogMixin
+from audit.models import AuditLog
+from audit.snapshots import snapshot
 
-from .models import Task, TaskComment
-from .serializers import TaskCommentSerializer, TaskSerializer
+from .models import Task, TaskAttachment, TaskComment
+from .ranking import ColumnChanged, apply_order, end_rank, lock_project, move_task
+from .serializers import TaskCommentSerializer, TaskMoveSerializer, TaskReorderSerializer, TaskSerializer
+from .tasks import queue_rebalance
 
 
-class TaskViewSet(AuditLogMixin, viewsets.ModelViewSet):
+class TaskViewSet(SparseFieldsetViewMixin, AuditLogMixin, viewsets.ModelViewSet):
     """
-    CRUD for tasks scoped to the current organization.
+    CRUD for tasks scoped to the current organization, listed in board
+    order: by project, status column, then rank (see tasks.ranking).
+
+    `move/` drops one task into a column next to another, writing only
+    that task; `reorder/` applies a whole column's new order at once.
     """
 
     serializer_class = TaskSerializer
@@ -17,16 +32,101 @@ class TaskViewSet(AuditLogMixin, viewsets.ModelViewSet):
 
     def get_queryset(self):
         org = getattr(self.request, "organization", None)
-        return Task.objects.filter(organization=org).select_related("project", "assignee")
+        return (
+            Task.objects.filter(organization=org)
+            .select_related("project", "assignee")
+            .order_by("project_id", "status", "order", "id")
+        )
 
     def perform_create(self, serializer):
         org = getattr(self.request, "organization", None)
-        serializer.save(organization=org)
-        # Audit logging handled by AuditLogMixin
-        super().perform_create(serializer)
+        project = serializer.validated_data["project"]
+        status = serializer.validated_data.get("status", Task.STATUS_TODO)
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            # New tasks go to the end of their column.
+            lock_project(project.pk, using)
+            task = serializer.save(organization=org, order=end_rank(project.pk, status, using))
+            # Audit logging handled by AuditLogMixin
+            super().perform_create(serializer)
+            queue_rebalance(task)
+
+    def perform_update(self, serializer):
+        task = serializer.instance
+        project = serializer.validated_data.get("project", task.project)
+        status = serializer.validated_data.get("status", task.status)
+        if (project.pk, status) == (task.project_id, task.status):
+            return super().perform_update(serializer)
+        using = task._state.db
+        with transaction.atomic(using=using):
+            # Changing column puts the task at the end of the new one.
+            lock_project(project.pk, using)
+            serializer.validated_data["order"] = end_rank(project.pk, status, using)
+            super().perform_update(serializer)
+            queue_rebalance(serializer.instance)
+
+    @action(detail=True, methods=["post"], url_path="move")
+    def move(self, request, pk=None):
+        """
+        Move a task within or across the columns of its project:
+        {"status": "in_progress", "after": 12} or {"before": 7}; the end of
+        the column when neither is given. Only the task's row is written.
+        """
+
+        task = self.get_object()
+        serializer = TaskMoveSerializer(data=request.data, context={**self.get_serializer_context(), "task": task})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        with transaction.atomic(using=task._state.db):
+            before = snapshot(task)
+            move_task(task, data["status"], after=data.get("after"), before=data.get("before"))
+            self._create_audit_log(
+                instance=task,
+                action=AuditLog.ACTION_UPDATE,
+                before=before,
+                after=snapshot(task),
+            )
+            queue_rebalance(task)
+        return Response(TaskSerializer(task).data)
+
+    @action(detail=False, methods=["post"], url_path="reorder")
+    def reorder(self, request):
+        """
+        Apply the complete new order of one column in one transaction:
+        {"project": 3, "status": "todo", "tasks": [ids, in order]}. Every
+        task whose rank or status changed is logged as an update; the
+        audit sink writes the entries in one batch.
+        """
 
+        serializer = TaskReorderSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        project, status, ids = (serializer.validated_data[name] for name in ("project", "status", "tasks"))
 
-class TaskCommentViewSet(AuditLogMixin, viewsets.ModelViewSet):
+        using = router.db_for_write(Task)
+        with transaction.atomic(using=using):
+            lock_project(project.pk, using)
+            before = {task.pk: snapshot(task) for task in Task.objects.using(using).filter(pk__in=ids)}
+            try:
+                tasks = apply_order(project.pk, status, ids, using=using)
+            except ColumnChanged as exc:
+                raise exceptions.ValidationError({"tasks": str(exc)})
+            for task in tasks:
+                # The project, hence every task, belongs to the request's
+                # organization; spares the audit one lookup per task.
+                task.organization = request.organization
+                after = snapshot(task)
+                if after != before[task.pk]:
+                    self._create_audit_log(
+                        instance=task,
+                        action=AuditLog.ACTION_UPDATE,
+                        before=before[task.pk],
+                        after=after,
+                    )
+        return Response(TaskSerializer(tasks, many=True).data)
+
+
+class TaskCommentViewSet(SparseFieldsetViewMixin, AuditLogMixin, viewsets.ModelViewSet):
     """
     Manage comments on tasks within the current organization.
     """
@@ -45,3 +145,17 @@ class TaskCommentViewSet(AuditLogMixin, viewsets.ModelViewSet):
         # Audit logging handled by AuditLogMixin
         super().perform_create(serializer)
 
+
+class TaskAttachmentDownloadView(APIView):
+    """
+    Download a task attachment of the current organization; see
+    core.downloads.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    renderer_classes = [PassthroughRenderer]
+
+    def get(self, request, pk):
+        org = getattr(request, "organization", None)
+        attachment = get_object_or_404(TaskAttachment.objects.filter(task__organization=org), pk=pk)
+        return file_download(request, attachment.file)